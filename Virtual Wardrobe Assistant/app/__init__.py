@@ -26,6 +26,41 @@ def create_app(test_config=None):
         UPLOAD_FOLDER=os.path.join(app.static_folder, 'uploads'),
         MAX_CONTENT_LENGTH=16 * 1024 * 1024,  # 16MB max upload
         WEATHER_API_KEY=os.environ.get('WEATHER_API_KEY', ''),
+        WEATHER_API_URL=os.environ.get('WEATHER_API_URL', 'https://api.openweathermap.org'),
+        WEATHER_PROVIDER=os.environ.get('WEATHER_PROVIDER', ''),  # 'openweathermap', 'mock' or 'replay' (default: by API key)
+        WEATHER_RECORD_PATH=os.environ.get('WEATHER_RECORD_PATH'),  # Append raw OpenWeatherMap responses here
+        WEATHER_REPLAY_PATH=os.environ.get('WEATHER_REPLAY_PATH'),  # Recorded responses for the replay provider
+        WEATHER_REPLAY_LATENCY=float(os.environ.get('WEATHER_REPLAY_LATENCY', 0)),  # Seconds added to each replayed call
+        WEATHER_REPLAY_JITTER=float(os.environ.get('WEATHER_REPLAY_JITTER', 0)),  # Up to this many more seconds, at random
+        WEATHER_REPLAY_ERROR_RATE=float(os.environ.get('WEATHER_REPLAY_ERROR_RATE', 0)),  # Fraction of replayed calls that fail
+        WEATHER_CONNECT_TIMEOUT=3.05,  # Seconds to establish a connection to the weather API
+        WEATHER_READ_TIMEOUT=5.0,  # Seconds to wait for a response
+        WEATHER_RETRIES=2,  # Extra attempts after a network error, 429 or 5xx
+        WEATHER_RETRY_BACKOFF=0.2,  # Base backoff in seconds (exponential, full jitter)
+        WEATHER_POOL_SIZE=10,  # Keep-alive connections per process
+        WEATHER_BREAKER_THRESHOLD=5,  # Consecutive failures that open the circuit
+        WEATHER_BREAKER_RESET=30.0,  # Seconds the circuit stays open before a trial call
+        WEATHER_QUOTA_PER_MINUTE=60,  # Weather API calls per minute across all workers (0 disables)
+        WEATHER_QUOTA_BURST=None,  # Calls allowed in a burst (default: one minute's worth)
+        WEATHER_QUOTA_BACKGROUND_RESERVE=0.25,  # Share of the budget prefetching and refreshes must leave for page loads
+        WEATHER_CACHE_TTL=600,  # Seconds weather stays fresh in the shared cache (0 disables)
+        WEATHER_CACHE_STALE_TTL=3600,  # Further seconds stale weather is served while refreshing
+        FORECAST_TTL=10800,  # Seconds before a location's stored forecast is fetched again
+        FORECAST_RETENTION_DAYS=7,  # Days past forecast periods are kept for lookups
+        WEATHER_PREFETCH_INTERVAL=300,  # Seconds between background weather prefetch runs
+        WEATHER_PREFETCH_WORKERS=8,  # Concurrent upstream fetches per prefetch run
+        WEATHER_PREFETCH_IN_PROCESS=False,  # Run the prefetcher on a thread of this process
+        SUGGESTION_CACHE_SIZE=1024,  # Cached suggestion results per process (0 disables)
+        SUGGESTION_CACHE_TEMP_BUCKET=2.0,  # Temperature bucket width (Celsius)
+        REFERENCE_DATA_TTL=300,  # Seconds before categories/colors/seasons are re-read from the database
+        PAGE_SIZE=24,  # Items or outfits per page in listings
+        MAX_PAGE_SIZE=100,  # Largest page a client may ask for with ?per_page=
+        SQL_REPEAT_THRESHOLD=10,  # Same statement this many times in a request is a likely N+1 (0 disables)
+        SQL_STRICT=os.environ.get('SQL_STRICT', '').lower() in ('1', 'true', 'yes'),  # Raise instead of logging
+        SQL_STATS_HEADERS=False,  # Send X-SQL-Count / X-SQL-Time-ms outside debug mode too
+        SQLITE_PRAGMAS={},  # Overrides for app.database.PRAGMAS, e.g. {'mmap_size': 0}
+        SQLITE_CHECKPOINT_INTERVAL=300,  # Seconds between WAL checkpoints (0 disables; SQLite still auto-checkpoints)
+        SQLITE_CHECKPOINT_MODE='TRUNCATE',  # 'TRUNCATE' waits for readers and empties the WAL; 'PASSIVE' never waits
     )
 
     if test_config is None:
@@ -53,17 +88,38 @@ def create_app(test_config=None):
     login_manager.login_view = 'auth.login'
     migrate.init_app(app, db)
 
+    # WAL, busy timeout and cache pragmas on every SQLite connection
+    from app.database import init_database
+    with app.app_context():
+        init_database(app, db.engine)
+
     # Register blueprints
     from app.routes.main import main_bp
     from app.routes.auth import auth_bp
-    from app.routes.clothing import clothing_bp
+    from app.routes.wardrobe import wardrobe_bp
     from app.routes.outfits import outfits_bp
 
     app.register_blueprint(main_bp)
     app.register_blueprint(auth_bp, url_prefix='/auth')
-    app.register_blueprint(clothing_bp, url_prefix='/clothing')
+    app.register_blueprint(wardrobe_bp, url_prefix='/wardrobe')
     app.register_blueprint(outfits_bp, url_prefix='/outfits')
 
+    # Per-request SQL statement counts and N+1 detection
+    from app.services.sql_monitor import init_sql_monitor
+    init_sql_monitor(app)
+
+    # Keep wardrobe versions current on every write
+    from app.services import change_tracking  # noqa: F401
+
+    # CLI commands
+    from app.commands import register_commands
+    register_commands(app)
+
+    # Optional in-process weather prefetcher (not for the CLI or tests)
+    if app.config.get('WEATHER_PREFETCH_IN_PROCESS') and not app.testing:
+        from app.services.weather_prefetch import start_prefetch_thread
+        start_prefetch_thread(app)
+
     # Context processors
     @app.context_processor
     def inject_now():
@@ -0,0 +1,95 @@
+import click
+from flask import current_app
+from sqlalchemy import create_engine
+
+from app import db
+from app.database import checkpoint
+from app.models.outfit import refresh_outfit_envelopes
+from app.models.wear_stats import backfill_wear_stats
+from app.services.query_plans import check_query_plans
+from app.services.suggestion_precompute import precompute_suggestions
+from app.services.weather_prefetch import prefetch_weather, run_prefetcher
+
+def register_commands(app):
+    """Attach the project's maintenance commands to ``flask``"""
+    app.cli.add_command(backfill_wear_stats_command)
+    app.cli.add_command(precompute_suggestions_command)
+    app.cli.add_command(refresh_outfit_envelopes_command)
+    app.cli.add_command(prefetch_weather_command)
+    app.cli.add_command(check_query_plans_command)
+    app.cli.add_command(checkpoint_db_command)
+
+@click.command('backfill-wear-stats')
+def backfill_wear_stats_command():
+    """Rebuild the wear_stats table from existing wear logs."""
+    count = backfill_wear_stats()
+    click.echo(f'Rebuilt wear statistics for {count} items and outfits.')
+
+@click.command('precompute-suggestions')
+@click.option('--occasion', 'occasions', multiple=True, default=['casual'], show_default=True,
+              help='Occasion to precompute (repeatable).')
+@click.option('--workers', type=int, default=None,
+              help='Worker processes (default: CPU count, 0 runs inline).')
+def precompute_suggestions_command(occasions, workers):
+    """Precompute today's outfit suggestions for all users with a location."""
+    count = precompute_suggestions(occasions, workers=workers)
+    click.echo(f'Stored {count} precomputed suggestion sets.')
+
+@click.command('refresh-outfit-envelopes')
+def refresh_outfit_envelopes_command():
+    """Recompute every outfit's derived temperature range and rain flag."""
+    count = refresh_outfit_envelopes()
+    db.session.commit()
+    click.echo(f'Refreshed {count} outfits.')
+
+@click.command('prefetch-weather')
+@click.option('--loop', is_flag=True, help='Keep running, prefetching every --interval seconds.')
+@click.option('--interval', type=float, default=None,
+              help='Seconds between runs (default: WEATHER_PREFETCH_INTERVAL).')
+@click.option('--workers', type=int, default=None,
+              help='Concurrent fetches (default: WEATHER_PREFETCH_WORKERS).')
+def prefetch_weather_command(loop, interval, workers):
+    """Fill the weather cache and forecast store for every distinct user location."""
+    if loop:
+        run_prefetcher(current_app._get_current_object(), interval=interval, workers=workers)
+        return
+    counts = prefetch_weather(workers=workers, interval=interval)
+    click.echo(f"Fetched {counts['fetched']} locations, {counts['failed']} failed, "
+               f"{counts['skipped']} still fresh; {counts['forecasts']} forecasts fetched, "
+               f"{counts['forecasts_failed']} failed.")
+
+@click.command('check-query-plans')
+@click.option('--models', is_flag=True,
+              help='Check a fresh in-memory schema built from the models instead of the configured database.')
+@click.option('--verbose', '-v', is_flag=True, help='Print every plan, not only failing ones.')
+def check_query_plans_command(models, verbose):
+    """Fail if any hot query's plan falls back to a full table scan."""
+    engine = db.engine
+    if models:
+        engine = create_engine('sqlite://')
+        db.metadata.create_all(engine)
+    
+    results = check_query_plans(engine)
+    failed = [result for result in results if result.full_scans]
+    for result in results:
+        if result.full_scans or verbose:
+            status = f"FULL SCAN of {', '.join(result.full_scans)}" if result.full_scans else 'ok'
+            click.echo(f'{result.name}: {status}')
+            for line in result.plan:
+                click.echo(f'    {line}')
+    click.echo(f'{len(results) - len(failed)}/{len(results)} hot queries use indexes.')
+    if failed:
+        raise SystemExit(1)
+
+@click.command('checkpoint-db')
+@click.option('--mode', type=click.Choice(['PASSIVE', 'FULL', 'RESTART', 'TRUNCATE'], case_sensitive=False),
+              default='TRUNCATE', show_default=True,
+              help='PASSIVE skips pages readers still need; TRUNCATE waits for them and empties the WAL file.')
+def checkpoint_db_command(mode):
+    """Copy the SQLite write-ahead log back into the database file."""
+    if db.engine.dialect.name != 'sqlite':
+        raise click.ClickException('Checkpoints only apply to SQLite databases.')
+    with db.engine.connect() as conn:
+        busy, wal_pages, checkpointed = checkpoint(conn.connection.driver_connection, mode.upper())
+    click.echo(f'Checkpointed {checkpointed} of {wal_pages} WAL pages'
+               f"{' (busy: some pages are still in use by readers)' if busy else ''}.")
\ No newline at end of file
@@ -0,0 +1,123 @@
+import logging
+import os
+import sqlite3
+import threading
+
+from sqlalchemy import event
+
+# Database file shared by the Flask app and the Streamlit front end
+DEFAULT_PATH = os.path.join('instance', 'wardrobe.db')
+
+# Settings applied to every SQLite connection, Flask and Streamlit alike
+PRAGMAS = {
+    'journal_mode': 'WAL',  # Readers and the writer no longer block each other
+    'busy_timeout': 5000,  # Milliseconds to wait for a lock before "database is locked"
+    'synchronous': 'NORMAL',  # Durable with WAL; syncs at checkpoints instead of every commit
+    'cache_size': -20000,  # Page cache per connection (negative = KiB, so 20 MB)
+    'mmap_size': 268435456,  # Read up to 256 MB of the file through memory mapping
+    'journal_size_limit': 67108864  # Shrink the WAL back to 64 MB after it has been reset
+}
+
+_checkpointers = {}
+_checkpointers_lock = threading.Lock()
+
+def apply_pragmas(dbapi_connection, pragmas=None):
+    """Apply ``PRAGMAS`` (or the given overrides) to an open sqlite3 connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in {**PRAGMAS, **(pragmas or {})}.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+    finally:
+        cursor.close()
+
+def connect(path=DEFAULT_PATH, pragmas=None):
+    """
+    Open a sqlite3 connection with the shared settings.
+
+    Rows come back as ``sqlite3.Row``, as the Streamlit pages expect.
+
+    Args:
+        path (str): Database file (default: ``instance/wardrobe.db``)
+        pragmas (dict, optional): Overrides for ``PRAGMAS``
+
+    Returns:
+        sqlite3.Connection: Open connection
+    """
+    busy_timeout = {**PRAGMAS, **(pragmas or {})}['busy_timeout']
+    conn = sqlite3.connect(path, timeout=busy_timeout / 1000)
+    conn.row_factory = sqlite3.Row
+    apply_pragmas(conn, pragmas)
+    return conn
+
+def checkpoint(conn, mode='PASSIVE'):
+    """
+    Copy the WAL back into the database file.
+
+    ``PASSIVE`` never waits for readers or writers; ``TRUNCATE`` waits for
+    them and then empties the WAL file.
+
+    Returns:
+        tuple: ``(busy, wal_pages, checkpointed_pages)`` as reported by SQLite
+    """
+    return tuple(conn.execute(f'PRAGMA wal_checkpoint({mode})').fetchone())
+
+def start_checkpointer(path, interval, mode='TRUNCATE'):
+    """
+    Checkpoint a database's WAL every ``interval`` seconds on a daemon thread.
+
+    SQLite checkpoints on its own once the WAL passes 1000 pages, but those
+    passive checkpoints never wait for readers, so under a steady stream of
+    reads the WAL file is never reset and keeps growing. A scheduled
+    ``TRUNCATE`` checkpoint waits up to the busy timeout for readers to move
+    on and then empties it. Only one checkpointer runs per file and process
+    until stopped.
+
+    Returns:
+        threading.Event: Set it to stop the thread
+    """
+    path = os.path.abspath(path)
+    with _checkpointers_lock:
+        if path in _checkpointers and not _checkpointers[path].is_set():
+            return _checkpointers[path]
+        stop_event = _checkpointers[path] = threading.Event()
+
+    def run():
+        while not stop_event.wait(interval):
+            try:
+                conn = connect(path)
+                try:
+                    busy, wal_pages, checkpointed = checkpoint(conn, mode)
+                finally:
+                    conn.close()
+                if busy or checkpointed < wal_pages:
+                    logging.info(f'WAL checkpoint of {path} incomplete: {checkpointed}/{wal_pages} pages')
+            except sqlite3.Error as e:
+                logging.warning(f'WAL checkpoint of {path} failed: {e}')
+
+    threading.Thread(target=run, name='sqlite-checkpointer', daemon=True).start()
+    return stop_event
+
+def init_database(app, engine):
+    """
+    Apply the shared SQLite settings to every connection of the app's engine.
+
+    Overrides come from ``SQLITE_PRAGMAS``. Unless testing, the WAL is also
+    checkpointed every ``SQLITE_CHECKPOINT_INTERVAL`` seconds. Engines for
+    other databases are left alone.
+
+    Args:
+        app (Flask): Application whose config to use
+        engine (Engine): The app's SQLAlchemy engine
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+    pragmas = app.config.get('SQLITE_PRAGMAS')
+
+    @event.listens_for(engine, 'connect')
+    def _on_connect(dbapi_connection, connection_record):
+        apply_pragmas(dbapi_connection, pragmas)
+
+    path = engine.url.database
+    interval = app.config.get('SQLITE_CHECKPOINT_INTERVAL')
+    if path and path != ':memory:' and interval and not app.testing:
+        start_checkpointer(path, interval, app.config.get('SQLITE_CHECKPOINT_MODE', 'TRUNCATE'))
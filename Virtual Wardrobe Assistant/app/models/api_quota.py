@@ -0,0 +1,13 @@
+from app import db
+
+class ApiQuota(db.Model):
+    """Token bucket for an external API's call limit, shared by every worker process"""
+    __tablename__ = 'api_quotas'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), unique=True, nullable=False)  # e.g. 'openweathermap'
+    tokens = db.Column(db.Float, nullable=False)  # Calls available as of refilled_at
+    refilled_at = db.Column(db.Float, nullable=False)  # Unix time the tokens were last brought up to date
+    
+    def __repr__(self):
+        return f'<ApiQuota {self.name}: {self.tokens:.1f}>'
\ No newline at end of file
@@ -27,6 +27,9 @@ class Color(db.Model):
     def __repr__(self):
         return f'<Color {self.name}>'
 
+# Seasons every database starts with, in calendar order
+SEASONS = ('Spring', 'Summer', 'Fall', 'Winter')
+
 class Season(db.Model):
     __tablename__ = 'seasons'
     
@@ -44,6 +47,10 @@ clothing_season = db.Table('clothing_season',
 
 class ClothingItem(db.Model):
     __tablename__ = 'clothing_items'
+    __table_args__ = (
+        db.Index('ix_clothing_items_user_created', 'user_id', 'created_at'),
+        db.Index('ix_clothing_items_user_category', 'user_id', 'category_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -55,7 +62,7 @@ class ClothingItem(db.Model):
     weather_min_temp = db.Column(db.Float)  # Minimum temperature this is suitable for
     weather_max_temp = db.Column(db.Float)  # Maximum temperature this is suitable for
     is_waterproof = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # Keyset pages order on it
     
     # Foreign keys
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
@@ -66,6 +73,8 @@ class ClothingItem(db.Model):
     seasons = db.relationship('Season', secondary=clothing_season, backref=db.backref('clothing_items', lazy='dynamic'))
     outfit_items = db.relationship('OutfitItem', backref='clothing_item', lazy='dynamic')
     wear_logs = db.relationship('WearLog', backref='clothing_item', lazy='dynamic')
+    wear_stats = db.relationship('WearStats', backref='clothing_item', uselist=False,
+                                 cascade='all, delete-orphan')
     
     def __repr__(self):
         return f'<ClothingItem {self.name}>'
@@ -73,13 +82,16 @@ class ClothingItem(db.Model):
     @property
     def wear_count(self):
         """Return number of times this item has been worn"""
-        return self.wear_logs.count()
+        if '_wear_count' in self.__dict__:  # Filled in by with_wear()
+            return self._wear_count
+        return self.wear_stats.wear_count if self.wear_stats else 0
     
     @property
     def last_worn(self):
         """Return the date this item was last worn"""
-        last_log = self.wear_logs.order_by(db.desc('date')).first()
-        return last_log.date if last_log else None
+        if '_last_worn' in self.__dict__:
+            return self._last_worn
+        return self.wear_stats.last_worn if self.wear_stats else None
     
     def suitable_for_weather(self, temperature, is_raining=False):
         """Check if item is suitable for given weather conditions"""
@@ -0,0 +1,30 @@
+import json
+from datetime import datetime
+from app import db
+
+class DailySuggestion(db.Model):
+    """Outfit suggestions precomputed for a user, day and occasion"""
+    __tablename__ = 'daily_suggestions'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'date', 'occasion', name='uq_daily_suggestion'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date, nullable=False)
+    occasion = db.Column(db.String(100), nullable=False)
+    temperature = db.Column(db.Float)  # Temperature the suggestions were computed for
+    weather_condition = db.Column(db.String(50))
+    wardrobe_version = db.Column(db.Integer, nullable=False)  # User.wardrobe_version at compute time
+    plans = db.Column(db.Text, nullable=False)  # JSON list from suggestions_to_plans
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Foreign keys
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    
+    def __repr__(self):
+        return f'<DailySuggestion user {self.user_id} on {self.date} ({self.occasion})>'
+    
+    @property
+    def suggestion_plans(self):
+        """Return the stored suggestion plans as a list"""
+        return json.loads(self.plans)
@@ -0,0 +1,35 @@
+from datetime import datetime
+from app import db
+
+class Location(db.Model):
+    """A canonical place that weather is fetched and cached for"""
+    __tablename__ = 'locations'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(100), unique=True, nullable=False)  # "geo:<lat>,<lon>" or "text:<normalized name>"
+    name = db.Column(db.String(100))
+    country = db.Column(db.String(10))
+    latitude = db.Column(db.Float)  # Rounded, so nearby spellings share a row
+    longitude = db.Column(db.Float)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    aliases = db.relationship('LocationAlias', backref='location', lazy='dynamic',
+                              cascade='all, delete-orphan')
+    
+    def __repr__(self):
+        return f'<Location {self.key}>'
+
+class LocationAlias(db.Model):
+    """A normalized free-text location string and the place it resolved to"""
+    __tablename__ = 'location_aliases'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    alias = db.Column(db.String(200), unique=True, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Foreign keys
+    location_id = db.Column(db.Integer, db.ForeignKey('locations.id'), nullable=False)
+    
+    def __repr__(self):
+        return f'<LocationAlias {self.alias}>'
\ No newline at end of file
@@ -1,8 +1,18 @@
 from datetime import datetime
+from sqlalchemy import and_, case, func, select, update
+from sqlalchemy.orm import configure_mappers, selectinload
 from app import db
+from app.models.clothing import ClothingItem, Category
+
+# Categories that count as outer layers when checking rain protection
+OUTERWEAR_CATEGORIES = ('Jacket', 'Coat', 'Outerwear')
 
 class Outfit(db.Model):
     __tablename__ = 'outfits'
+    __table_args__ = (
+        db.Index('ix_outfits_envelope', 'user_id', 'occasion', 'derived_min_temp', 'derived_max_temp'),
+        db.Index('ix_outfits_user_created', 'user_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -12,7 +22,13 @@ class Outfit(db.Model):
     weather_min_temp = db.Column(db.Float)  # Minimum temperature this is suitable for
     weather_max_temp = db.Column(db.Float)  # Maximum temperature this is suitable for
     is_favorite = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # Keyset pages order on it
+    
+    # Derived from the outfit's items by refresh_envelope(), never edited by hand
+    derived_min_temp = db.Column(db.Float)  # Warmest of the items' minimum temperatures
+    derived_max_temp = db.Column(db.Float)  # Coldest of the items' maximum temperatures
+    rain_ready = db.Column(db.Boolean, nullable=False, default=False, server_default='0')  # Has waterproof outerwear
+    item_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     # Foreign keys
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
@@ -21,6 +37,10 @@ class Outfit(db.Model):
     outfit_items = db.relationship('OutfitItem', backref='outfit', lazy='dynamic', 
                                   cascade='all, delete-orphan')
     wear_logs = db.relationship('WearLog', backref='outfit', lazy='dynamic')
+    # Plain (non-dynamic) view of outfit_items so it can be eager loaded
+    layers = db.relationship('OutfitItem', viewonly=True, order_by='OutfitItem.layer_order')
+    wear_stats = db.relationship('WearStats', backref='outfit', uselist=False,
+                                 cascade='all, delete-orphan')
     
     def __repr__(self):
         return f'<Outfit {self.name}>'
@@ -28,36 +48,57 @@ class Outfit(db.Model):
     @property
     def wear_count(self):
         """Return number of times this outfit has been worn"""
-        return self.wear_logs.count()
+        if '_wear_count' in self.__dict__:  # Filled in by with_wear()
+            return self._wear_count
+        return self.wear_stats.wear_count if self.wear_stats else 0
     
     @property
     def last_worn(self):
         """Return the date this outfit was last worn"""
-        last_log = self.wear_logs.order_by(db.desc('date')).first()
-        return last_log.date if last_log else None
+        if '_last_worn' in self.__dict__:
+            return self._last_worn
+        return self.wear_stats.last_worn if self.wear_stats else None
+    
+    def refresh_envelope(self):
+        """
+        Recompute the derived columns from the outfit's current items.
+        
+        The derived temperature range is the intersection of the items' ranges
+        (unset bounds are ignored), and ``rain_ready`` is set when any outer
+        layer is waterproof. Runs one aggregate query; call it after the
+        outfit's items have been added to the session.
+        """
+        aggregates = _envelope_aggregates()
+        row = db.session.execute(_envelope_select(
+            [expression.label(name) for name, expression in aggregates.items()], self.id)).one()
+        self.derived_min_temp = row.derived_min_temp
+        self.derived_max_temp = row.derived_max_temp
+        self.rain_ready = bool(row.rain_ready)
+        self.item_count = row.item_count
     
     def suitable_for_weather(self, temperature, is_raining=False):
         """Check if outfit is suitable for given weather conditions"""
         temp_suitable = True
-        if self.weather_min_temp is not None and temperature < self.weather_min_temp:
-            temp_suitable = False
-        if self.weather_max_temp is not None and temperature > self.weather_max_temp:
-            temp_suitable = False
+        for min_temp in (self.weather_min_temp, self.derived_min_temp):
+            if min_temp is not None and temperature < min_temp:
+                temp_suitable = False
+        for max_temp in (self.weather_max_temp, self.derived_max_temp):
+            if max_temp is not None and temperature > max_temp:
+                temp_suitable = False
             
-        # Check if all necessary items are waterproof in case of rain
+        # Check if the outer layer is waterproof in case of rain
         rain_suitable = True
         if is_raining:
-            outer_items = [item.clothing_item for item in self.outfit_items 
-                          if item.clothing_item.category.name in ['Jacket', 'Coat', 'Outerwear']]
-            if outer_items:
-                rain_suitable = any(item.is_waterproof for item in outer_items)
-            else:
-                rain_suitable = False
+            rain_suitable = self.rain_ready
                 
         return temp_suitable and rain_suitable
 
 class OutfitItem(db.Model):
     __tablename__ = 'outfit_items'
+    __table_args__ = (
+        db.Index('ix_outfit_items_outfit', 'outfit_id', 'layer_order'),
+        db.Index('ix_outfit_items_item', 'clothing_item_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     layer_order = db.Column(db.Integer)  # Order of layering (1 = innermost)
@@ -67,4 +108,58 @@ class OutfitItem(db.Model):
     clothing_item_id = db.Column(db.Integer, db.ForeignKey('clothing_items.id'), nullable=False)
     
     def __repr__(self):
-        return f'<OutfitItem {self.id}>' 
\ No newline at end of file
+        return f'<OutfitItem {self.id}>'
+
+def outfit_layers_loader():
+    """
+    Loader profile for outfits whose items and item categories will be read.
+    
+    Loads every layer, its clothing item and the item's category for a whole
+    batch of outfits in a single extra statement, so walking
+    ``outfit.layers -> clothing_item -> category`` costs no further queries.
+    
+    Returns:
+        Loader option to pass to ``Query.options``
+    """
+    # OutfitItem.clothing_item is a backref, so it only exists once mapped
+    configure_mappers()
+    return (selectinload(Outfit.layers)
+            .joinedload(OutfitItem.clothing_item)
+            .joinedload(ClothingItem.category))
+
+def _envelope_aggregates():
+    """Aggregate expressions over an outfit's items, keyed by derived column name"""
+    outer_waterproof = and_(ClothingItem.is_waterproof.is_(True), Category.name.in_(OUTERWEAR_CATEGORIES))
+    return {
+        'derived_min_temp': func.max(ClothingItem.weather_min_temp),
+        'derived_max_temp': func.min(ClothingItem.weather_max_temp),
+        'rain_ready': func.coalesce(func.max(case((outer_waterproof, 1), else_=0)), 0),
+        'item_count': func.count(OutfitItem.id)
+    }
+
+def _envelope_select(columns, outfit_id):
+    """Select ``columns`` aggregated over the items of the outfit ``outfit_id``"""
+    return select(*columns).select_from(OutfitItem).join(
+        ClothingItem, ClothingItem.id == OutfitItem.clothing_item_id
+    ).outerjoin(
+        Category, Category.id == ClothingItem.category_id
+    ).where(OutfitItem.outfit_id == outfit_id)
+
+def refresh_outfit_envelopes(*criteria):
+    """
+    Recompute the derived columns of many outfits in one UPDATE.
+    
+    Used after a clothing item changes (for every outfit containing it) and
+    by the ``refresh-outfit-envelopes`` command. The caller commits.
+    
+    Args:
+        *criteria: Filters selecting the outfits to refresh (default: all)
+        
+    Returns:
+        int: Number of outfits updated
+    """
+    values = {name: _envelope_select([expression], Outfit.id).scalar_subquery()
+              for name, expression in _envelope_aggregates().items()}
+    result = db.session.execute(
+        update(Outfit).where(*criteria).values(**values).execution_options(synchronize_session=False))
+    return result.rowcount
@@ -16,6 +16,10 @@ class User(UserMixin, db.Model):
     location = db.Column(db.String(100))  # For weather-based recommendations
     style_preference = db.Column(db.String(50))  # casual, formal, sporty, etc.
     
+    # Bumped on every write to the user's items, outfits or wear logs so
+    # per-process caches can tell when their copy is out of date
+    wardrobe_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
     # Relationships
     clothing_items = db.relationship('ClothingItem', backref='owner', lazy='dynamic')
     outfits = db.relationship('Outfit', backref='owner', lazy='dynamic')
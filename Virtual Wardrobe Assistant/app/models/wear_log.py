@@ -3,6 +3,11 @@ from app import db
 
 class WearLog(db.Model):
     __tablename__ = 'wear_logs'
+    __table_args__ = (
+        db.Index('ix_wear_logs_item_date', 'clothing_item_id', 'date'),
+        db.Index('ix_wear_logs_outfit_date', 'outfit_id', 'date'),
+        db.Index('ix_wear_logs_user_date', 'user_id', 'date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     date = db.Column(db.Date, nullable=False, default=datetime.utcnow().date)
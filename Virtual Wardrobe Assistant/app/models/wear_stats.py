@@ -0,0 +1,169 @@
+from datetime import datetime
+from sqlalchemy import case, func
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+from app.models.wear_log import WearLog
+
+# INSERT constructs with ON CONFLICT support, by dialect
+_UPSERT_INSERTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+class WearStats(db.Model):
+    """Running wear totals for a single clothing item or outfit.
+
+    Rows are kept up to date by ``record_wear`` whenever wear logs are added,
+    so readers never have to aggregate ``wear_logs`` on the fly.
+    """
+    __tablename__ = 'wear_stats'
+
+    id = db.Column(db.Integer, primary_key=True)
+    wear_count = db.Column(db.Integer, nullable=False, default=0)
+    first_worn = db.Column(db.Date)
+    last_worn = db.Column(db.Date)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Foreign keys (exactly one of clothing_item_id / outfit_id is set)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    clothing_item_id = db.Column(db.Integer, db.ForeignKey('clothing_items.id'), unique=True)
+    outfit_id = db.Column(db.Integer, db.ForeignKey('outfits.id'), unique=True)
+
+    def __repr__(self):
+        target = f'item {self.clothing_item_id}' if self.clothing_item_id else f'outfit {self.outfit_id}'
+        return f'<WearStats {target}: {self.wear_count}>'
+
+    @classmethod
+    def by_item(cls, user_id):
+        """Return {clothing_item_id: WearStats} for all of a user's items in one query"""
+        rows = cls.query.filter(cls.user_id == user_id, cls.clothing_item_id.isnot(None)).all()
+        return {row.clothing_item_id: row for row in rows}
+
+    @classmethod
+    def by_outfit(cls, user_id):
+        """Return {outfit_id: WearStats} for all of a user's outfits in one query"""
+        rows = cls.query.filter(cls.user_id == user_id, cls.outfit_id.isnot(None)).all()
+        return {row.outfit_id: row for row in rows}
+
+def with_wear(query, limit=None):
+    """
+    Run a ``ClothingItem`` or ``Outfit`` query with wear totals filled in.
+
+    Each row's statistics are outer joined in the same SELECT, so reading
+    ``wear_count`` and ``last_worn`` on the returned objects runs no further
+    queries. The values are a snapshot: wears recorded afterwards show up
+    on objects loaded again.
+
+    Args:
+        query (Query): Query for one of the two models, without a limit
+        limit (int, optional): At most this many rows
+
+    Returns:
+        list: The model instances, in the query's order
+    """
+    model = query.column_descriptions[0]['entity']
+    query = query.outerjoin(model.wear_stats).add_columns(WearStats.wear_count, WearStats.last_worn)
+    if limit:
+        query = query.limit(limit)
+
+    results = []
+    for obj, wear_count, last_worn in query:
+        obj._wear_count = wear_count or 0
+        obj._last_worn = last_worn
+        results.append(obj)
+    return results
+
+def record_wear(*logs):
+    """
+    Update the wear statistics for newly created wear logs.
+
+    The caller owns the transaction: the statistics are written in the
+    session's transaction, so they are committed (or rolled back) together
+    with the logs.
+
+    A log with a clothing item counts towards that item. A log with only an
+    outfit counts towards the outfit; the per-item logs written alongside an
+    outfit wear carry the outfit id as well but are not counted twice.
+
+    The logs are totalled per item and outfit and folded in with one
+    ``INSERT ... ON CONFLICT DO UPDATE`` per kind, however many there are,
+    so concurrent first wears of the same item cannot both insert a row.
+
+    Args:
+        *logs (WearLog): The wear logs being added
+    """
+    items, outfits = {}, {}
+    for log in logs:
+        if log.clothing_item_id is not None:
+            totals, key = items, log.clothing_item_id
+        elif log.outfit_id is not None:
+            totals, key = outfits, log.outfit_id
+        else:
+            continue
+        day = log.date or datetime.utcnow().date()
+        row = totals.setdefault(key, {'user_id': log.user_id, 'wear_count': 0, 'first_worn': day, 'last_worn': day})
+        row['wear_count'] += 1
+        row['first_worn'] = min(row['first_worn'], day)
+        row['last_worn'] = max(row['last_worn'], day)
+
+    for column, totals in (('clothing_item_id', items), ('outfit_id', outfits)):
+        if totals:
+            now = datetime.utcnow()
+            db.session.execute(_upsert_statement(column), [
+                {column: key, 'updated_at': now, **row} for key, row in totals.items()
+            ])
+
+def _upsert_statement(column):
+    """Build the upsert adding wear totals to the stats row keyed on ``column``"""
+    statement = _UPSERT_INSERTS[db.session.get_bind().dialect.name](WearStats.__table__)
+    table, new = WearStats.__table__, statement.excluded
+    return statement.on_conflict_do_update(index_elements=[column], set_={
+        'wear_count': table.c.wear_count + new.wear_count,
+        'first_worn': case((table.c.first_worn.is_(None) | (new.first_worn < table.c.first_worn), new.first_worn),
+                           else_=table.c.first_worn),
+        'last_worn': case((table.c.last_worn.is_(None) | (new.last_worn > table.c.last_worn), new.last_worn),
+                          else_=table.c.last_worn),
+        'updated_at': new.updated_at
+    })
+
+def backfill_wear_stats():
+    """
+    Rebuild every wear statistics row from the full wear log history.
+
+    Returns:
+        int: Number of statistics rows written
+    """
+    WearStats.query.delete()
+
+    item_rows = db.session.query(
+        WearLog.clothing_item_id,
+        func.min(WearLog.user_id),
+        func.count(WearLog.id),
+        func.min(WearLog.date),
+        func.max(WearLog.date)
+    ).filter(
+        WearLog.clothing_item_id.isnot(None)
+    ).group_by(WearLog.clothing_item_id).all()
+
+    outfit_rows = db.session.query(
+        WearLog.outfit_id,
+        func.min(WearLog.user_id),
+        func.count(WearLog.id),
+        func.min(WearLog.date),
+        func.max(WearLog.date)
+    ).filter(
+        WearLog.outfit_id.isnot(None),
+        WearLog.clothing_item_id.is_(None)
+    ).group_by(WearLog.outfit_id).all()
+
+    stats = [
+        WearStats(clothing_item_id=item_id, user_id=user_id, wear_count=count,
+                  first_worn=first_worn, last_worn=last_worn)
+        for item_id, user_id, count, first_worn, last_worn in item_rows
+    ]
+    stats.extend(
+        WearStats(outfit_id=outfit_id, user_id=user_id, wear_count=count,
+                  first_worn=first_worn, last_worn=last_worn)
+        for outfit_id, user_id, count, first_worn, last_worn in outfit_rows
+    )
+
+    db.session.add_all(stats)
+    db.session.commit()
+    return len(stats)
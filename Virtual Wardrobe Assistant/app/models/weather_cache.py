@@ -0,0 +1,22 @@
+import json
+from datetime import datetime
+from app import db
+
+class WeatherCache(db.Model):
+    """Last weather fetched for a location, shared by every worker process"""
+    __tablename__ = 'weather_cache'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    location_key = db.Column(db.String(200), unique=True, nullable=False)  # Normalized location
+    location = db.Column(db.String(200))  # Location as first requested
+    data = db.Column(db.Text, nullable=False)  # JSON weather data
+    fetched_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    refresh_started_at = db.Column(db.DateTime)  # Set while one worker refreshes a stale entry
+    
+    def __repr__(self):
+        return f'<WeatherCache {self.location_key} at {self.fetched_at}>'
+    
+    @property
+    def weather_data(self):
+        """Return the cached weather as a dict"""
+        return json.loads(self.data)
\ No newline at end of file
@@ -0,0 +1,31 @@
+from datetime import datetime
+from app import db
+
+class WeatherForecast(db.Model):
+    """One forecast period for a canonical location: a provider step ('hourly') or a whole local day ('daily')"""
+    __tablename__ = 'weather_forecasts'
+    __table_args__ = (
+        db.UniqueConstraint('location_key', 'period', 'starts_at', name='uq_weather_forecast'),
+        db.Index('ix_weather_forecasts_day', 'location_key', 'period', 'local_date'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    location_key = db.Column(db.String(200), nullable=False)  # Canonical location key
+    period = db.Column(db.String(10), nullable=False)  # 'hourly' or 'daily'
+    starts_at = db.Column(db.DateTime, nullable=False)  # UTC
+    ends_at = db.Column(db.DateTime, nullable=False)  # UTC, exclusive
+    local_date = db.Column(db.Date, nullable=False)  # Date at the location
+    temperature = db.Column(db.Float)  # Celsius (daily: mean of the day's steps)
+    min_temp = db.Column(db.Float)
+    max_temp = db.Column(db.Float)
+    condition = db.Column(db.String(50))
+    description = db.Column(db.String(100))
+    humidity = db.Column(db.Float)
+    wind_speed = db.Column(db.Float)
+    rain_probability = db.Column(db.Float)  # 0-1
+    is_raining = db.Column(db.Boolean, default=False)
+    icon = db.Column(db.String(10))
+    fetched_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<WeatherForecast {self.location_key} {self.period} {self.starts_at}>'
\ No newline at end of file
@@ -0,0 +1,410 @@
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from flask import has_app_context
+from sqlalchemy import DateTime, bindparam, delete, func, select
+
+from app import db
+from app.models.clothing import Category, ClothingItem, Color, Season, clothing_season
+from app.models.outfit import Outfit, OutfitItem, refresh_outfit_envelopes
+from app.models.user import User
+from app.models.wear_log import WearLog
+from app.models.wear_stats import WearStats
+from app.services.pagination import after, decode_cursor, page_of, page_size
+from app.services.reference_data import get_reference_data
+
+# Season choice meaning "every season" in the Streamlit forms
+ALL_SEASONS = 'All Season'
+
+_users = User.__table__
+_items = ClothingItem.__table__
+_outfits = Outfit.__table__
+_outfit_items = OutfitItem.__table__
+_categories = Category.__table__
+_colors = Color.__table__
+_seasons = Season.__table__
+_wear_stats = WearStats.__table__
+
+# Statements are built once with named parameters; SQLAlchemy compiles each
+# shape once per process and every call only binds new values
+
+_USER_BY_USERNAME = select(_users).where(_users.c.username == bindparam('username'))
+
+_USER_BY_ID = select(_users).where(_users.c.id == bindparam('user_id'))
+
+_USER_TAKEN = select(_users.c.id).where(
+    (_users.c.username == bindparam('username')) | (_users.c.email == bindparam('email'))
+).limit(1)
+
+_ITEM_COUNT = select(func.count()).select_from(_items).where(_items.c.user_id == bindparam('user_id'))
+
+_OUTFIT_COUNT = select(func.count()).select_from(_outfits).where(_outfits.c.user_id == bindparam('user_id'))
+
+_ITEMS = select(
+    _items, _categories.c.name.label('category_name'), _colors.c.name.label('color_name'),
+    func.coalesce(_wear_stats.c.wear_count, 0).label('wear_count'), _wear_stats.c.last_worn
+).outerjoin(
+    _categories, _categories.c.id == _items.c.category_id
+).outerjoin(
+    _colors, _colors.c.id == _items.c.color_id
+).outerjoin(
+    _wear_stats, _wear_stats.c.clothing_item_id == _items.c.id
+).where(_items.c.user_id == bindparam('user_id'))
+
+_ITEM_SEASONS = select(clothing_season.c.clothing_id, _seasons.c.name).join(
+    _seasons, _seasons.c.id == clothing_season.c.season_id
+).where(clothing_season.c.clothing_id.in_(bindparam('item_ids', expanding=True))).order_by(_seasons.c.id)
+
+# Items linked to the named season
+_IN_SEASON = _items.c.id.in_(
+    select(clothing_season.c.clothing_id).join(_seasons, _seasons.c.id == clothing_season.c.season_id)
+    .where(_seasons.c.name == bindparam('season'))
+)
+
+# Items linked to every season
+_ALL_SEASONS = _items.c.id.in_(
+    select(clothing_season.c.clothing_id).group_by(clothing_season.c.clothing_id)
+    .having(func.count() == select(func.count()).select_from(_seasons).scalar_subquery())
+)
+
+_OUTFITS = select(
+    _outfits, func.coalesce(_wear_stats.c.wear_count, 0).label('wear_count'), _wear_stats.c.last_worn
+).outerjoin(
+    _wear_stats, _wear_stats.c.outfit_id == _outfits.c.id
+).where(_outfits.c.user_id == bindparam('user_id'))
+
+_OUTFIT_LAYERS = select(
+    _outfit_items.c.outfit_id, _outfit_items.c.clothing_item_id, _outfit_items.c.layer_order,
+    _items.c.name.label('item_name'), _categories.c.name.label('category_name')
+).join(
+    _items, _items.c.id == _outfit_items.c.clothing_item_id
+).outerjoin(
+    _categories, _categories.c.id == _items.c.category_id
+).where(
+    _outfit_items.c.outfit_id.in_(bindparam('outfit_ids', expanding=True))
+).order_by(_outfit_items.c.outfit_id, _outfit_items.c.layer_order, _outfit_items.c.id)
+
+# Position of the previous page's last row, for keyset paging
+_AFTER = (bindparam('after_created_at', type_=DateTime()), bindparam('after_id'))
+
+_app = None
+_app_lock = threading.Lock()
+
+@contextmanager
+def app_context():
+    """
+    Run repository calls inside an application context.
+
+    Within Flask the current app is used as is. The Streamlit pages get one
+    app per process, so they share its connection pool, SQLite settings and
+    change tracking with every other caller in that process.
+    """
+    if has_app_context():
+        yield
+        return
+
+    global _app
+    with _app_lock:
+        if _app is None:
+            from app import create_app
+            _app = create_app()
+    with _app.app_context():
+        yield
+
+def season_names(season):
+    """Expand a season choice into season names (``ALL_SEASONS`` means every season)"""
+    if season == ALL_SEASONS:
+        return [row.name for row in get_reference_data().seasons]
+    return [season] if season else []
+
+def season_label(names):
+    """Describe an item's seasons the way the Streamlit forms offer them"""
+    if names and len(names) == len(get_reference_data().seasons):
+        return ALL_SEASONS
+    return ', '.join(names) or None
+
+# Users
+
+def get_user(user_id):
+    """Return a user row as a dict, or None"""
+    row = db.session.execute(_USER_BY_ID, {'user_id': user_id}).mappings().first()
+    return dict(row) if row else None
+
+def get_user_by_username(username):
+    """Return a user row as a dict, or None"""
+    row = db.session.execute(_USER_BY_USERNAME, {'username': username}).mappings().first()
+    return dict(row) if row else None
+
+def create_user(username, email, password, location=None, style_preference=None):
+    """
+    Register a new user.
+
+    Returns:
+        int: The new user's ID, or None if the username or email is taken
+    """
+    if db.session.execute(_USER_TAKEN, {'username': username, 'email': email}).first():
+        return None
+    user = User(username, email, password, location=location, style_preference=style_preference)
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+# Dashboard
+
+def wardrobe_counts(user_id):
+    """Return ``(clothing item count, outfit count)`` for a user"""
+    params = {'user_id': user_id}
+    return (db.session.execute(_ITEM_COUNT, params).scalar(),
+            db.session.execute(_OUTFIT_COUNT, params).scalar())
+
+def recent_items(user_id, limit=5):
+    """Return a user's newest clothing items, newest first"""
+    return list_items(user_id, limit=limit)
+
+def recent_outfits(user_id, limit=5):
+    """Return a user's newest outfits as dicts, newest first"""
+    return list_outfits(user_id, limit=limit)
+
+# Clothing items
+
+def list_items(user_id, category=None, color=None, season=None, limit=None, order='recent'):
+    """
+    Return a user's clothing items as dicts, with names for their category and color.
+
+    Each dict also has ``seasons``, the item's season names, ``season``,
+    their ``season_label``, and the item's ``wear_count`` and ``last_worn``.
+
+    Args:
+        user_id (int): Owner
+        category (str, optional): Only this category (by name)
+        color (str, optional): Only this color (by name)
+        season (str, optional): Only items for this season; ``ALL_SEASONS`` means items for every season
+        limit (int, optional): At most this many items
+        order (str): 'recent' (newest first), 'category' (by category, then name) or 'random'
+
+    Returns:
+        list: One dict per item
+    """
+    statement, params = _filtered_items(user_id, category, color, season)
+    if order == 'category':
+        statement = statement.order_by(_categories.c.name, _items.c.name)
+    elif order == 'random':
+        statement = statement.order_by(func.random())
+    else:
+        statement = statement.order_by(_items.c.created_at.desc(), _items.c.id.desc())
+    if limit:
+        statement = statement.limit(bindparam('limit'))
+        params['limit'] = limit
+
+    items = [dict(row) for row in db.session.execute(statement, params).mappings()]
+    return _with_seasons(items)
+
+def item_page(user_id, cursor=None, size=None, category=None, color=None, season=None):
+    """
+    Return one newest-first page of a user's clothing items.
+
+    Takes the filters of ``list_items``; ``cursor`` is the previous page's
+    ``next_cursor`` and ``size`` defaults to ``PAGE_SIZE``.
+
+    Returns:
+        Page: Item dicts (as from ``list_items``) and the cursor for the next page
+
+    Raises:
+        ValueError: If the cursor is invalid
+    """
+    statement, params = _filtered_items(user_id, category, color, season)
+    page = _keyset_page(statement, params, _items, cursor, size)
+    _with_seasons(page.items)
+    return page
+
+def get_item(item_id, user_id):
+    """Return one of a user's clothing items as a dict (see ``list_items``), or None"""
+    row = db.session.execute(_ITEMS.where(_items.c.id == bindparam('item_id')),
+                             {'user_id': user_id, 'item_id': item_id}).mappings().first()
+    return _with_seasons([dict(row)])[0] if row else None
+
+def add_item(user_id, name, category_id, color_id, season=None, **fields):
+    """
+    Add a clothing item to a user's wardrobe.
+
+    Args:
+        user_id (int): Owner
+        name (str): Item name
+        category_id (int): Category
+        color_id (int): Color
+        season (str, optional): Season choice, see ``season_names``
+        **fields: Other ``ClothingItem`` columns (description, brand, occasion, ...)
+
+    Returns:
+        int: The new item's ID
+    """
+    item = ClothingItem(name=name, category_id=category_id, color_id=color_id, user_id=user_id, **fields)
+    item.seasons = _season_rows(season)
+    db.session.add(item)
+    db.session.commit()
+    return item.id
+
+def update_item(item_id, user_id, season=None, **fields):
+    """
+    Update one of a user's clothing items.
+
+    Outfits containing the item get their derived temperature range and
+    rain protection recomputed.
+
+    Returns:
+        bool: False if the item does not exist or belongs to someone else
+    """
+    item = db.session.get(ClothingItem, item_id)
+    if item is None or item.user_id != user_id:
+        return False
+
+    for name, value in fields.items():
+        setattr(item, name, value)
+    if season is not None:
+        item.seasons = _season_rows(season)
+
+    db.session.flush()
+    refresh_outfit_envelopes(Outfit.id.in_(
+        select(OutfitItem.outfit_id).where(OutfitItem.clothing_item_id == item.id)))
+    db.session.commit()
+    return True
+
+def delete_item(item_id, user_id):
+    """
+    Delete one of a user's clothing items and take it out of their outfits.
+
+    The item's wear logs go with it: left behind with a NULL item they would
+    read as outfit wears to ``backfill_wear_stats``.
+
+    Returns:
+        bool: False if the item does not exist or belongs to someone else
+    """
+    item = db.session.get(ClothingItem, item_id)
+    if item is None or item.user_id != user_id:
+        return False
+
+    outfit_ids = db.session.scalars(select(OutfitItem.outfit_id).where(OutfitItem.clothing_item_id == item_id)).all()
+    db.session.execute(delete(OutfitItem).where(OutfitItem.clothing_item_id == item_id))
+    db.session.execute(delete(WearLog).where(WearLog.clothing_item_id == item_id))
+    db.session.delete(item)
+    db.session.flush()
+    if outfit_ids:
+        refresh_outfit_envelopes(Outfit.id.in_(outfit_ids))
+    db.session.commit()
+    return True
+
+# Outfits
+
+def list_outfits(user_id, limit=None):
+    """Return a user's outfits as dicts with ``wear_count`` and ``last_worn``, newest first"""
+    statement = _OUTFITS.order_by(_outfits.c.created_at.desc(), _outfits.c.id.desc())
+    params = {'user_id': user_id}
+    if limit:
+        statement = statement.limit(bindparam('limit'))
+        params['limit'] = limit
+    return [dict(row) for row in db.session.execute(statement, params).mappings()]
+
+def outfit_page(user_id, cursor=None, size=None):
+    """
+    Return one newest-first page of a user's outfits (see ``item_page``).
+
+    Raises:
+        ValueError: If the cursor is invalid
+    """
+    return _keyset_page(_OUTFITS, {'user_id': user_id}, _outfits, cursor, size)
+
+def outfit_layers(outfit_ids):
+    """
+    Return the items of many outfits in one query.
+
+    Returns:
+        dict: {outfit ID: list of dicts with ``clothing_item_id``,
+        ``layer_order``, ``item_name`` and ``category_name``}, innermost layer first
+    """
+    layers = defaultdict(list)
+    if outfit_ids:
+        for row in db.session.execute(_OUTFIT_LAYERS, {'outfit_ids': list(outfit_ids)}).mappings():
+            layers[row['outfit_id']].append(dict(row))
+    return layers
+
+def create_outfit(user_id, name, item_ids, **fields):
+    """
+    Create an outfit from clothing items, layered in the order given.
+
+    Args:
+        user_id (int): Owner
+        name (str): Outfit name
+        item_ids (list): Clothing item IDs, innermost first
+        **fields: Other ``Outfit`` columns (description, occasion, season, ...)
+
+    Returns:
+        int: The new outfit's ID
+    """
+    outfit = Outfit(name=name, user_id=user_id, **fields)
+    db.session.add(outfit)
+    db.session.flush()
+    db.session.add_all([OutfitItem(outfit_id=outfit.id, clothing_item_id=item_id, layer_order=position)
+                        for position, item_id in enumerate(item_ids, start=1)])
+    db.session.flush()
+    outfit.refresh_envelope()
+    db.session.commit()
+    return outfit.id
+
+def delete_outfit(outfit_id, user_id):
+    """
+    Delete one of a user's outfits and its items.
+
+    Returns:
+        bool: False if the outfit does not exist or belongs to someone else
+    """
+    outfit = db.session.get(Outfit, outfit_id)
+    if outfit is None or outfit.user_id != user_id:
+        return False
+    db.session.delete(outfit)
+    db.session.commit()
+    return True
+
+def _filtered_items(user_id, category, color, season):
+    """Return the item statement and parameters for ``list_items``' filters"""
+    statement = _ITEMS
+    params = {'user_id': user_id}
+    if category:
+        statement = statement.where(_categories.c.name == bindparam('category'))
+        params['category'] = category
+    if color:
+        statement = statement.where(_colors.c.name == bindparam('color'))
+        params['color'] = color
+    if season == ALL_SEASONS:
+        statement = statement.where(_ALL_SEASONS)
+    elif season:
+        statement = statement.where(_IN_SEASON)
+        params['season'] = season
+    return statement, params
+
+def _keyset_page(statement, params, table, cursor, size):
+    """Run a statement for one newest-first page keyed on the table's ``(created_at, id)``"""
+    size = page_size(size)
+    if cursor:
+        statement = statement.where(after(table.c.created_at, table.c.id, _AFTER))
+        params['after_created_at'], params['after_id'] = decode_cursor(cursor)
+    statement = statement.order_by(table.c.created_at.desc(), table.c.id.desc()).limit(bindparam('limit'))
+    params['limit'] = size + 1
+    rows = [dict(row) for row in db.session.execute(statement, params).mappings()]
+    return page_of(rows, size, lambda row: (row['created_at'], row['id']))
+
+def _season_rows(season):
+    """Return the Season rows for a season choice"""
+    names = season_names(season)
+    return db.session.scalars(select(Season).where(Season.name.in_(names))).all() if names else []
+
+def _with_seasons(items):
+    """Add ``seasons`` and ``season`` to item dicts with one query for all of them"""
+    names = defaultdict(list)
+    if items:
+        for item_id, season in db.session.execute(_ITEM_SEASONS, {'item_ids': [item['id'] for item in items]}):
+            names[item_id].append(season)
+    for item in items:
+        item['seasons'] = names[item['id']]
+        item['season'] = season_label(item['seasons'])
+    return items
@@ -1,12 +1,14 @@
 from flask import Blueprint, render_template, current_app, request, jsonify
 from flask_login import login_required, current_user
 import requests
-from datetime import datetime
+from datetime import date, datetime
 
-from app.models.clothing import ClothingItem
-from app.models.outfit import Outfit
-from app.services.weather import get_weather_data
+from app import repository
+from app.services.forecast import weather_for
+from app.services.weather import get_weather_data, weather_cache_stats
 from app.services.outfit_suggester import suggest_outfits
+from app.services.suggestion_cache import suggestion_cache
+from app.services.suggestion_precompute import load_precomputed_suggestions
 
 main_bp = Blueprint('main', __name__)
 
@@ -22,29 +24,30 @@ def index():
 def dashboard():
     """User dashboard"""
     # Get some stats
-    total_items = ClothingItem.query.filter_by(user_id=current_user.id).count()
-    total_outfits = Outfit.query.filter_by(user_id=current_user.id).count()
+    total_items, total_outfits = repository.wardrobe_counts(current_user.id)
     
     # Get recent items and outfits
-    recent_items = ClothingItem.query.filter_by(user_id=current_user.id).order_by(
-        ClothingItem.created_at.desc()).limit(5).all()
-    recent_outfits = Outfit.query.filter_by(user_id=current_user.id).order_by(
-        Outfit.created_at.desc()).limit(5).all()
+    recent_items = repository.recent_items(current_user.id)
+    recent_outfits = repository.recent_outfits(current_user.id)
     
     # Get weather data if location is set
     weather_data = None
     if current_user.location:
         weather_data = get_weather_data(current_user.location)
     
-    # Get outfit suggestions based on weather and user preferences
+    # Get outfit suggestions based on weather and user preferences, preferring
+    # the ones precomputed overnight and computing inline only on a miss
     outfit_suggestions = []
     if weather_data:
-        outfit_suggestions = suggest_outfits(
-            current_user.id, 
-            temperature=weather_data.get('temperature'), 
-            weather_condition=weather_data.get('condition'),
-            occasion=request.args.get('occasion', 'casual')
-        )
+        occasion = request.args.get('occasion', 'casual')
+        outfit_suggestions = load_precomputed_suggestions(current_user.id, occasion, weather_data)
+        if outfit_suggestions is None:
+            outfit_suggestions = suggest_outfits(
+                current_user.id, 
+                temperature=weather_data.get('temperature'), 
+                weather_condition=weather_data.get('condition'),
+                occasion=occasion
+            )
     
     return render_template('dashboard.html',
                           total_items=total_items,
@@ -62,13 +65,26 @@ def about():
 @main_bp.route('/api/weather')
 @login_required
 def weather_api():
-    """API endpoint to get weather data"""
+    """API endpoint to get weather data, now or for a ?date= / UTC ?at= in the forecast window"""
     location = request.args.get('location', current_user.location)
     if not location:
         return jsonify({'error': 'No location provided'}), 400
     
-    weather_data = get_weather_data(location)
+    when = request.args.get('at', type=datetime.fromisoformat) or request.args.get('date', type=date.fromisoformat)
+    weather_data = weather_for(location, when)
     if not weather_data:
         return jsonify({'error': 'Could not retrieve weather data'}), 500
     
-    return jsonify(weather_data) 
\ No newline at end of file
+    return jsonify(weather_data) 
+
+@main_bp.route('/api/suggestion-cache')
+@login_required
+def suggestion_cache_stats():
+    """API endpoint exposing this process's suggestion cache counters"""
+    return jsonify(suggestion_cache.stats())
+
+@main_bp.route('/api/weather-cache')
+@login_required
+def weather_cache_metrics():
+    """API endpoint exposing this process's weather cache counters"""
+    return jsonify(weather_cache_stats())
\ No newline at end of file
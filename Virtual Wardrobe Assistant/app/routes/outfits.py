@@ -1,39 +1,31 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, abort
 from flask_login import login_required, current_user
-from datetime import datetime
+from datetime import date, datetime
 
 from app import db
-from app.models.clothing import ClothingItem, Category
+from app.models.clothing import ClothingItem
 from app.models.outfit import Outfit, OutfitItem
 from app.models.wear_log import WearLog
+from app.models.wear_stats import record_wear
 from app.forms.outfit import OutfitForm, WearOutfitForm
 from app.services.outfit_suggester import suggest_outfits
-from app.services.weather import get_weather_data
+from app.services.pagination import paginate
+from app.services.reference_data import get_reference_data
+from app.services.forecast import weather_for
 
 outfits_bp = Blueprint('outfits', __name__, url_prefix='/outfits')
 
 @outfits_bp.route('/')
 @login_required
 def index():
-    """Show all outfits"""
+    """Show one page of outfits, newest first"""
     # Get filter parameters
     occasion = request.args.get('occasion')
     season = request.args.get('season')
     is_favorite = request.args.get('favorite', type=bool)
     
-    # Base query
-    query = Outfit.query.filter_by(user_id=current_user.id)
-    
-    # Apply filters
-    if occasion:
-        query = query.filter_by(occasion=occasion)
-    if season:
-        query = query.filter_by(season=season)
-    if is_favorite is not None:
-        query = query.filter_by(is_favorite=is_favorite)
-    
-    # Execute query
-    outfits = query.order_by(Outfit.created_at.desc()).all()
+    # Execute query, with wear totals for every outfit on the page
+    page = outfits_page()
     
     # Get common occasions and seasons from existing outfits
     occasions = db.session.query(Outfit.occasion).filter(
@@ -49,13 +41,65 @@ def index():
     seasons = [s[0] for s in seasons if s[0]]
     
     return render_template('outfits/index.html',
-                          outfits=outfits,
+                          outfits=page.items,
+                          next_cursor=page.next_cursor,
                           occasions=occasions,
                           seasons=seasons,
                           selected_occasion=occasion,
                           selected_season=season,
                           is_favorite=is_favorite)
 
+@outfits_bp.route('/api/outfits')
+@login_required
+def outfits_api():
+    """API endpoint returning one page of outfits; pass next_cursor back as ?cursor= for the next"""
+    page = outfits_page()
+    return jsonify({
+        'outfits': [{
+            'id': outfit.id,
+            'name': outfit.name,
+            'occasion': outfit.occasion,
+            'season': outfit.season,
+            'is_favorite': bool(outfit.is_favorite),
+            'item_count': outfit.item_count,
+            'min_temp': outfit.derived_min_temp,
+            'max_temp': outfit.derived_max_temp,
+            'rain_ready': outfit.rain_ready,
+            'created_at': outfit.created_at.isoformat(),
+            'wear_count': outfit.wear_count,
+            'last_worn': outfit.last_worn.isoformat() if outfit.last_worn else None
+        } for outfit in page.items],
+        'next_cursor': page.next_cursor
+    })
+
+def outfits_page():
+    """
+    Return the page of the current user's outfits selected by the request.
+
+    Filters come from ``?occasion=``, ``?season=`` and ``?favorite=``, the
+    position from ``?cursor=`` and the size from ``?per_page=``. An invalid
+    cursor is a 400.
+    """
+    occasion = request.args.get('occasion')
+    season = request.args.get('season')
+    is_favorite = request.args.get('favorite', type=bool)
+    
+    # Base query
+    query = Outfit.query.filter_by(user_id=current_user.id)
+    
+    # Apply filters
+    if occasion:
+        query = query.filter_by(occasion=occasion)
+    if season:
+        query = query.filter_by(season=season)
+    if is_favorite is not None:
+        query = query.filter_by(is_favorite=is_favorite)
+    
+    try:
+        return paginate(query, request.args.get('cursor'), request.args.get('per_page', type=int))
+    except ValueError:
+        abort(400)
+
 @outfits_bp.route('/<int:outfit_id>')
 @login_required
 def detail(outfit_id):
@@ -100,21 +144,26 @@ def create():
         db.session.flush()  # Get ID for new outfit
         
         # Add outfit items
-        for item_id, layer_order in request.form.getlist('clothing_items'):
+        for item_data in request.form.getlist('clothing_items'):
+            item_id, layer_order = item_data.split(',')
             outfit_item = OutfitItem(
                 outfit_id=outfit.id,
-                clothing_item_id=item_id,
-                layer_order=layer_order
+                clothing_item_id=int(item_id),
+                layer_order=int(layer_order)
             )
             db.session.add(outfit_item)
         
+        # Derive temperature range and rain protection from the items
+        db.session.flush()
+        outfit.refresh_envelope()
+        
         db.session.commit()
         flash('Outfit created successfully!', 'success')
         return redirect(url_for('outfits.detail', outfit_id=outfit.id))
     
     # Get available clothing items for selection
     clothing_items = ClothingItem.query.filter_by(user_id=current_user.id).all()
-    categories = Category.query.all()
+    categories = get_reference_data().categories.rows
     
     return render_template('outfits/form.html', 
                           form=form, 
@@ -158,6 +207,10 @@ def edit(outfit_id):
             )
             db.session.add(outfit_item)
         
+        # Derive temperature range and rain protection from the items
+        db.session.flush()
+        outfit.refresh_envelope()
+        
         db.session.commit()
         flash('Outfit updated successfully!', 'success')
         return redirect(url_for('outfits.detail', outfit_id=outfit.id))
@@ -168,7 +221,7 @@ def edit(outfit_id):
     
     # Get available clothing items for selection
     clothing_items = ClothingItem.query.filter_by(user_id=current_user.id).all()
-    categories = Category.query.all()
+    categories = get_reference_data().categories.rows
     
     return render_template('outfits/form.html', 
                           form=form, 
@@ -234,29 +287,31 @@ def log_wear(outfit_id):
             user_id=current_user.id,
             outfit_id=outfit.id
         )
-        db.session.add(outfit_log)
         
         # Also log wear for each individual item in the outfit
-        for outfit_item in outfit.outfit_items:
-            item_log = WearLog(
+        item_logs = [
+            WearLog(
                 date=form.date.data,
                 user_id=current_user.id,
                 clothing_item_id=outfit_item.clothing_item_id,
                 outfit_id=outfit.id  # Link to the same outfit
             )
-            db.session.add(item_log)
+            for outfit_item in outfit.outfit_items.all()
+        ]
+        db.session.add_all([outfit_log] + item_logs)
+        record_wear(outfit_log, *item_logs)
         
         db.session.commit()
         flash('Wear logged successfully!', 'success')
         return redirect(url_for('outfits.detail', outfit_id=outfit.id))
     
-    # Default to today's date
+    # Default to the requested date, or today
     if request.method == 'GET':
-        form.date.data = datetime.now().date()
+        form.date.data = request.args.get('date', type=date.fromisoformat) or datetime.now().date()
         
-        # If location is set, try to get current weather
+        # If location is set, try to get the weather for that date
         if current_user.location:
-            weather = get_weather_data(current_user.location)
+            weather = weather_for(current_user.location, form.date.data)
             if weather:
                 form.weather_condition.data = weather.get('condition')
                 form.temperature.data = weather.get('temperature')
@@ -271,10 +326,13 @@ def suggest():
     occasion = request.args.get('occasion', 'casual')
     temperature = request.args.get('temperature', type=float)
     weather_condition = request.args.get('weather_condition')
+    color_scheme = request.args.get('color_scheme')
+    day = request.args.get('date', type=date.fromisoformat)
     
-    # If no temperature specified but location is set, try to get current weather
+    # If no temperature specified but location is set, try to get the weather
+    # for the requested date (current weather for today)
     if temperature is None and current_user.location:
-        weather = get_weather_data(current_user.location)
+        weather = weather_for(current_user.location, day)
         if weather:
             temperature = weather.get('temperature')
             weather_condition = weather.get('condition')
@@ -284,11 +342,14 @@ def suggest():
         current_user.id,
         temperature=temperature,
         weather_condition=weather_condition,
-        occasion=occasion
+        occasion=occasion,
+        color_scheme=color_scheme
     )
     
     return render_template('outfits/suggestions.html',
                           outfits=suggested_outfits,
                           temperature=temperature,
                           weather_condition=weather_condition,
-                          occasion=occasion) 
\ No newline at end of file
+                          occasion=occasion,
+                          color_scheme=color_scheme,
+                          date=day) 
\ No newline at end of file
@@ -1,15 +1,21 @@
 import os
 import uuid
 from datetime import datetime
-from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app
+from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app, jsonify, abort
 from flask_login import login_required, current_user
 from werkzeug.utils import secure_filename
 from PIL import Image
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
 
-from app import db
-from app.models.clothing import ClothingItem, Category, Color, Season
+from app import db, repository
+from app.models.clothing import ClothingItem, Category, Season
+from app.models.outfit import Outfit, OutfitItem, refresh_outfit_envelopes
 from app.models.wear_log import WearLog
+from app.models.wear_stats import record_wear
 from app.forms.clothing import ClothingItemForm, CategoryForm, WearLogForm
+from app.services.pagination import paginate
+from app.services.reference_data import get_reference_data
 
 wardrobe_bp = Blueprint('wardrobe', __name__, url_prefix='/wardrobe')
 
@@ -40,35 +46,21 @@ def save_image(file):
 @wardrobe_bp.route('/')
 @login_required
 def index():
-    """Show all clothing items in the wardrobe"""
+    """Show one page of the wardrobe's clothing items, newest first"""
     # Get filter parameters
     category_id = request.args.get('category', type=int)
     color_id = request.args.get('color', type=int)
     season_name = request.args.get('season')
     occasion = request.args.get('occasion')
+    reference = get_reference_data()
     
-    # Base query
-    query = ClothingItem.query.filter_by(user_id=current_user.id)
-    
-    # Apply filters
-    if category_id:
-        query = query.filter_by(category_id=category_id)
-    if color_id:
-        query = query.filter_by(color_id=color_id)
-    if season_name:
-        season = Season.query.filter_by(name=season_name).first()
-        if season:
-            query = query.filter(ClothingItem.seasons.contains(season))
-    if occasion:
-        query = query.filter_by(occasion=occasion)
-    
-    # Execute query
-    items = query.order_by(ClothingItem.created_at.desc()).all()
+    # Execute query, with wear totals for every item on the page
+    page = items_page()
     
     # Get all categories and colors for filter dropdowns
-    categories = Category.query.all()
-    colors = Color.query.all()
-    seasons = Season.query.all()
+    categories = reference.categories.rows
+    colors = reference.colors.rows
+    seasons = reference.seasons.rows
     
     # Get common occasions from existing items
     occasions = db.session.query(ClothingItem.occasion).filter(
@@ -78,7 +70,8 @@ def index():
     occasions = [o[0] for o in occasions if o[0]]
     
     return render_template('wardrobe/index.html', 
-                          items=items,
+                          items=page.items,
+                          next_cursor=page.next_cursor,
                           categories=categories,
                           colors=colors,
                           seasons=seasons,
@@ -88,6 +81,65 @@ def index():
                           selected_season=season_name,
                           selected_occasion=occasion)
 
+@wardrobe_bp.route('/api/items')
+@login_required
+def items_api():
+    """API endpoint returning one page of clothing items; pass next_cursor back as ?cursor= for the next"""
+    page = items_page()
+    reference = get_reference_data()
+    return jsonify({
+        'items': [{
+            'id': item.id,
+            'name': item.name,
+            'category': reference.categories.name_of(item.category_id),
+            'color': reference.colors.name_of(item.color_id),
+            'seasons': [season.name for season in item.seasons],
+            'brand': item.brand,
+            'occasion': item.occasion,
+            'image_filename': item.image_filename,
+            'weather_min_temp': item.weather_min_temp,
+            'weather_max_temp': item.weather_max_temp,
+            'is_waterproof': bool(item.is_waterproof),
+            'created_at': item.created_at.isoformat(),
+            'wear_count': item.wear_count,
+            'last_worn': item.last_worn.isoformat() if item.last_worn else None
+        } for item in page.items],
+        'next_cursor': page.next_cursor
+    })
+
+def items_page():
+    """
+    Return the page of the current user's items selected by the request.
+
+    Filters come from ``?category=``, ``?color=``, ``?season=`` and
+    ``?occasion=``, the position from ``?cursor=`` and the size from
+    ``?per_page=``. An invalid cursor is a 400.
+    """
+    category_id = request.args.get('category', type=int)
+    color_id = request.args.get('color', type=int)
+    season_name = request.args.get('season')
+    occasion = request.args.get('occasion')
+    
+    # Base query; seasons are loaded for the whole page in one query
+    query = ClothingItem.query.filter_by(user_id=current_user.id).options(selectinload(ClothingItem.seasons))
+    
+    # Apply filters
+    if category_id:
+        query = query.filter_by(category_id=category_id)
+    if color_id:
+        query = query.filter_by(color_id=color_id)
+    if season_name:
+        season = get_reference_data().seasons.named(season_name)
+        if season:
+            query = query.filter(ClothingItem.seasons.any(Season.id == season.id))
+    if occasion:
+        query = query.filter_by(occasion=occasion)
+    
+    try:
+        return paginate(query, request.args.get('cursor'), request.args.get('per_page', type=int))
+    except ValueError:
+        abort(400)
+
 @wardrobe_bp.route('/item/<int:item_id>')
 @login_required
 def item_detail(item_id):
@@ -111,9 +163,10 @@ def add_item():
     form = ClothingItemForm()
     
     # Populate select fields with database values
-    form.category_id.choices = [(c.id, c.name) for c in Category.query.order_by('name')]
-    form.color_id.choices = [(c.id, c.name) for c in Color.query.order_by('name')]
-    form.seasons.choices = [(s.id, s.name) for s in Season.query.order_by('name')]
+    reference = get_reference_data()
+    form.category_id.choices = reference.categories.choices()
+    form.color_id.choices = reference.colors.choices()
+    form.seasons.choices = reference.seasons.choices()
     
     if form.validate_on_submit():
         # Handle image upload
@@ -163,9 +216,10 @@ def edit_item(item_id):
     form = ClothingItemForm(obj=item)
     
     # Populate select fields with database values
-    form.category_id.choices = [(c.id, c.name) for c in Category.query.order_by('name')]
-    form.color_id.choices = [(c.id, c.name) for c in Color.query.order_by('name')]
-    form.seasons.choices = [(s.id, s.name) for s in Season.query.order_by('name')]
+    reference = get_reference_data()
+    form.category_id.choices = reference.categories.choices()
+    form.color_id.choices = reference.colors.choices()
+    form.seasons.choices = reference.seasons.choices()
     
     # Pre-select current seasons
     if request.method == 'GET':
@@ -202,6 +256,11 @@ def edit_item(item_id):
         selected_seasons = Season.query.filter(Season.id.in_(form.seasons.data)).all()
         item.seasons = selected_seasons
         
+        # Outfits containing this item may have a new temperature range or rain protection
+        db.session.flush()
+        refresh_outfit_envelopes(Outfit.id.in_(
+            select(OutfitItem.outfit_id).where(OutfitItem.clothing_item_id == item.id)))
+        
         db.session.commit()
         
         flash('Item updated successfully!', 'success')
@@ -229,9 +288,8 @@ def delete_item(item_id):
         except Exception as e:
             current_app.logger.error(f"Error removing image: {e}")
     
-    # Delete the item (cascade will handle related records)
-    db.session.delete(item)
-    db.session.commit()
+    # Delete the item, take it out of its outfits and refresh their envelopes
+    repository.delete_item(item.id, current_user.id)
     
     flash('Item deleted successfully.', 'success')
     return redirect(url_for('wardrobe.index'))
@@ -258,6 +316,7 @@ def log_wear(item_id):
             clothing_item_id=item.id
         )
         db.session.add(log)
+        record_wear(log)
         db.session.commit()
         
         flash('Wear logged successfully!', 'success')
@@ -281,5 +340,5 @@ def manage_categories():
         flash('Category added successfully!', 'success')
         return redirect(url_for('wardrobe.manage_categories'))
     
-    categories = Category.query.order_by(Category.name).all()
+    categories = get_reference_data().categories.rows
     return render_template('wardrobe/categories.html', form=form, categories=categories) 
\ No newline at end of file
@@ -0,0 +1,137 @@
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models.clothing import ClothingItem, Category, Color, Season
+from app.models.outfit import Outfit, OutfitItem
+from app.models.user import User
+from app.models.wear_log import WearLog
+from app.models.wear_stats import WearStats
+
+# Models whose rows make up a user's wardrobe
+WARDROBE_MODELS = (ClothingItem, Outfit, OutfitItem, WearLog, WearStats)
+
+# Small lookup tables shared by every user
+REFERENCE_MODELS = (Category, Color, Season)
+
+_wardrobe_listeners = []
+_reference_listeners = []
+
+def on_wardrobe_change(func):
+    """
+    Register a callback to run after a commit that changed wardrobe data.
+
+    The callback receives the set of affected user IDs. Can be used as a
+    decorator.
+    """
+    _wardrobe_listeners.append(func)
+    return func
+
+def on_reference_change(func):
+    """
+    Register a callback to run after a commit that changed reference data.
+
+    The callback receives the set of changed table names (``categories``,
+    ``colors``, ``seasons``). Can be used as a decorator.
+    """
+    _reference_listeners.append(func)
+    return func
+
+def wardrobe_version(user_id):
+    """Return the current wardrobe version for a user (0 if the user is unknown)"""
+    user = db.session.get(User, user_id)
+    return user.wardrobe_version if user else 0
+
+def _changed_user_ids(session):
+    """Collect the owners of every wardrobe row added, changed or deleted in this flush"""
+    user_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, WARDROBE_MODELS):
+            continue
+
+        if isinstance(obj, OutfitItem):
+            outfit = session.get(Outfit, obj.outfit_id) if obj.outfit_id else None
+            user_id = outfit.user_id if outfit else None
+        else:
+            user_id = obj.user_id
+
+        if user_id is not None:
+            user_ids.add(user_id)
+    return user_ids
+
+def _bump_versions(session, user_ids):
+    """Bump the wardrobe version of users not yet bumped in this transaction and note them for listeners"""
+    bumped = session.info.setdefault('bumped_wardrobes', set())
+    for user_id in user_ids - bumped:
+        user = session.get(User, user_id)
+        if user is not None and user not in session.deleted:
+            user.wardrobe_version = (user.wardrobe_version or 0) + 1
+            bumped.add(user_id)
+
+    if user_ids:
+        session.info.setdefault('changed_wardrobes', set()).update(user_ids)
+
+def _owners(model, whereclause):
+    """Select the distinct owners of the rows a bulk statement on ``model`` touches"""
+    if model is OutfitItem:
+        statement = select(Outfit.user_id).join(OutfitItem, OutfitItem.outfit_id == Outfit.id)
+    else:
+        statement = select(model.user_id)
+    if whereclause is not None:
+        statement = statement.where(whereclause)
+    return statement.distinct()
+
+@event.listens_for(Session, 'before_flush')
+def _record_changes(session, flush_context, instances):
+    """Bump User.wardrobe_version for every user whose wardrobe is being written
+    and note which reference tables are being written
+
+    Each user is bumped once per transaction, however many times it flushes,
+    so autoflushes do not UPDATE the users row again and again.
+    """
+    with session.no_autoflush:
+        _bump_versions(session, _changed_user_ids(session))
+
+    tables = {obj.__tablename__ for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+              if isinstance(obj, REFERENCE_MODELS)}
+    if tables:
+        session.info.setdefault('changed_reference', set()).update(tables)
+
+@event.listens_for(Session, 'do_orm_execute')
+def _record_bulk_changes(orm_execute_state):
+    """Bump versions for bulk UPDATE and DELETE statements, which never pass
+    through a flush (e.g. ``Query.delete()``, ``refresh_outfit_envelopes``)"""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or mapper.class_ not in WARDROBE_MODELS:
+        return
+
+    session = orm_execute_state.session
+    with session.no_autoflush:
+        user_ids = set(session.scalars(_owners(mapper.class_, orm_execute_state.statement.whereclause)))
+        _bump_versions(session, user_ids - {None})
+
+@event.listens_for(Session, 'after_commit')
+def _notify_listeners(session):
+    session.info.pop('bumped_wardrobes', None)
+    user_ids = session.info.pop('changed_wardrobes', None)
+    if user_ids:
+        for listener in _wardrobe_listeners:
+            listener(user_ids)
+
+    tables = session.info.pop('changed_reference', None)
+    if tables:
+        for listener in _reference_listeners:
+            listener(tables)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop('bumped_wardrobes', None)
+    session.info.pop('changed_wardrobes', None)
+    session.info.pop('changed_reference', None)
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _forget_bumps(session, previous_transaction):
+    """A rolled back savepoint may have taken a bump with it; bump again on the next flush"""
+    session.info.pop('bumped_wardrobes', None)
@@ -0,0 +1,128 @@
+import threading
+
+import numpy as np
+
+from app.services.reference_data import get_reference_data
+
+# Color schemes offered to users, one matrix each
+COLOR_SCHEMES = ('monochromatic', 'complementary', 'analogous')
+
+# Colors with a CIELAB chroma below this are treated as neutrals
+NEUTRAL_CHROMA = 12.0
+
+# Compatibility of a neutral with any other color
+NEUTRAL_SCORE = 0.8
+
+# Compatibility assumed for colors that are unknown or have no hex code
+UNKNOWN_SCORE = 0.5
+
+_harmony = None
+_lock = threading.Lock()
+
+def hex_to_lab(hex_codes):
+    """
+    Convert ``#RRGGBB`` strings to CIELAB (D65).
+
+    Args:
+        hex_codes (list[str]): Hex color codes
+
+    Returns:
+        ndarray: ``(n, 3)`` array of L*, a*, b*
+    """
+    rgb = np.array([[int(code[i:i + 2], 16) for i in (1, 3, 5)] for code in hex_codes],
+                   dtype=np.float64).reshape(-1, 3) / 255.0
+
+    # sRGB -> linear RGB -> XYZ
+    linear = np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+    xyz = linear @ np.array([
+        [0.4124564, 0.2126729, 0.0193339],
+        [0.3575761, 0.7151522, 0.1191920],
+        [0.1804375, 0.0721750, 0.9503041]
+    ])
+    xyz /= np.array([0.95047, 1.0, 1.08883])
+
+    # XYZ -> Lab
+    f = np.where(xyz > 216 / 24389, np.cbrt(xyz), (24389 / 27 * xyz + 16) / 116)
+    return np.stack([
+        116 * f[:, 1] - 16,
+        500 * (f[:, 0] - f[:, 1]),
+        200 * (f[:, 1] - f[:, 2])
+    ], axis=1)
+
+def _valid_hex(code):
+    if not code or len(code) != 7 or not code.startswith('#'):
+        return False
+    try:
+        int(code[1:], 16)
+    except ValueError:
+        return False
+    return True
+
+class ColorHarmony:
+    """
+    Precomputed pairwise color compatibility for each color scheme.
+
+    Every color is converted to CIELAB once. For each scheme a square matrix
+    holds the compatibility (0-1) of every pair of colors, with an extra last
+    row/column for unknown colors, so scoring a pair is a single array lookup.
+    """
+
+    def __init__(self, color_ids, lab, source=None):
+        self.source = source
+        self.color_ids = np.asarray(color_ids, dtype=np.int64)
+        self.lab = lab
+        self.unknown_code = len(self.color_ids)
+
+        chroma = np.hypot(lab[:, 1], lab[:, 2])
+        hue = np.degrees(np.arctan2(lab[:, 2], lab[:, 1])) % 360
+        hue_diff = np.abs(hue[:, None] - hue[None, :])
+        hue_diff = np.minimum(hue_diff, 360 - hue_diff)
+        neutral = chroma < NEUTRAL_CHROMA
+        either_neutral = neutral[:, None] | neutral[None, :]
+
+        chromatic_scores = {  # One per COLOR_SCHEMES entry
+            'monochromatic': np.exp(-(hue_diff / 20.0) ** 2),
+            'analogous': np.where(hue_diff <= 40, 1.0, np.exp(-((hue_diff - 40) / 20.0) ** 2)),
+            'complementary': np.exp(-((180 - hue_diff) / 30.0) ** 2)
+        }
+
+        self.matrices = {}
+        for scheme, scores in chromatic_scores.items():
+            matrix = np.full((self.unknown_code + 1, self.unknown_code + 1), UNKNOWN_SCORE, dtype=np.float32)
+            matrix[:-1, :-1] = np.where(either_neutral, NEUTRAL_SCORE, scores)
+            self.matrices[scheme] = matrix
+
+    @classmethod
+    def load(cls, reference_data):
+        """Build the harmony matrices from the cached colors table"""
+        colors = sorted((color.id, color.hex_code) for color in reference_data.colors
+                        if _valid_hex(color.hex_code))
+        lab = hex_to_lab([hex_code for _, hex_code in colors]) if colors else np.empty((0, 3))
+        return cls([color_id for color_id, _ in colors], lab, source=reference_data)
+
+    def codes_for(self, color_ids):
+        """Map color IDs to matrix indices (unknown colors map to ``unknown_code``)"""
+        color_ids = np.asarray(color_ids, dtype=np.int64)
+        if not len(self.color_ids):
+            return np.full(len(color_ids), self.unknown_code, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self.color_ids, color_ids), len(self.color_ids) - 1)
+        return np.where(self.color_ids[positions] == color_ids, positions, self.unknown_code)
+
+    def matrix(self, scheme):
+        """Return the compatibility matrix for a scheme name, or None for 'Any'/unknown"""
+        name = (scheme or '').lower()
+        return self.matrices.get(name) if name in COLOR_SCHEMES else None
+
+def get_harmony():
+    """
+    Return the process-wide color harmony.
+
+    The matrices are rebuilt whenever the reference data they were built
+    from has been reloaded, so they follow changes to the colors table.
+    """
+    global _harmony
+    reference_data = get_reference_data()
+    with _lock:
+        if _harmony is None or _harmony.source is not reference_data:
+            _harmony = ColorHarmony.load(reference_data)
+        return _harmony
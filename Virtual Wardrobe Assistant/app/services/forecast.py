@@ -0,0 +1,221 @@
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import and_, delete, func, insert, or_, select
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models.weather_forecast import WeatherForecast
+from app.services.locations import location_coordinates, location_key
+from app.services.single_flight import SingleFlight
+from app.services.weather import get_weather_data
+from app.services.weather_providers import DEFAULT_STEP, get_weather_provider
+
+# Days ahead covered by the provider's forecast
+FORECAST_DAYS = 5
+
+# Times this close to now are answered with current conditions
+CURRENT_WINDOW = timedelta(hours=1)
+
+# In-flight forecast fetches, per canonical location
+_forecast_flight = SingleFlight()
+
+def weather_for(location, when=None):
+    """
+    Get the weather for a location now, on a date or at a time
+
+    Today and times within the hour get current conditions from
+    ``get_weather_data``; anything else comes from the forecast store.
+
+    Args:
+        location (str): City, Country (e.g., "London, UK")
+        when (date or datetime, optional): Date at the location, or a naive UTC datetime
+
+    Returns:
+        dict: Weather data or None if unavailable
+    """
+    when = _naive_utc(when)
+    if when is None or _is_now(when):
+        return get_weather_data(location)
+    return conditions_at(location, when)
+
+def conditions_at(location, when):
+    """
+    Get forecast conditions for a location from the forecast store
+
+    A date returns the aggregate for that day at the location; a datetime
+    (naive UTC) returns the forecast step covering it. The store is filled
+    with one bulk fetch per location, so any date or time in the window is
+    answered locally. The fetch only happens here when the location's stored
+    forecast is older than ``FORECAST_TTL`` seconds and ``when`` is inside the
+    forecast window; concurrent callers share it. Past periods are kept for
+    ``FORECAST_RETENTION_DAYS``, so recent dates can still be looked up.
+
+    Args:
+        location (str): City, Country (e.g., "London, UK")
+        when (date or datetime): Date at the location, or a naive UTC datetime
+
+    Returns:
+        dict: Same fields as ``get_weather_data`` plus ``min_temp``,
+        ``max_temp``, ``rain_probability``, ``period``, ``starts_at``,
+        ``ends_at`` and ``date``, or None if the time is not covered
+    """
+    key = location_key(location)
+    if not key:
+        return None
+
+    when = _naive_utc(when)
+    fetched_at = forecast_fetch_times([key]).get(key)
+    ttl = current_app.config.get('FORECAST_TTL', 0)
+    if (fetched_at is None or (datetime.utcnow() - fetched_at).total_seconds() >= ttl) and _in_window(when):
+        _forecast_flight.do(key, refresh_forecast, location)
+
+    row = _read_period(key, when)
+    return _as_weather(location, row) if row else None
+
+def refresh_forecast(location):
+    """
+    Fetch a location's forecast from upstream and store it
+
+    Args:
+        location (str): City, Country (e.g., "London, UK")
+
+    Returns:
+        list: Stored forecast steps, or None if the fetch failed
+    """
+    key = location_key(location)
+    steps = fetch_forecast(location)
+    if steps and key:
+        _store_forecast(key, steps, datetime.utcnow())
+    return steps
+
+def forecast_fetch_times(keys):
+    """Return {location key: last forecast fetch} for the given keys that have a stored forecast"""
+    table = WeatherForecast.__table__
+    with db.engine.connect() as conn:
+        return dict(conn.execute(
+            select(table.c.location_key, func.max(table.c.fetched_at))
+            .where(table.c.location_key.in_(list(keys)))
+            .group_by(table.c.location_key)
+        ).all())
+
+def fetch_forecast(location):
+    """
+    Fetch the multi-day forecast for a location from the configured weather provider
+
+    Args:
+        location (str): City, Country (e.g., "London, UK")
+
+    Returns:
+        list: One dict per forecast step, oldest first, or None if failed
+    """
+    return get_weather_provider().forecast(location, location_coordinates(location))
+
+def _naive_utc(when):
+    """Convert an aware datetime to naive UTC; dates and naive datetimes pass through"""
+    if isinstance(when, datetime) and when.tzinfo is not None:
+        return when.astimezone(timezone.utc).replace(tzinfo=None)
+    return when
+
+def _is_now(when):
+    """True if ``when`` is today or within ``CURRENT_WINDOW`` of now"""
+    if isinstance(when, datetime):
+        return abs(when - datetime.utcnow()) < CURRENT_WINDOW
+    return when == date.today()
+
+def _in_window(when):
+    """True if a fetch made now could cover ``when``"""
+    if isinstance(when, datetime):
+        now = datetime.utcnow()
+        return now - DEFAULT_STEP <= when <= now + timedelta(days=FORECAST_DAYS)
+    today = date.today()
+    return today - timedelta(days=1) <= when <= today + timedelta(days=FORECAST_DAYS)
+
+def _read_period(key, when):
+    """Return the stored step covering a datetime, or the day row for a date"""
+    table = WeatherForecast.__table__
+    if isinstance(when, datetime):
+        criteria = (table.c.period == 'hourly', table.c.starts_at <= when, table.c.ends_at > when)
+    else:
+        criteria = (table.c.period == 'daily', table.c.local_date == when)
+    with db.engine.connect() as conn:
+        return conn.execute(
+            select(table).where(table.c.location_key == key, *criteria).order_by(table.c.starts_at.desc())
+        ).first()
+
+def _aggregate_day(steps):
+    """Summarize one local day's steps; the condition is the most common one, rain first"""
+    rainy = [step for step in steps if step['is_raining']]
+    condition = Counter(step['condition'] for step in rainy or steps).most_common(1)[0][0]
+    sample = next(step for step in steps if step['condition'] == condition)
+    return {
+        'period': 'daily',
+        'starts_at': min(step['starts_at'] for step in steps),
+        'ends_at': max(step['ends_at'] for step in steps),
+        'local_date': steps[0]['local_date'],
+        'temperature': round(sum(step['temperature'] for step in steps) / len(steps), 1),
+        'min_temp': min(step['min_temp'] for step in steps),
+        'max_temp': max(step['max_temp'] for step in steps),
+        'condition': condition,
+        'description': sample['description'],
+        'humidity': round(sum(step['humidity'] for step in steps) / len(steps), 1),
+        'wind_speed': max(step['wind_speed'] for step in steps),
+        'rain_probability': max(step['rain_probability'] or 0 for step in steps),
+        'is_raining': bool(rainy),
+        'icon': sample['icon']
+    }
+
+def _store_forecast(key, steps, fetched_at):
+    """
+    Replace a location's forecast from the first new step on, in one transaction
+
+    Steps before the new forecast starts are kept (until
+    ``FORECAST_RETENTION_DAYS``), and day rows are rebuilt from every stored
+    step of their day, so today's row still covers its earlier hours.
+    """
+    table = WeatherForecast.__table__
+    dates = {step['local_date'] for step in steps}
+    cutoff = fetched_at - timedelta(days=current_app.config.get('FORECAST_RETENTION_DAYS', 7))
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(delete(table).where(
+                table.c.location_key == key,
+                or_(table.c.ends_at < cutoff,
+                    and_(table.c.period == 'hourly', table.c.starts_at >= steps[0]['starts_at']),
+                    and_(table.c.period == 'daily', table.c.local_date.in_(dates)))
+            ))
+            conn.execute(insert(table), [dict(step, location_key=key, fetched_at=fetched_at) for step in steps])
+
+            days = defaultdict(list)
+            for row in conn.execute(select(table).where(
+                    table.c.location_key == key,
+                    table.c.period == 'hourly',
+                    table.c.local_date.in_(dates)
+            ).order_by(table.c.starts_at)).mappings():
+                days[row['local_date']].append(row)
+            conn.execute(insert(table), [dict(_aggregate_day(day_steps), location_key=key, fetched_at=fetched_at)
+                                         for day_steps in days.values()])
+    except IntegrityError:
+        # Another worker stored the same forecast at the same moment
+        pass
+
+def _as_weather(location, row):
+    """Turn a stored forecast row into a weather data dict"""
+    return {
+        'location': location,
+        'temperature': row.temperature,
+        'min_temp': row.min_temp,
+        'max_temp': row.max_temp,
+        'condition': row.condition,
+        'description': row.description,
+        'humidity': row.humidity,
+        'wind_speed': row.wind_speed,
+        'is_raining': bool(row.is_raining),
+        'rain_probability': row.rain_probability,
+        'icon': row.icon,
+        'period': row.period,
+        'starts_at': row.starts_at.isoformat(),
+        'ends_at': row.ends_at.isoformat(),
+        'date': row.local_date.isoformat()
+    }
@@ -0,0 +1,75 @@
+from sqlalchemy import column, func, insert, inspect, select, table
+
+from app import db
+from app.models.clothing import SEASONS, Season, clothing_season
+from app.models.outfit import refresh_outfit_envelopes
+from app.models.wear_stats import backfill_wear_stats
+from app.repository import ALL_SEASONS
+
+# Tables created by the original init_db.py, parents first
+LEGACY_TABLES = ('users', 'categories', 'colors', 'clothing_items', 'outfits', 'outfit_items', 'wear_logs')
+
+def is_legacy_schema(engine):
+    """True if the database was created by the original ``init_db.py`` (``season`` text, ``image_path``)"""
+    inspector = inspect(engine)
+    if not inspector.has_table('clothing_items'):
+        return False
+    return 'image_path' in {c['name'] for c in inspector.get_columns('clothing_items')}
+
+def upgrade_legacy_schema():
+    """
+    Move a database created by the original ``init_db.py`` onto the models' schema.
+
+    Each legacy table is renamed, recreated from the models and its rows
+    copied across: ``image_path`` becomes ``image_filename``, the free-text
+    ``season`` of each clothing item becomes rows in ``clothing_season``
+    ("All Season" links every season) and wear log timestamps become dates.
+    Outfit envelopes and wear statistics are then rebuilt. The caller
+    stamps the migration revision afterwards.
+
+    Returns:
+        dict: Rows copied per table
+    """
+    engine = db.engine
+    legacy_columns = {name: [c['name'] for c in inspect(engine).get_columns(name)] for name in LEGACY_TABLES}
+    counts = {}
+
+    with engine.begin() as conn:
+        # The legacy indexes would clash with the models' index names
+        for (name,) in conn.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL "
+                f"AND tbl_name IN ({', '.join('?' * len(LEGACY_TABLES))})", LEGACY_TABLES).all():
+            conn.exec_driver_sql(f'DROP INDEX "{name}"')
+        for name in LEGACY_TABLES:
+            conn.exec_driver_sql(f'ALTER TABLE "{name}" RENAME TO "legacy_{name}"')
+
+        db.metadata.create_all(conn)
+
+        for name in LEGACY_TABLES:
+            target = db.metadata.tables[name]
+            legacy = table(f'legacy_{name}', *[column(c) for c in legacy_columns[name]])
+            sources = {c: legacy.c[c] for c in legacy_columns[name] if c in target.c}
+            if name == 'clothing_items':
+                sources['image_filename'] = legacy.c.image_path
+            elif name == 'wear_logs':
+                sources['date'] = func.date(legacy.c.date)
+            counts[name] = conn.execute(insert(target).from_select(list(sources), select(*sources.values()))).rowcount
+
+        conn.execute(insert(Season.__table__), [{'name': name} for name in SEASONS])
+        season_ids = dict(conn.execute(select(Season.__table__.c.name, Season.__table__.c.id)).all())
+        links = []
+        legacy_items = table('legacy_clothing_items', column('id'), column('season'))
+        for item_id, season in conn.execute(select(legacy_items.c.id, legacy_items.c.season)):
+            names = SEASONS if season == ALL_SEASONS else [part.strip().title() for part in (season or '').split(',')]
+            links += [{'clothing_id': item_id, 'season_id': season_ids[n]} for n in names if n in season_ids]
+        if links:
+            conn.execute(insert(clothing_season), links)
+        counts['clothing_season'] = len(links)
+
+        for name in reversed(LEGACY_TABLES):
+            conn.exec_driver_sql(f'DROP TABLE "legacy_{name}"')
+
+    refresh_outfit_envelopes()
+    backfill_wear_stats()
+    db.session.commit()
+    return counts
@@ -0,0 +1,146 @@
+import logging
+import threading
+from collections import OrderedDict, namedtuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models.location import Location, LocationAlias
+from app.services.single_flight import SingleFlight
+from app.services.weather_client import WeatherUnavailable
+from app.services.weather_providers import get_weather_provider
+
+# Decimal places kept from geocoded coordinates (2 places is roughly 1 km)
+COORDINATE_PRECISION = 2
+
+# Resolved aliases remembered per process
+MAX_RESOLVED = 4096
+
+# Read-only copy of a location row; ``id`` is None when it was not stored
+LocationRef = namedtuple('LocationRef', ['id', 'key', 'name', 'country', 'latitude', 'longitude'])
+
+_resolved = OrderedDict()
+_lock = threading.Lock()
+
+# In-flight lookups, so concurrent first requests for an alias geocode it once
+_resolve_flight = SingleFlight()
+
+def normalize_location(location):
+    """
+    Reduce a free-text location to its alias form.
+
+    Case, surrounding whitespace and spacing around commas are ignored, so
+    "London, UK", "london,uk" and " LONDON ,  UK" are the same alias.
+    """
+    parts = [' '.join(part.split()) for part in (location or '').lower().split(',')]
+    return ','.join(part for part in parts if part)
+
+def resolve_location(location):
+    """
+    Map a free-text location to its canonical place.
+
+    Each distinct alias is geocoded once and the result stored in
+    ``location_aliases``; aliases that geocode to the same rounded
+    coordinates share one ``locations`` row, so "New York, USA",
+    "new york" and "NYC" end up with the same key. Without a weather API
+    key, or when the geocoder does not know the place, the alias itself
+    becomes the key. Geocoder outages are not stored, so the alias is
+    retried on a later call.
+
+    Args:
+        location (str): Location as typed by the user
+
+    Returns:
+        LocationRef: Canonical location, or None for an empty string
+    """
+    alias = normalize_location(location)
+    if not alias:
+        return None
+
+    with _lock:
+        ref = _resolved.get(alias)
+        if ref is not None:
+            _resolved.move_to_end(alias)
+            return ref
+
+    try:
+        ref = _resolve_flight.do(alias, _lookup, alias, location)
+    except WeatherUnavailable as e:
+        logging.warning(f"Geocoding unavailable for {location}: {e}")
+        return LocationRef(None, f'text:{alias}', location, None, None, None)
+
+    with _lock:
+        _resolved[alias] = ref
+        while len(_resolved) > MAX_RESOLVED:
+            _resolved.popitem(last=False)
+    return ref
+
+def location_key(location):
+    """Return the canonical cache key for a free-text location ('' if empty)"""
+    ref = resolve_location(location)
+    return ref.key if ref else ''
+
+def location_coordinates(location):
+    """Return ``(latitude, longitude)`` for a geocoded location, else None"""
+    ref = resolve_location(location)
+    if ref is not None and ref.latitude is not None:
+        return ref.latitude, ref.longitude
+    return None
+
+def _lookup(alias, location):
+    """Return the stored location for an alias, geocoding and storing it if new"""
+    return _stored_location(alias) or _store_location(alias, _geocode(location))
+
+def _stored_location(alias):
+    """Return the stored location for an alias, or None"""
+    table = Location.__table__
+    aliases = LocationAlias.__table__
+    with db.engine.connect() as conn:
+        row = conn.execute(
+            select(table.c.id, table.c.key, table.c.name, table.c.country, table.c.latitude, table.c.longitude)
+            .join(aliases, aliases.c.location_id == table.c.id)
+            .where(aliases.c.alias == alias)
+        ).first()
+    return LocationRef(*row) if row else None
+
+def _geocode(location):
+    """
+    Look a location up with the configured weather provider's geocoder.
+
+    Returns:
+        dict: ``name``, ``country``, and rounded ``latitude`` and
+        ``longitude``, or None if the place is unknown (or the provider has
+        no geocoder)
+
+    Raises:
+        WeatherUnavailable: The geocoder could not be reached
+    """
+    place = get_weather_provider().geocode(location)
+    if place is None:
+        return None
+    return dict(place,
+                latitude=round(place['latitude'], COORDINATE_PRECISION),
+                longitude=round(place['longitude'], COORDINATE_PRECISION))
+
+def _store_location(alias, place):
+    """Find or create the location for a geocoded place (or bare alias) and record the alias"""
+    if place is None:
+        key = f'text:{alias}'
+        place = {'name': alias, 'country': None, 'latitude': None, 'longitude': None}
+    else:
+        key = f"geo:{place['latitude']:.{COORDINATE_PRECISION}f},{place['longitude']:.{COORDINATE_PRECISION}f}"
+
+    table = Location.__table__
+    aliases = LocationAlias.__table__
+    try:
+        with db.engine.begin() as conn:
+            location_id = conn.execute(select(table.c.id).where(table.c.key == key)).scalar()
+            if location_id is None:
+                location_id = conn.execute(insert(table).values(key=key, **place)).inserted_primary_key[0]
+            conn.execute(insert(aliases).values(alias=alias, location_id=location_id))
+    except IntegrityError:
+        # Another worker resolved the same alias or place at the same moment
+        return _stored_location(alias) or LocationRef(None, key, place['name'], place['country'],
+                                                      place['latitude'], place['longitude'])
+    return LocationRef(location_id, key, place['name'], place['country'], place['latitude'], place['longitude'])
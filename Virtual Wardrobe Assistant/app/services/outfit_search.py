@@ -0,0 +1,107 @@
+import heapq
+
+import numpy as np
+
+# Days without wear after which an item counts as fully "fresh"
+FRESHNESS_HORIZON_DAYS = 60
+
+# Upper bound on random tie-breaking noise added when a seed is given
+SEED_JITTER = 0.05
+
+def item_scores(days_since_worn, seed=None):
+    """
+    Score items for inclusion in a generated outfit.
+
+    Items score higher the longer they have gone unworn, saturating at
+    ``FRESHNESS_HORIZON_DAYS`` (never-worn items score 1.0). With a seed, a
+    small reproducible jitter is added so equally fresh items rotate between
+    seeds instead of always resolving the same way.
+
+    Args:
+        days_since_worn (ndarray): Days since each item was last worn (inf = never)
+        seed (int, optional): Seed for the tie-breaking jitter
+
+    Returns:
+        ndarray[float64]: One score per item
+    """
+    scores = np.minimum(days_since_worn, FRESHNESS_HORIZON_DAYS) / FRESHNESS_HORIZON_DAYS
+    if seed is not None:
+        rng = np.random.default_rng(seed)
+        scores = scores + rng.uniform(0, SEED_JITTER, len(scores))
+    return scores
+
+def _top_candidates(rows, scores, count):
+    """Return up to ``count`` rows with the highest scores, best first (ties by row)"""
+    if len(rows) > count:
+        keep = np.argpartition(-scores[rows], count - 1)[:count]
+        rows = rows[keep]
+    order = np.lexsort((rows, -scores[rows]))
+    return rows[order]
+
+def search_outfits(slot_rows, scores, k, pair_score=None, per_slot=None, beam_width=None):
+    """
+    Find the ``k`` best distinct outfits that fill every slot with one item.
+
+    Each slot is first pruned to its ``per_slot`` best-scoring candidates, then
+    a beam search fills the slots in order keeping the ``beam_width`` best
+    partial outfits. The work done is bounded by
+    ``len(slot_rows) * beam_width * per_slot`` regardless of wardrobe size, and
+    with purely additive scores (no ``pair_score``) the result is exact.
+
+    Args:
+        slot_rows (list[ndarray]): Candidate row indices for each slot
+        scores (ndarray): Score for every row
+        k (int): Number of outfits to return
+        pair_score (callable, optional): ``pair_score(chosen_rows, rows)`` returning an
+            array of bonuses for adding each of ``rows`` to a partial outfit made
+            of ``chosen_rows``
+        per_slot (int, optional): Candidates kept per slot (default: max(k, 8))
+        beam_width (int, optional): Partial outfits kept per step (default: max(4 * k, 32))
+
+    Returns:
+        list: ``(score, rows)`` tuples, best first; empty if any slot has no candidates
+    """
+    if k <= 0 or not slot_rows or any(len(rows) == 0 for rows in slot_rows):
+        return []
+
+    per_slot = per_slot or max(k, 8)
+    beam_width = beam_width or max(4 * k, 32)
+    candidates = [_top_candidates(np.asarray(rows), scores, per_slot) for rows in slot_rows]
+
+    beam = [(0.0, ())]
+    for slot_candidates in candidates:
+        expanded = []
+        for score, chosen in beam:
+            new_scores = score + scores[slot_candidates]
+            if pair_score is not None and chosen:
+                new_scores = new_scores + pair_score(chosen, slot_candidates)
+            for row, new_score in zip(slot_candidates.tolist(), new_scores.tolist()):
+                if row not in chosen:
+                    expanded.append((new_score, chosen + (row,)))
+
+        # Best scores first; ties resolve on the row tuple so results are stable
+        beam = heapq.nsmallest(beam_width, expanded, key=lambda entry: (-entry[0], entry[1]))
+        if not beam:
+            return []
+
+    return beam[:k]
+
+def harmony_pair_score(matrix, color_codes, weight):
+    """
+    Build a ``pair_score`` for ``search_outfits`` from a color compatibility matrix.
+
+    The bonus for adding an item is ``weight`` times its mean compatibility
+    with the items already chosen, looked up from the precomputed matrix.
+
+    Args:
+        matrix (ndarray): Square compatibility matrix indexed by color code
+        color_codes (ndarray): Matrix index for every row
+        weight (float): Scale of the bonus relative to item scores
+
+    Returns:
+        callable: ``pair_score(chosen_rows, rows) -> ndarray``
+    """
+    def pair_score(chosen, rows):
+        chosen_codes = color_codes[list(chosen)]
+        return weight * matrix[np.ix_(chosen_codes, color_codes[rows])].mean(axis=0)
+    return pair_score
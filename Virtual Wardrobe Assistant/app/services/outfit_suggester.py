@@ -1,70 +1,105 @@
-from datetime import datetime, timedelta
-from sqlalchemy import func
-from app import db
-from app.models.clothing import ClothingItem, Category
-from app.models.outfit import Outfit, OutfitItem
-from app.models.wear_log import WearLog
-import random
+from datetime import date, datetime
+from flask import current_app
+from sqlalchemy.orm import joinedload
+import numpy as np
+from app.models.clothing import ClothingItem
+from app.models.outfit import Outfit, OutfitItem, OUTERWEAR_CATEGORIES, outfit_layers_loader
+from app.models.wear_stats import WearStats
+from app.services.change_tracking import wardrobe_version
+from app.services.color_harmony import get_harmony
+from app.services.outfit_search import harmony_pair_score, item_scores, search_outfits
+from app.services.suggestion_cache import suggestion_cache, temperature_bucket
+from app.services.suitability_index import get_suitability_index
+from app.services.wardrobe_snapshot import get_snapshot
 
-def suggest_outfits(user_id, temperature=None, weather_condition=None, occasion='casual', limit=5):
+# Weight of color harmony relative to item freshness when scoring outfits
+HARMONY_WEIGHT = 0.5
+
+# Slots an outfit must fill for each occasion; an item from any of a slot's
+# categories fills it
+OCCASION_SLOTS = {
+    'casual': [('T-shirt', 'Shirt', 'Tops'), ('Jeans', 'Pants', 'Shorts', 'Bottoms')],
+    'formal': [('Dress Shirt', 'Blouse', 'Tops'), ('Slacks', 'Bottoms'), ('Suit', 'Blazer')],
+    'business': [('Shirt', 'Blouse', 'Tops'), ('Slacks', 'Skirt', 'Bottoms'), ('Blazer',)],
+    'sporty': [('T-shirt', 'Sports Bra', 'Tops'), ('Shorts', 'Sweatpants', 'Bottoms')]
+}
+
+def suggest_outfits(user_id, temperature=None, weather_condition=None, occasion='casual', limit=5, seed=None,
+                    color_scheme=None):
     """
     Suggest outfits based on various criteria
     
+    Results are cached per (user, temperature bucket, rain, occasion) until the
+    user's wardrobe changes. With caching enabled the temperature is rounded
+    to its bucket (``SUGGESTION_CACHE_TEMP_BUCKET`` degrees) before matching,
+    so every request in the same bucket gets the same answer.
+    
     Args:
         user_id (int): User ID
         temperature (float, optional): Current temperature in Celsius
         weather_condition (str, optional): Current weather condition
         occasion (str, optional): Occasion to dress for
         limit (int, optional): Maximum number of suggestions to return
+        seed (int, optional): Seed for reproducible generated outfits
+        color_scheme (str, optional): Monochromatic, Complementary or Analogous
         
     Returns:
         list: Suggested outfits with reasoning
     """
-    # Start with existing outfits that the user has created
-    outfit_query = Outfit.query.filter_by(user_id=user_id)
+    cache_size = current_app.config.get('SUGGESTION_CACHE_SIZE', 0)
+    if not cache_size:
+        return compute_suggestions(user_id, temperature, weather_condition, occasion, limit, seed,
+                                   color_scheme)
     
-    # Filter by occasion if specified
-    if occasion:
-        outfit_query = outfit_query.filter_by(occasion=occasion)
+    temperature = temperature_bucket(temperature, current_app.config.get('SUGGESTION_CACHE_TEMP_BUCKET'))
+    is_raining = bool(weather_condition and 'rain' in weather_condition.lower())
+    key = (user_id, temperature, is_raining, occasion, limit, seed, color_scheme, date.today())
+    version = wardrobe_version(user_id)
     
-    # Filter by temperature if provided
-    is_raining = weather_condition and 'rain' in weather_condition.lower()
-    if temperature is not None:
-        outfit_query = outfit_query.filter(
-            (Outfit.weather_min_temp.is_(None) | (Outfit.weather_min_temp <= temperature)),
-            (Outfit.weather_max_temp.is_(None) | (Outfit.weather_max_temp >= temperature))
-        )
+    plans = suggestion_cache.get(key, version)
+    if plans is not None:
+        return suggestions_from_plans(plans)
     
-    # Get all matching outfits
-    existing_outfits = outfit_query.all()
+    suggestions = compute_suggestions(user_id, temperature, weather_condition, occasion, limit, seed,
+                                      color_scheme)
+    suggestion_cache.put(key, version, suggestions_to_plans(suggestions), cache_size)
+    return suggestions
+
+def compute_suggestions(user_id, temperature=None, weather_condition=None, occasion='casual', limit=5, seed=None,
+                        color_scheme=None):
+    """
+    Compute outfit suggestions from scratch (see ``suggest_outfits``)
+    
+    Returns:
+        list: Suggested outfits with reasoning
+    """
+    # Existing outfits that suit the temperature, rain and occasion, looked up
+    # in the user's bitmap suitability index
+    is_raining = bool(weather_condition and 'rain' in weather_condition.lower())
+    index = get_suitability_index(user_id)
+    outfit_ids = index.outfits.ids_for(index.outfits.match(temperature, is_raining, occasion)).tolist()
+    
+    # Get all matching outfits along with their items and categories
+    existing_outfits = []
+    if outfit_ids:
+        existing_outfits = Outfit.query.options(outfit_layers_loader()).filter(Outfit.id.in_(outfit_ids)).all()
+    
+    # Wear statistics for all of the user's outfits, loaded once
+    outfit_stats = WearStats.by_outfit(user_id)
     
     # If we have enough suggestions from existing outfits, prioritize them
     suggested_outfits = []
     
     # Add a reason field to each suggestion
     for outfit in existing_outfits:
-        # Skip outfits that are not suitable for rain if it's raining
-        if is_raining:
-            # Check if outfit has waterproof outerwear
-            has_waterproof = False
-            for outfit_item in outfit.outfit_items:
-                if (outfit_item.clothing_item.category.name in ['Jacket', 'Coat', 'Outerwear'] 
-                    and outfit_item.clothing_item.is_waterproof):
-                    has_waterproof = True
-                    break
-            
-            if not has_waterproof:
-                continue
-        
         # Calculate when this outfit was last worn
-        last_wear = WearLog.query.filter_by(
-            outfit_id=outfit.id
-        ).order_by(WearLog.date.desc()).first()
+        stats = outfit_stats.get(outfit.id)
+        last_worn = stats.last_worn if stats else None
         
         reason = "Matches your style preference"
         
-        if last_wear:
-            days_since_worn = (datetime.now().date() - last_wear.date).days
+        if last_worn:
+            days_since_worn = (datetime.now().date() - last_worn).days
             if days_since_worn > 30:
                 reason = f"Not worn in {days_since_worn} days"
             else:
@@ -75,7 +110,8 @@ def suggest_outfits(user_id, temperature=None, weather_condition=None, occasion=
         suggested_outfits.append({
             'outfit': outfit,
             'reason': reason,
-            'is_generated': False
+            'is_generated': False,
+            'last_worn': last_worn
         })
     
     # If we don't have enough existing outfits, generate new ones
@@ -87,7 +123,9 @@ def suggest_outfits(user_id, temperature=None, weather_condition=None, occasion=
             temperature, 
             weather_condition, 
             occasion, 
-            generated_count
+            generated_count,
+            seed=seed,
+            color_scheme=color_scheme
         )
         
         suggested_outfits.extend(generated_outfits)
@@ -95,22 +133,30 @@ def suggest_outfits(user_id, temperature=None, weather_condition=None, occasion=
     # Sort by favorite status and last worn date
     suggested_outfits.sort(key=lambda x: (
         not x['outfit'].is_favorite if not x.get('is_generated', False) else False,
-        x['outfit'].last_worn or datetime.min if not x.get('is_generated', False) else datetime.min
+        x.get('last_worn') or date.min
     ))
     
     # Return the top suggestions up to the limit
     return suggested_outfits[:limit]
 
-def generate_outfits(user_id, temperature=None, weather_condition=None, occasion='casual', limit=3):
+def generate_outfits(user_id, temperature=None, weather_condition=None, occasion='casual', limit=3, seed=None,
+                     color_scheme=None):
     """
     Generate new outfit combinations from individual clothing items
     
+    Candidate items are scored per slot (top, bottom, outer layer, ...) and a
+    bounded beam search returns the best distinct combinations, so the result
+    is deterministic for a given wardrobe and seed. With a color scheme, each
+    pair of items also earns a bonus from the precomputed color harmony matrix.
+    
     Args:
         user_id (int): User ID
         temperature (float, optional): Current temperature in Celsius
         weather_condition (str, optional): Current weather condition
         occasion (str, optional): Occasion to dress for
         limit (int, optional): Maximum number of outfits to generate
+        seed (int, optional): Seed for reproducible tie-breaking between equally good items
+        color_scheme (str, optional): Monochromatic, Complementary or Analogous
         
     Returns:
         list: Generated outfit suggestions
@@ -118,148 +164,182 @@ def generate_outfits(user_id, temperature=None, weather_condition=None, occasion
     # Determine if it's raining
     is_raining = weather_condition and 'rain' in weather_condition.lower()
     
-    # Build query for suitable clothing items
-    query = ClothingItem.query.filter_by(user_id=user_id)
+    # Filter the user's cached wardrobe by temperature, rain and occasion with
+    # a few bitset ANDs; in rain, outerwear that isn't waterproof is dropped here
+    snapshot = get_snapshot(user_id)
+    index = get_suitability_index(user_id)
+    mask = index.items.mask(index.items.match(temperature, is_raining, occasion))
     
-    # Filter by temperature if provided
-    if temperature is not None:
-        query = query.filter(
-            (ClothingItem.weather_min_temp.is_(None) | (ClothingItem.weather_min_temp <= temperature)),
-            (ClothingItem.weather_max_temp.is_(None) | (ClothingItem.weather_max_temp >= temperature))
-        )
+    # Row indices of all suitable items grouped by category
+    items_by_category = snapshot.rows_by_category(mask)
     
-    # Filter by occasion if provided
-    if occasion:
-        query = query.filter(
-            (ClothingItem.occasion.is_(None)) | 
-            (ClothingItem.occasion == '') | 
-            (ClothingItem.occasion == occasion)
-        )
+    # Use casual as default
+    slots = list(OCCASION_SLOTS.get(occasion, OCCASION_SLOTS['casual']))
     
-    # Get all suitable items grouped by category
-    items_by_category = {}
-    for item in query.all():
-        if item.category.name not in items_by_category:
-            items_by_category[item.category.name] = []
-        items_by_category[item.category.name].append(item)
-    
-    # Define essential categories for different occasions
-    essential_categories = {
-        'casual': ['T-shirt', 'Shirt', 'Jeans', 'Pants', 'Shorts'],
-        'formal': ['Dress Shirt', 'Suit', 'Slacks', 'Dress', 'Blazer'],
-        'business': ['Shirt', 'Blouse', 'Slacks', 'Skirt', 'Blazer'],
-        'sporty': ['T-shirt', 'Shorts', 'Sweatpants', 'Sports Bra']
-    }
+    # Add an outer layer if cold or raining
+    if (temperature is not None and temperature < 15) or is_raining:
+        slots.append(OUTERWEAR_CATEGORIES)
     
-    # Use casual as default
-    required_categories = essential_categories.get(occasion, essential_categories['casual'])
+    # Candidate rows for each slot; an empty slot means no outfit is possible
+    empty = np.empty(0, dtype=np.int64)
+    slot_rows = [
+        np.concatenate([items_by_category.get(category, empty) for category in slot])
+        for slot in slots
+    ]
     
-    # Add outerwear if cold or raining
-    if temperature and temperature < 15 or is_raining:
-        required_categories.append('Jacket')
-        required_categories.append('Coat')
-        required_categories.append('Outerwear')
+    scores = item_scores(snapshot.days_since_worn, seed)
     
-    # Generate outfit combinations
-    generated_outfits = []
-    attempts = 0
-    max_attempts = 20  # Prevent infinite loops
+    # Reward color combinations that fit the requested scheme
+    pair_score = None
+    harmony = get_harmony()
+    matrix = harmony.matrix(color_scheme)
+    if matrix is not None:
+        pair_score = harmony_pair_score(matrix, harmony.codes_for(snapshot.color_ids), HARMONY_WEIGHT)
     
-    while len(generated_outfits) < limit and attempts < max_attempts:
-        attempts += 1
-        
+    results = search_outfits(slot_rows, scores, limit, pair_score=pair_score)
+    if not results:
+        return []
+    
+    # Load just the chosen items (with categories) for display, in one query
+    chosen_ids = {int(snapshot.item_ids[row]) for _, rows in results for row in rows}
+    items_by_id = {item.id: item for item in ClothingItem.query.options(
+        joinedload(ClothingItem.category)).filter(ClothingItem.id.in_(chosen_ids))}
+    
+    # Generate reason for suggestion
+    reason = f"Generated for {temperature:g}°C" if temperature is not None else "Generated based on your style"
+    if is_raining:
+        reason += ", with rain protection"
+    
+    generated_outfits = []
+    for score, rows in results:
         # Create a new outfit
         outfit = Outfit(
             name=f"Suggested {occasion.capitalize()} Outfit",
             description=f"Generated for {temperature}°C, {weather_condition if weather_condition else 'any weather'}",
             occasion=occasion,
             user_id=user_id,
-            weather_min_temp=temperature - 5 if temperature else None,
-            weather_max_temp=temperature + 5 if temperature else None
+            weather_min_temp=temperature - 5 if temperature is not None else None,
+            weather_max_temp=temperature + 5 if temperature is not None else None
         )
         
-        # Add items from required categories
-        outfit_items = []
-        layer_order = 1
-        
-        # Check if we have the essential categories
-        missing_categories = []
-        for category in required_categories:
-            if category not in items_by_category or not items_by_category[category]:
-                missing_categories.append(category)
+        # Add items in slot order, innermost layer first
+        clothing_items = []
+        for layer_order, row in enumerate(rows, start=1):
+            item_id = int(snapshot.item_ids[row])
+            outfit.outfit_items.append(OutfitItem(
+                clothing_item_id=item_id,
+                layer_order=layer_order
+            ))
+            clothing_items.append(items_by_id[item_id])
         
-        if missing_categories:
-            reason = f"Missing items in categories: {', '.join(missing_categories)}"
-            continue
+        generated_outfits.append({
+            'outfit': outfit,
+            'clothing_items': clothing_items,
+            'reason': reason,
+            'is_generated': True,
+            'score': score
+        })
+    
+    return generated_outfits
+
+def suggestions_to_plans(suggestions):
+    """
+    Reduce suggestions to plain, JSON-serializable plans.
+    
+    Plans hold IDs instead of ORM objects so they can outlive the session
+    they were computed in (cache entries, stored precomputed results).
+    
+    Args:
+        suggestions (list): Suggestions as returned by ``suggest_outfits``
         
-        # Add items from each required category
-        for category in required_categories:
-            # Skip if no items in this category
-            if category not in items_by_category or not items_by_category[category]:
-                continue
-            
-            # Select a random item from this category
-            # Prioritize items that haven't been worn recently
-            category_items = items_by_category[category]
-            
-            # Get the least recently worn item
-            least_worn_item = None
-            oldest_wear_date = datetime.now().date()
-            
-            for item in category_items:
-                last_wear = WearLog.query.filter_by(
-                    clothing_item_id=item.id
-                ).order_by(WearLog.date.desc()).first()
-                
-                if not last_wear:
-                    # Never worn, prioritize this item
-                    least_worn_item = item
-                    break
-                
-                if last_wear.date < oldest_wear_date:
-                    oldest_wear_date = last_wear.date
-                    least_worn_item = item
-            
-            # If we couldn't find a least worn item, just pick a random one
-            selected_item = least_worn_item or random.choice(category_items)
-            
-            # For rainy weather, make sure outerwear is waterproof
-            if is_raining and category in ['Jacket', 'Coat', 'Outerwear'] and not selected_item.is_waterproof:
-                # Try to find a waterproof alternative
-                waterproof_items = [item for item in category_items if item.is_waterproof]
-                if waterproof_items:
-                    selected_item = random.choice(waterproof_items)
-                else:
-                    # If no waterproof items, this outfit won't work for rain
-                    break
-            
-            # Add this item to our outfit
-            outfit_items.append({
-                'item': selected_item,
-                'layer_order': layer_order
+    Returns:
+        list: One dict per suggestion
+    """
+    plans = []
+    for suggestion in suggestions:
+        plan = {
+            'reason': suggestion['reason'],
+            'is_generated': suggestion['is_generated']
+        }
+        if suggestion['is_generated']:
+            outfit = suggestion['outfit']
+            plan.update({
+                'name': outfit.name,
+                'description': outfit.description,
+                'occasion': outfit.occasion,
+                'weather_min_temp': outfit.weather_min_temp,
+                'weather_max_temp': outfit.weather_max_temp,
+                'item_ids': [item.id for item in suggestion['clothing_items']],
+                'score': suggestion.get('score')
+            })
+        else:
+            last_worn = suggestion.get('last_worn')
+            plan.update({
+                'outfit_id': suggestion['outfit'].id,
+                'last_worn': last_worn.isoformat() if last_worn else None
             })
-            layer_order += 1
+        plans.append(plan)
+    return plans
+
+def suggestions_from_plans(plans):
+    """
+    Rebuild suggestions from plans made by ``suggestions_to_plans``.
+    
+    Existing outfits are loaded with their layers in two statements and the
+    items of generated outfits in one more, whatever the number of plans.
+    Suggestions whose outfit or items have since been deleted are skipped.
+    
+    Args:
+        plans (list): Plans as returned by ``suggestions_to_plans``
         
-        # Check if we have a complete outfit
-        if len(outfit_items) >= 2:  # At least 2 items for a minimally complete outfit
-            # Add outfit items
-            for item_data in outfit_items:
-                outfit_item = OutfitItem(
-                    outfit_id=outfit.id if outfit.id else None,
-                    clothing_item_id=item_data['item'].id,
-                    layer_order=item_data['layer_order']
-                )
-                outfit.outfit_items.append(outfit_item)
-            
-            # Generate reason for suggestion
-            reason = f"Generated for {temperature}°C" if temperature else "Generated based on your style"
-            if is_raining:
-                reason += ", with rain protection"
-            
-            generated_outfits.append({
+    Returns:
+        list: Suggestions in the same shape as ``suggest_outfits`` returns
+    """
+    outfit_ids = [plan['outfit_id'] for plan in plans if not plan['is_generated']]
+    item_ids = {item_id for plan in plans if plan['is_generated'] for item_id in plan['item_ids']}
+    
+    outfits_by_id = {}
+    if outfit_ids:
+        outfits_by_id = {outfit.id: outfit for outfit in Outfit.query.options(
+            outfit_layers_loader()).filter(Outfit.id.in_(outfit_ids))}
+    items_by_id = {}
+    if item_ids:
+        items_by_id = {item.id: item for item in ClothingItem.query.options(
+            joinedload(ClothingItem.category)).filter(ClothingItem.id.in_(item_ids))}
+    
+    suggestions = []
+    for plan in plans:
+        if not plan['is_generated']:
+            outfit = outfits_by_id.get(plan['outfit_id'])
+            if outfit is None:
+                continue
+            last_worn = plan.get('last_worn')
+            suggestions.append({
                 'outfit': outfit,
-                'reason': reason,
-                'is_generated': True
+                'reason': plan['reason'],
+                'is_generated': False,
+                'last_worn': date.fromisoformat(last_worn) if last_worn else None
             })
-    
-    return generated_outfits 
\ No newline at end of file
+            continue
+        
+        if any(item_id not in items_by_id for item_id in plan['item_ids']):
+            continue
+        clothing_items = [items_by_id[item_id] for item_id in plan['item_ids']]
+        outfit = Outfit(
+            name=plan['name'],
+            description=plan['description'],
+            occasion=plan['occasion'],
+            user_id=clothing_items[0].user_id if clothing_items else None,
+            weather_min_temp=plan['weather_min_temp'],
+            weather_max_temp=plan['weather_max_temp']
+        )
+        for layer_order, item in enumerate(clothing_items, start=1):
+            outfit.outfit_items.append(OutfitItem(clothing_item_id=item.id, layer_order=layer_order))
+        suggestions.append({
+            'outfit': outfit,
+            'clothing_items': clothing_items,
+            'reason': plan['reason'],
+            'is_generated': True,
+            'score': plan.get('score')
+        })
+    return suggestions
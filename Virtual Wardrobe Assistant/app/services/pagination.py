@@ -0,0 +1,89 @@
+import base64
+import json
+from collections import namedtuple
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import tuple_
+
+from app.models.wear_stats import with_wear
+
+# One page of a newest-first listing; next_cursor is None on the last page
+Page = namedtuple('Page', ['items', 'next_cursor'])
+
+def encode_cursor(created_at, row_id):
+    """Return an opaque, URL-safe cursor for the position just after a row"""
+    raw = json.dumps([created_at.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """
+    Return the ``(created_at, id)`` position a cursor points after.
+
+    Raises:
+        ValueError: If the cursor was not made by ``encode_cursor``
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f'Invalid page cursor: {cursor!r}') from e
+
+def page_size(requested=None):
+    """Return the requested page size clamped to 1..``MAX_PAGE_SIZE``, or ``PAGE_SIZE``"""
+    if not requested:
+        return current_app.config['PAGE_SIZE']
+    return max(1, min(requested, current_app.config['MAX_PAGE_SIZE']))
+
+def after(created_at, row_id, position):
+    """
+    Filter for rows that come after ``(created_at, id)`` in newest-first order.
+
+    ``created_at`` must be NOT NULL: a row with NULL compares as unknown and
+    would never appear on a later page.
+    """
+    return tuple_(created_at, row_id) < tuple_(*position)
+
+def page_of(rows, size, position):
+    """
+    Make a Page from rows fetched with a limit of ``size + 1``.
+
+    The extra row only signals that another page exists; the cursor points
+    after the last row kept.
+
+    Args:
+        rows (list): Rows in newest-first order
+        size (int): Page size
+        position (callable): Returns a row's ``(created_at, id)``
+    """
+    if len(rows) <= size:
+        return Page(rows, None)
+    rows = rows[:size]
+    return Page(rows, encode_cursor(*position(rows[-1])))
+
+def paginate(query, cursor=None, size=None):
+    """
+    Return one newest-first page of a ``ClothingItem`` or ``Outfit`` query.
+
+    Pages are keyed on ``(created_at, id)`` rather than an offset, so every
+    page costs one index range read however far in it is. Rows come with
+    their wear totals (see ``with_wear``).
+
+    Args:
+        query (Query): Filtered query for one of the two models, unordered and without a limit
+        cursor (str, optional): ``next_cursor`` of the previous page
+        size (int, optional): Rows per page (default: ``PAGE_SIZE``)
+
+    Returns:
+        Page: The rows and the cursor for the next page
+
+    Raises:
+        ValueError: If the cursor is invalid
+    """
+    model = query.column_descriptions[0]['entity']
+    size = page_size(size)
+    if cursor:
+        query = query.filter(after(model.created_at, model.id, decode_cursor(cursor)))
+    rows = with_wear(query.order_by(model.created_at.desc(), model.id.desc()), limit=size + 1)
+    return page_of(rows, size, lambda row: (row.created_at, row.id))
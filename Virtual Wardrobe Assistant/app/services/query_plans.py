@@ -0,0 +1,101 @@
+import re
+from collections import namedtuple
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from app.models.clothing import ClothingItem
+from app.models.daily_suggestion import DailySuggestion
+from app.models.location import Location, LocationAlias
+from app.models.outfit import Outfit, OutfitItem
+from app.models.wear_log import WearLog
+from app.models.wear_stats import WearStats
+from app.models.weather_cache import WeatherCache
+from app.models.weather_forecast import WeatherForecast
+from app.services.pagination import after
+from app.services.suitability_index import outfit_rows
+
+# "SCAN clothing_items" / "SCAN TABLE clothing_items" (older SQLite); subquery and constant scans are fine
+_FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?(?!CONSTANT ROW)(?!\()(\w+)')
+
+# Result of checking one query: plan lines and the tables it reads in full
+QueryPlan = namedtuple('QueryPlan', ['name', 'plan', 'full_scans'])
+
+def hot_queries():
+    """
+    Return {name: statement} for the queries on the app's hot paths.
+
+    Each mirrors a query a page or service runs on every request, with
+    placeholder values, so its plan can be checked for full table scans.
+    """
+    user_id, item_id, outfit_id = 1, 1, 1
+    position = (datetime(2024, 1, 1), 1)
+    return {
+        'wardrobe listing': select(ClothingItem).where(ClothingItem.user_id == user_id)
+            .order_by(ClothingItem.created_at.desc()),
+        'wardrobe by category': select(ClothingItem).where(ClothingItem.user_id == user_id,
+                                                           ClothingItem.category_id == 1),
+        'wardrobe listing with wear': select(ClothingItem, WearStats.wear_count, WearStats.last_worn)
+            .outerjoin(ClothingItem.wear_stats).where(ClothingItem.user_id == user_id)
+            .order_by(ClothingItem.created_at.desc()),
+        'wardrobe page': select(ClothingItem).where(ClothingItem.user_id == user_id,
+                                                    after(ClothingItem.created_at, ClothingItem.id, position))
+            .order_by(ClothingItem.created_at.desc(), ClothingItem.id.desc()).limit(24),
+        'dashboard item count': select(func.count()).select_from(ClothingItem)
+            .where(ClothingItem.user_id == user_id),
+        'outfit listing': select(Outfit).where(Outfit.user_id == user_id).order_by(Outfit.created_at.desc()),
+        'outfit listing with wear': select(Outfit, WearStats.wear_count, WearStats.last_worn)
+            .outerjoin(Outfit.wear_stats).where(Outfit.user_id == user_id).order_by(Outfit.created_at.desc()),
+        'outfit page': select(Outfit).where(Outfit.user_id == user_id, after(Outfit.created_at, Outfit.id, position))
+            .order_by(Outfit.created_at.desc(), Outfit.id.desc()).limit(24),
+        'outfits by occasion': select(Outfit).where(Outfit.user_id == user_id, Outfit.occasion == 'casual'),
+        'outfit suitability index': outfit_rows(user_id),
+        'outfit layers': select(OutfitItem).where(OutfitItem.outfit_id == outfit_id)
+            .order_by(OutfitItem.layer_order),
+        'outfits containing item': select(OutfitItem.outfit_id).where(OutfitItem.clothing_item_id == item_id),
+        'item wear history': select(WearLog).where(WearLog.clothing_item_id == item_id)
+            .order_by(WearLog.date.desc()),
+        'outfit wear history': select(WearLog).where(WearLog.outfit_id == outfit_id)
+            .order_by(WearLog.date.desc()),
+        'user wear history': select(WearLog).where(WearLog.user_id == user_id).order_by(WearLog.date.desc()),
+        'item wear stats': select(WearStats).where(WearStats.user_id == user_id,
+                                                   WearStats.clothing_item_id.isnot(None)),
+        'precomputed suggestions': select(DailySuggestion).where(DailySuggestion.user_id == user_id,
+                                                                 DailySuggestion.date == '2024-01-01',
+                                                                 DailySuggestion.occasion == 'casual'),
+        'weather cache': select(WeatherCache.data).where(WeatherCache.location_key == 'text:london'),
+        'forecast day': select(WeatherForecast).where(WeatherForecast.location_key == 'text:london',
+                                                      WeatherForecast.period == 'daily',
+                                                      WeatherForecast.local_date == '2024-01-01'),
+        'forecast step': select(WeatherForecast).where(WeatherForecast.location_key == 'text:london',
+                                                       WeatherForecast.period == 'hourly',
+                                                       WeatherForecast.starts_at <= '2024-01-01 12:00:00',
+                                                       WeatherForecast.ends_at > '2024-01-01 12:00:00'),
+        'location alias': select(Location.key).join(LocationAlias, LocationAlias.location_id == Location.id)
+            .where(LocationAlias.alias == 'london')
+    }
+
+def explain(conn, statement):
+    """Return the ``EXPLAIN QUERY PLAN`` detail lines for a statement on a SQLite connection"""
+    compiled = statement.compile(dialect=conn.dialect)
+    params = compiled.construct_params()
+    args = tuple(params[name] for name in compiled.positiontup)
+    return [row[-1] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}', args)]
+
+def check_query_plans(engine):
+    """
+    Explain every hot query and report the tables each one reads in full.
+
+    Args:
+        engine (Engine): SQLite engine whose schema (and indexes) to check
+
+    Returns:
+        list[QueryPlan]: One result per hot query, in order
+    """
+    results = []
+    with engine.connect() as conn:
+        for name, statement in hot_queries().items():
+            plan = explain(conn, statement)
+            full_scans = [match.group(1) for match in map(_FULL_SCAN.match, plan) if match]
+            results.append(QueryPlan(name, plan, full_scans))
+    return results
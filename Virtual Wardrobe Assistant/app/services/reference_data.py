@@ -0,0 +1,106 @@
+import threading
+import time
+from collections import namedtuple
+
+from flask import current_app
+
+from app import db
+from app.models.clothing import Category, Color, Season
+from app.services.change_tracking import on_reference_change
+
+# Read-only copies of reference rows, safe to share between requests and threads
+CategoryRef = namedtuple('CategoryRef', ['id', 'name', 'description'])
+ColorRef = namedtuple('ColorRef', ['id', 'name', 'hex_code'])
+SeasonRef = namedtuple('SeasonRef', ['id', 'name'])
+
+_reference_data = None
+_lock = threading.Lock()
+
+class ReferenceTable:
+    """
+    One small lookup table held in memory, indexed by ID and by name.
+
+    Attributes:
+        rows (tuple): All rows, ordered by name
+        by_id (dict): {id: row}
+        by_name (dict): {name: row}
+    """
+
+    def __init__(self, rows):
+        self.rows = tuple(sorted(rows, key=lambda row: row.name))
+        self.by_id = {row.id: row for row in self.rows}
+        self.by_name = {row.name: row for row in self.rows}
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def get(self, row_id):
+        """Return the row with this ID, or None"""
+        return self.by_id.get(row_id)
+
+    def named(self, name):
+        """Return the row with this name, or None"""
+        return self.by_name.get(name)
+
+    def name_of(self, row_id):
+        """Return the name for an ID, or None"""
+        row = self.by_id.get(row_id)
+        return row.name if row else None
+
+    def choices(self):
+        """Return ``(id, name)`` pairs for a WTForms select field"""
+        return [(row.id, row.name) for row in self.rows]
+
+class ReferenceData:
+    """
+    Categories, colors and seasons loaded once per process.
+
+    Attributes:
+        categories (ReferenceTable): Clothing categories
+        colors (ReferenceTable): Colors
+        seasons (ReferenceTable): Seasons
+        loaded_at (float): ``time.monotonic()`` when the tables were read
+    """
+
+    def __init__(self, categories, colors, seasons):
+        self.categories = ReferenceTable(categories)
+        self.colors = ReferenceTable(colors)
+        self.seasons = ReferenceTable(seasons)
+        self.loaded_at = time.monotonic()
+
+    @classmethod
+    def load(cls):
+        """Read all three tables from the database"""
+        return cls(
+            [CategoryRef(*row) for row in db.session.query(Category.id, Category.name, Category.description)],
+            [ColorRef(*row) for row in db.session.query(Color.id, Color.name, Color.hex_code)],
+            [SeasonRef(*row) for row in db.session.query(Season.id, Season.name)]
+        )
+
+def get_reference_data():
+    """
+    Return this process's reference data, loading it on first use.
+
+    Writes committed in this process reload it on next use. Writes made by
+    other workers are picked up once the copy is older than
+    ``REFERENCE_DATA_TTL`` seconds.
+
+    Returns:
+        ReferenceData: Categories, colors and seasons
+    """
+    global _reference_data
+    ttl = current_app.config.get('REFERENCE_DATA_TTL')
+    with _lock:
+        if _reference_data is None or (ttl and time.monotonic() - _reference_data.loaded_at > ttl):
+            _reference_data = ReferenceData.load()
+        return _reference_data
+
+@on_reference_change
+def _reset_reference_data(tables):
+    """Drop the cached tables after a commit that changed any of them"""
+    global _reference_data
+    with _lock:
+        _reference_data = None
@@ -0,0 +1,69 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one execution.
+    
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is in flight wait for the same result, or exception,
+    instead of running it again. Once the call finishes the key is released,
+    so later callers start a fresh call. Threaded callers use ``do`` and
+    asyncio callers ``do_async``; both share the same in-flight calls.
+    """
+    
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+    
+    def _join(self, key):
+        """Return ``(future, is_leader)`` for a key, registering a new call if none is in flight"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = self._calls[key] = Future()
+            return future, True
+    
+    def _lead(self, key, future, func, args, kwargs):
+        """Run ``func`` as the leader and publish its outcome to every waiter"""
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+    
+    def do(self, key, func, *args, **kwargs):
+        """
+        Call ``func(*args, **kwargs)`` unless a call for ``key`` is already in flight.
+        
+        Returns:
+            The function's result, shared with every concurrent caller for ``key``
+        """
+        future, is_leader = self._join(key)
+        if not is_leader:
+            return future.result()
+        return self._lead(key, future, func, args, kwargs)
+    
+    async def do_async(self, key, func, *args, executor=None):
+        """
+        Asyncio counterpart of ``do`` for a blocking ``func``.
+        
+        The leader runs ``func`` on ``executor`` (default: the loop's thread
+        pool) so the event loop is never blocked; other awaiters, and threaded
+        callers of ``do``, wait on the same call.
+        """
+        future, is_leader = self._join(key)
+        if not is_leader:
+            return await asyncio.wrap_future(future)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self._lead, key, future, func, args, {})
\ No newline at end of file
@@ -0,0 +1,127 @@
+import logging
+import re
+import time
+from collections import Counter
+
+from flask import g, has_app_context, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Literals and placeholder lists that vary between otherwise identical statements
+_IN_LIST = re.compile(r'\(\s*(?:\?|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|:\w+))*\s*\)')
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_WHITESPACE = re.compile(r'\s+')
+
+# Writes are counted but never flagged: a flush writes one row per statement
+# (SQLite cannot batch inserts whose generated keys are read back), so adding
+# N rows is N identical INSERTs by design rather than an N+1 read
+_WRITE = re.compile(r'^\s*(?:INSERT|UPDATE|DELETE)\b', re.IGNORECASE)
+
+class RepeatedQueryError(RuntimeError):
+    """Raised in strict mode when one statement shape runs too often in a request"""
+
+    def __init__(self, statement, count):
+        super().__init__(f'Statement ran {count} times in one request (likely N+1): {statement}')
+        self.statement = statement
+        self.count = count
+
+def normalize_statement(statement):
+    """Reduce a SQL statement to its shape so repeated lazy loads compare equal"""
+    statement = _STRING_LITERAL.sub('?', statement)
+    statement = _NUMBER_LITERAL.sub('?', statement)
+    statement = _IN_LIST.sub('(?)', statement)
+    return _WHITESPACE.sub(' ', statement).strip()
+
+class RequestSQLStats:
+    """
+    SQL statements executed while handling one request.
+
+    Attributes:
+        count (int): Statements executed
+        duration (float): Total time spent in the database, in seconds
+        shapes (Counter): Executions per normalized statement
+    """
+
+    def __init__(self, threshold=0, strict=False):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+        self.threshold = threshold
+        self.strict = strict
+        self.reported = set()
+
+    def record(self, statement, duration):
+        """Count one statement, flagging read shapes that repeat more than ``threshold`` times"""
+        self.count += 1
+        self.duration += duration
+
+        shape = normalize_statement(statement)
+        self.shapes[shape] += 1
+        if (not self.threshold or self.shapes[shape] <= self.threshold or shape in self.reported
+                or _WRITE.match(shape)):
+            return
+
+        self.reported.add(shape)
+        if self.strict:
+            raise RepeatedQueryError(shape, self.shapes[shape])
+        logging.warning(f'Possible N+1 query, ran {self.shapes[shape]} times in one request: {shape}')
+
+    def repeated(self):
+        """Return the shapes that exceeded the threshold, most frequent first"""
+        return [(shape, self.shapes[shape]) for shape, _ in self.shapes.most_common()
+                if shape in self.reported]
+
+def current_sql_stats():
+    """Return the statistics for the current request, or None outside a request"""
+    if not has_request_context():
+        return None
+    return g.get('sql_stats')
+
+# The start time lives on the statement's execution context, which is dropped
+# with the statement, so a statement that raises leaves nothing behind on the
+# pooled connection
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and has_app_context() and g.get('sql_stats') is not None:
+        context.sql_monitor_start = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, 'sql_monitor_start', None)
+    if start is None or not has_app_context():
+        return
+    stats = g.get('sql_stats')
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - start)
+
+def init_sql_monitor(app):
+    """
+    Count SQL statements and database time for every request.
+
+    Per-request totals are sent as ``X-SQL-Count`` and ``X-SQL-Time-ms``
+    response headers when the app runs in debug mode (or ``SQL_STATS_HEADERS``
+    is set). A SELECT shape that repeats more than ``SQL_REPEAT_THRESHOLD``
+    times in one request is logged as a likely N+1 query; with ``SQL_STRICT``
+    it raises ``RepeatedQueryError`` instead. INSERT, UPDATE and DELETE
+    statements count towards the totals but are never flagged.
+
+    Args:
+        app (Flask): Application to instrument
+    """
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def _start_sql_stats():
+        g.sql_stats = RequestSQLStats(
+            threshold=app.config.get('SQL_REPEAT_THRESHOLD', 0),
+            strict=app.config.get('SQL_STRICT', False)
+        )
+
+    @app.after_request
+    def _add_sql_headers(response):
+        stats = g.get('sql_stats')
+        if stats is not None and (app.debug or app.config.get('SQL_STATS_HEADERS')):
+            response.headers['X-SQL-Count'] = str(stats.count)
+            response.headers['X-SQL-Time-ms'] = f'{stats.duration * 1000:.2f}'
+        return response
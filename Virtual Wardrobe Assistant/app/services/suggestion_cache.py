@@ -0,0 +1,79 @@
+import threading
+from collections import OrderedDict
+
+from app.services.change_tracking import on_wardrobe_change
+
+class SuggestionCache:
+    """
+    Per-process LRU cache of outfit suggestion results.
+
+    Keys start with the user ID. Each entry remembers the user's
+    ``wardrobe_version`` it was computed at, so a write from any worker makes
+    it stale; writes committed in this process also evict the user's entries
+    immediately.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key, version):
+        """Return the cached value for ``key`` if it was stored at ``version``, else None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, version, value, max_size):
+        """Store ``value`` for ``key``, evicting least recently used entries beyond ``max_size``"""
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_users(self, user_ids):
+        """Drop every entry belonging to the given users"""
+        with self._lock:
+            stale = [key for key in self._entries if key[0] in user_ids]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+suggestion_cache = SuggestionCache()
+
+@on_wardrobe_change
+def _invalidate_suggestions(user_ids):
+    suggestion_cache.invalidate_users(user_ids)
+
+def temperature_bucket(temperature, bucket_size):
+    """Round a temperature to the centre of its cache bucket (None stays None)"""
+    if temperature is None or not bucket_size:
+        return temperature
+    return round(temperature / bucket_size) * bucket_size
@@ -0,0 +1,172 @@
+import copy
+import json
+import logging
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+from flask import current_app
+
+from app import db
+from app.models.daily_suggestion import DailySuggestion
+from app.models.user import User
+from app.services.change_tracking import wardrobe_version
+from app.services.locations import location_key
+from app.services.outfit_suggester import (compute_suggestions, suggestions_from_plans,
+                                           suggestions_to_plans)
+from app.services.suggestion_cache import temperature_bucket
+from app.services.weather import get_weather_data
+from app.services.weather_quota import BACKGROUND, weather_priority
+
+# Flask app used by each worker process of the precompute pool
+_worker_app = None
+
+def _init_worker(config):
+    """Process pool initializer: build an app with the parent's configuration"""
+    global _worker_app
+    from app import create_app
+    _worker_app = create_app(config)
+
+def _compute_batch(user_ids, temperature, weather_condition, occasions):
+    """
+    Compute suggestions for a batch of users sharing one location.
+
+    Runs inside a worker process.
+
+    Returns:
+        list: ``(user_id, occasion, wardrobe_version, plans)`` tuples
+    """
+    results = []
+    with _worker_app.app_context():
+        for user_id in user_ids:
+            version = wardrobe_version(user_id)
+            for occasion in occasions:
+                try:
+                    suggestions = compute_suggestions(user_id, temperature, weather_condition, occasion)
+                except Exception:
+                    logging.exception(f"Error precomputing suggestions for user {user_id}")
+                    continue
+                results.append((user_id, occasion, version, suggestions_to_plans(suggestions)))
+        db.session.remove()
+    return results
+
+def _is_plain(value):
+    """Return True for scalars, and dicts, lists and tuples made only of them"""
+    if isinstance(value, (str, int, float, bool, type(None))):
+        return True
+    if isinstance(value, dict):
+        return all(isinstance(key, str) and _is_plain(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return all(map(_is_plain, value))
+    return False
+
+def _picklable_config(app):
+    """Return the subset of the app config that can be shipped to worker processes"""
+    return {key: copy.deepcopy(value) for key, value in app.config.items() if _is_plain(value)}
+
+def precompute_suggestions(occasions=('casual',), workers=None, batch_size=50):
+    """
+    Precompute today's suggestions for every user with a location.
+
+    Users are grouped by location so weather is fetched once per location,
+    then suggestion work is fanned out over a process pool and the results
+    are written to ``daily_suggestions``. Must run inside an app context.
+
+    Args:
+        occasions (iterable): Occasions to precompute
+        workers (int, optional): Pool size (default: CPU count; 0 runs inline)
+        batch_size (int, optional): Users per pool task
+
+    Returns:
+        int: Number of rows written
+    """
+    today = date.today()
+    occasions = tuple(occasions)
+    temp_bucket = current_app.config.get('SUGGESTION_CACHE_TEMP_BUCKET')
+
+    # Group users by canonical location, so each place is fetched once
+    locations = {}
+    users_by_location = defaultdict(list)
+    for user_id, location in db.session.query(User.id, User.location).filter(
+            User.location.isnot(None), User.location != ''):
+        key = location_key(location)
+        locations.setdefault(key, location)
+        users_by_location[key].append(user_id)
+
+    tasks = []
+    for key, user_ids in users_by_location.items():
+        location = locations[key]
+        with weather_priority(BACKGROUND):
+            weather = get_weather_data(location)
+        if not weather:
+            logging.warning(f"No weather for {location}, skipping {len(user_ids)} users")
+            continue
+        temperature = temperature_bucket(weather.get('temperature'), temp_bucket)
+        condition = weather.get('condition')
+        for start in range(0, len(user_ids), batch_size):
+            tasks.append((user_ids[start:start + batch_size], temperature, condition))
+
+    results = []
+    if workers == 0:
+        global _worker_app
+        _worker_app = current_app._get_current_object()
+        for user_ids, temperature, condition in tasks:
+            results.extend((temperature, condition, row) for row in
+                           _compute_batch(user_ids, temperature, condition, occasions))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(_picklable_config(current_app),)) as pool:
+            futures = [(pool.submit(_compute_batch, user_ids, temperature, condition, occasions),
+                        temperature, condition)
+                       for user_ids, temperature, condition in tasks]
+            for future, temperature, condition in futures:
+                results.extend((temperature, condition, row) for row in future.result())
+
+    # Replace any earlier rows for today in one transaction
+    user_ids = {row[0] for _, _, row in results}
+    if user_ids:
+        DailySuggestion.query.filter(
+            DailySuggestion.date == today,
+            DailySuggestion.user_id.in_(user_ids),
+            DailySuggestion.occasion.in_(occasions)
+        ).delete(synchronize_session=False)
+
+    db.session.add_all(
+        DailySuggestion(user_id=user_id, date=today, occasion=occasion,
+                        temperature=temperature, weather_condition=condition,
+                        wardrobe_version=version, plans=json.dumps(plans))
+        for temperature, condition, (user_id, occasion, version, plans) in results
+    )
+    db.session.commit()
+    return len(results)
+
+def load_precomputed_suggestions(user_id, occasion, weather_data):
+    """
+    Return today's precomputed suggestions if they still apply, else None.
+
+    A stored row is used only if the user's wardrobe has not changed since it
+    was computed and the current weather falls in the same temperature bucket
+    and rain state.
+
+    Args:
+        user_id (int): User ID
+        occasion (str): Occasion to dress for
+        weather_data (dict): Current weather from ``get_weather_data``
+
+    Returns:
+        list: Suggestions in the shape ``suggest_outfits`` returns, or None
+    """
+    row = DailySuggestion.query.filter_by(user_id=user_id, date=date.today(), occasion=occasion).first()
+    if row is None or row.wardrobe_version != wardrobe_version(user_id):
+        return None
+
+    temp_bucket = current_app.config.get('SUGGESTION_CACHE_TEMP_BUCKET')
+    if temperature_bucket(weather_data.get('temperature'), temp_bucket) != row.temperature:
+        return None
+
+    condition = weather_data.get('condition') or ''
+    stored_condition = row.weather_condition or ''
+    if ('rain' in condition.lower()) != ('rain' in stored_condition.lower()):
+        return None
+
+    return suggestions_from_plans(row.suggestion_plans)
@@ -0,0 +1,192 @@
+import re
+
+import numpy as np
+from sqlalchemy import select
+
+from app import db
+from app.models.outfit import Outfit
+from app.services.reference_data import get_reference_data
+from app.services.wardrobe_snapshot import dense_seasons, get_snapshot
+
+# Whole-degree temperatures with their own bitset; queries outside are clamped
+MIN_TEMPERATURE = -50
+MAX_TEMPERATURE = 50
+
+def _to_bits(mask):
+    """Pack a boolean array into a Python int (bit i = row i)"""
+    return int.from_bytes(np.packbits(mask, bitorder='little').tobytes(), 'little')
+
+def _to_mask(bits, count):
+    """Unpack a Python int bitset into a boolean array of ``count`` rows"""
+    raw = np.frombuffer(bits.to_bytes((count + 7) // 8, 'little'), dtype=np.uint8)
+    return np.unpackbits(raw, count=count, bitorder='little').astype(bool)
+
+class SuitabilityBitmaps:
+    """
+    Bitsets over one kind of row (clothing items or outfits).
+
+    Bit ``i`` of every bitset stands for row ``i`` of ``ids``. There is one
+    bitset per whole degree from ``MIN_TEMPERATURE`` to ``MAX_TEMPERATURE``
+    plus one for rain and one per occasion and season, so matching a set of
+    conditions is a handful of integer ANDs.
+
+    Attributes:
+        ids (ndarray[int64]): Row IDs
+        all (int): Every row
+        temperatures (list[int]): Rows suitable at each whole degree
+        rain (int): Rows suitable in rain
+        occasions (dict): {occasion: rows}
+        any_occasion (int): Rows that suit any occasion
+        seasons (dict): {season_id: rows}, for the seasons in ``season_ids``
+        any_season (int): Rows that suit any season
+    """
+
+    def __init__(self, ids, min_temps, max_temps, rain_ok, occasions, season_ids, season_masks,
+                 unset_occasion_matches=True):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.all = (1 << len(self.ids)) - 1
+
+        self.temperatures = [_to_bits((min_temps <= t) & (max_temps >= t))
+                             for t in range(MIN_TEMPERATURE, MAX_TEMPERATURE + 1)]
+        self.rain = _to_bits(rain_ok)
+
+        occasions = np.asarray(occasions, dtype=object)
+        self.occasions = {name: _to_bits(occasions == name) for name in set(occasions) if name}
+        self.any_occasion = _to_bits(occasions == None) if unset_occasion_matches else 0  # noqa: E711
+
+        # Bit i of season_masks stands for season_ids[i] (see dense_seasons)
+        self.seasons = {season_id: _to_bits((season_masks >> np.uint64(bit)) & np.uint64(1) != 0)
+                        for bit, season_id in enumerate(season_ids)}
+        self.any_season = _to_bits(season_masks == 0)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def match(self, temperature=None, is_raining=False, occasion=None, season_id=None):
+        """
+        Return the bitset of rows suitable for all of the given conditions.
+
+        Args:
+            temperature (float, optional): Rounded to the nearest whole degree
+            is_raining (bool, optional): Only rows suitable in rain
+            occasion (str, optional): Rows for this occasion (or any occasion)
+            season_id (int, optional): Rows for this season (or any season)
+
+        Returns:
+            int: Bitset over ``ids``
+        """
+        bits = self.all
+        if temperature is not None:
+            degree = min(max(int(round(temperature)), MIN_TEMPERATURE), MAX_TEMPERATURE)
+            bits &= self.temperatures[degree - MIN_TEMPERATURE]
+        if is_raining:
+            bits &= self.rain
+        if occasion:
+            bits &= self.occasions.get(occasion, 0) | self.any_occasion
+        if season_id is not None:
+            bits &= self.seasons.get(season_id, 0) | self.any_season
+        return bits
+
+    def mask(self, bits):
+        """Return a bitset as a boolean array over ``ids``"""
+        return _to_mask(bits, len(self.ids))
+
+    def ids_for(self, bits):
+        """Return the IDs of the rows in a bitset"""
+        return self.ids[self.mask(bits)]
+
+class SuitabilityIndex:
+    """
+    Per-user bitmap index answering "what suits these conditions" for both
+    clothing items and outfits.
+
+    Built from the user's wardrobe snapshot (items) and one query over their
+    outfits, and rebuilt together with the snapshot whenever the user's
+    ``wardrobe_version`` changes.
+
+    Attributes:
+        items (SuitabilityBitmaps): Rows follow ``WardrobeSnapshot.item_ids``
+        outfits (SuitabilityBitmaps): One row per outfit, by outfit ID
+    """
+
+    def __init__(self, items, outfits):
+        self.items = items
+        self.outfits = outfits
+
+    @classmethod
+    def build(cls, snapshot):
+        """Build the index for the user of a wardrobe snapshot"""
+        item_occasions = [snapshot.occasions[code] if code >= 0 else None
+                          for code in snapshot.occasion_codes.tolist()]
+        items = SuitabilityBitmaps(
+            snapshot.item_ids,
+            snapshot.min_temps,
+            snapshot.max_temps,
+            ~snapshot.outerwear | snapshot.waterproof,
+            item_occasions,
+            snapshot.season_ids,
+            snapshot.season_masks
+        )
+
+        rows = db.session.execute(outfit_rows(snapshot.user_id)).all()
+
+        # An outfit suits the narrower of its hand-entered and derived ranges
+        def bound(values, pick, unset):
+            values = [value for value in values if value is not None]
+            return pick(values) if values else unset
+
+        seasons = get_reference_data().seasons
+        outfit_seasons = [_season_ids(row.season, seasons) for row in rows]
+        season_ids, season_index = dense_seasons(season_id for ids in outfit_seasons for season_id in ids)
+        outfits = SuitabilityBitmaps(
+            [row.id for row in rows],
+            np.array([bound((row.weather_min_temp, row.derived_min_temp), max, -np.inf) for row in rows]),
+            np.array([bound((row.weather_max_temp, row.derived_max_temp), min, np.inf) for row in rows]),
+            np.array([bool(row.rain_ready) for row in rows], dtype=bool),
+            [row.occasion for row in rows],
+            season_ids,
+            np.array([sum(1 << season_index[season_id] for season_id in ids) for ids in outfit_seasons],
+                     dtype=np.uint64),
+            unset_occasion_matches=False
+        )
+        return cls(items, outfits)
+
+def outfit_rows(user_id):
+    """Select the columns of a user's outfits that their bitmaps are built from"""
+    return select(
+        Outfit.id,
+        Outfit.occasion,
+        Outfit.season,
+        Outfit.weather_min_temp,
+        Outfit.derived_min_temp,
+        Outfit.weather_max_temp,
+        Outfit.derived_max_temp,
+        Outfit.rain_ready
+    ).where(Outfit.user_id == user_id).order_by(Outfit.id)
+
+def _season_ids(text, seasons):
+    """Turn a free-text outfit season ("summer, fall") into a set of season IDs (empty = any)"""
+    season_ids = set()
+    for word in re.split(r'[^a-z]+', (text or '').lower()):
+        season = seasons.named(word.capitalize()) if word else None
+        if season is not None:
+            season_ids.add(season.id)
+    return season_ids
+
+def get_suitability_index(user_id):
+    """
+    Return the suitability index for a user, rebuilding it only if stale.
+
+    The index is stored on the user's wardrobe snapshot, so it is reused and
+    invalidated exactly like the snapshot.
+
+    Args:
+        user_id (int): User ID
+
+    Returns:
+        SuitabilityIndex: Index over the user's items and outfits
+    """
+    snapshot = get_snapshot(user_id)
+    if snapshot.suitability is None:
+        snapshot.suitability = SuitabilityIndex.build(snapshot)
+    return snapshot.suitability
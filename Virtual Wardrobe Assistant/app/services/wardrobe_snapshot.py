@@ -0,0 +1,252 @@
+import threading
+from collections import OrderedDict
+from datetime import date
+
+import numpy as np
+
+from app import db
+from app.models.clothing import ClothingItem, clothing_season
+from app.models.outfit import OUTERWEAR_CATEGORIES
+from app.models.wear_stats import WearStats
+from app.services.change_tracking import on_wardrobe_change, wardrobe_version
+from app.services.reference_data import get_reference_data
+
+# Number of user snapshots kept per process
+MAX_SNAPSHOTS = 512
+
+# Season masks are uint64, one bit per distinct season in a wardrobe
+MAX_SEASONS = 64
+
+_snapshots = OrderedDict()
+_lock = threading.Lock()
+
+def dense_seasons(season_ids):
+    """
+    Number the distinct seasons from bit 0 up, so season masks do not depend on row IDs.
+
+    Returns:
+        tuple: ``(season_ids, {season_id: bit})`` with the IDs in ascending order
+
+    Raises:
+        ValueError: If there are more than ``MAX_SEASONS`` distinct seasons
+    """
+    season_ids = tuple(sorted(set(season_ids)))
+    if len(season_ids) > MAX_SEASONS:
+        raise ValueError(f'Season masks hold {MAX_SEASONS} seasons, got {len(season_ids)}')
+    return season_ids, {season_id: bit for bit, season_id in enumerate(season_ids)}
+
+class WardrobeSnapshot:
+    """
+    Column-oriented, read-only copy of one user's wardrobe.
+
+    Each attribute is a NumPy array with one entry per clothing item, in item
+    ID order, so candidate filtering is a single vectorized mask instead of a
+    SQL round trip plus Python loops.
+
+    Attributes:
+        item_ids (ndarray[int64]): Clothing item IDs
+        category_codes (ndarray[int16]): Index into ``categories`` (-1 = none)
+        min_temps / max_temps (ndarray[float32]): Temperature range (+/-inf when unset)
+        waterproof (ndarray[bool]): Item is waterproof
+        outerwear (ndarray[bool]): Item is in an outerwear category
+        occasion_codes (ndarray[int16]): Index into ``occasions`` (-1 = any occasion)
+        season_ids (tuple[int]): Season ID of each bit of ``season_masks``
+        season_masks (ndarray[uint64]): Bit ``i`` set for season ``season_ids[i]`` (0 = any season)
+        days_since_worn (ndarray[float64]): Days since last worn (inf = never worn)
+        color_ids (ndarray[int64]): Color IDs (-1 = none)
+    """
+
+    def __init__(self, user_id, version, built_on, categories, occasions, item_ids,
+                 category_codes, min_temps, max_temps, waterproof, occasion_codes,
+                 season_ids, season_masks, days_since_worn, color_ids):
+        self.user_id = user_id
+        self.version = version
+        self.built_on = built_on
+        self.categories = categories
+        self.occasions = occasions
+        self.item_ids = item_ids
+        self.category_codes = category_codes
+        self.min_temps = min_temps
+        self.max_temps = max_temps
+        self.waterproof = waterproof
+        self.occasion_codes = occasion_codes
+        self.season_ids = season_ids
+        self.season_masks = season_masks
+        self.days_since_worn = days_since_worn
+        self.color_ids = color_ids
+
+        # SuitabilityIndex built on first use by get_suitability_index()
+        self.suitability = None
+
+        self.category_index = {name: code for code, name in enumerate(categories)}
+        self.occasion_index = {name: code for code, name in enumerate(occasions)}
+        self.season_index = {season_id: bit for bit, season_id in enumerate(season_ids)}
+
+        outerwear_codes = [self.category_index[name] for name in OUTERWEAR_CATEGORIES
+                           if name in self.category_index]
+        self.outerwear = np.isin(category_codes, outerwear_codes)
+
+    def __len__(self):
+        return len(self.item_ids)
+
+    def __repr__(self):
+        return f'<WardrobeSnapshot user {self.user_id} v{self.version}: {len(self)} items>'
+
+    @classmethod
+    def build(cls, user_id, version):
+        """Load a user's items, seasons and wear statistics into a new snapshot"""
+        rows = db.session.query(
+            ClothingItem.id,
+            ClothingItem.category_id,
+            ClothingItem.weather_min_temp,
+            ClothingItem.weather_max_temp,
+            ClothingItem.is_waterproof,
+            ClothingItem.occasion,
+            WearStats.last_worn,
+            ClothingItem.color_id
+        ).outerjoin(
+            WearStats, WearStats.clothing_item_id == ClothingItem.id
+        ).filter(
+            ClothingItem.user_id == user_id
+        ).order_by(ClothingItem.id).all()
+
+        season_rows = db.session.query(
+            clothing_season.c.clothing_id,
+            clothing_season.c.season_id
+        ).join(
+            ClothingItem, ClothingItem.id == clothing_season.c.clothing_id
+        ).filter(ClothingItem.user_id == user_id).all()
+
+        # Category names come from the in-process reference data, not a join
+        category_names = get_reference_data().categories
+        rows = [(row[0], category_names.name_of(row[1])) + tuple(row[2:]) for row in rows]
+
+        count = len(rows)
+        today = date.today()
+        categories = tuple(sorted({row[1] for row in rows if row[1]}))
+        occasions = tuple(sorted({row[5] for row in rows if row[5]}))
+        category_index = {name: code for code, name in enumerate(categories)}
+        occasion_index = {name: code for code, name in enumerate(occasions)}
+
+        item_ids = np.empty(count, dtype=np.int64)
+        category_codes = np.full(count, -1, dtype=np.int16)
+        min_temps = np.full(count, -np.inf, dtype=np.float32)
+        max_temps = np.full(count, np.inf, dtype=np.float32)
+        waterproof = np.zeros(count, dtype=bool)
+        occasion_codes = np.full(count, -1, dtype=np.int16)
+        days_since_worn = np.full(count, np.inf, dtype=np.float64)
+        color_ids = np.full(count, -1, dtype=np.int64)
+
+        for i, (item_id, category, min_temp, max_temp, is_waterproof, occasion, last_worn,
+                color_id) in enumerate(rows):
+            item_ids[i] = item_id
+            if category:
+                category_codes[i] = category_index[category]
+            if min_temp is not None:
+                min_temps[i] = min_temp
+            if max_temp is not None:
+                max_temps[i] = max_temp
+            waterproof[i] = bool(is_waterproof)
+            if occasion:
+                occasion_codes[i] = occasion_index[occasion]
+            if last_worn is not None:
+                days_since_worn[i] = (today - last_worn).days
+            if color_id is not None:
+                color_ids[i] = color_id
+
+        season_ids, season_index = dense_seasons(row[1] for row in season_rows)
+        season_masks = np.zeros(count, dtype=np.uint64)
+        if season_rows:
+            positions = np.searchsorted(item_ids, [row[0] for row in season_rows])
+            bits = np.left_shift(np.uint64(1), np.array([season_index[row[1]] for row in season_rows],
+                                                        dtype=np.uint64))
+            np.bitwise_or.at(season_masks, positions, bits)
+
+        return cls(user_id, version, today, categories, occasions, item_ids, category_codes,
+                   min_temps, max_temps, waterproof, occasion_codes, season_ids, season_masks,
+                   days_since_worn, color_ids)
+
+    def candidate_mask(self, temperature=None, is_raining=False, occasion=None, season_id=None):
+        """
+        Return a boolean mask of the items suitable for the given conditions.
+
+        Args:
+            temperature (float, optional): Temperature in Celsius
+            is_raining (bool, optional): Require outerwear to be waterproof
+            occasion (str, optional): Keep items for this occasion or for any occasion
+            season_id (int, optional): Keep items for this season or for any season
+
+        Returns:
+            ndarray[bool]: One entry per item
+        """
+        mask = np.ones(len(self), dtype=bool)
+
+        if temperature is not None:
+            mask &= (self.min_temps <= temperature) & (self.max_temps >= temperature)
+
+        if is_raining:
+            mask &= ~self.outerwear | self.waterproof
+
+        if occasion:
+            code = self.occasion_index.get(occasion, -1)
+            mask &= (self.occasion_codes == -1) | (self.occasion_codes == code)
+
+        if season_id is not None:
+            any_season = self.season_masks == 0
+            if season_id in self.season_index:
+                bit = np.uint64(1) << np.uint64(self.season_index[season_id])
+                any_season |= (self.season_masks & bit) != 0
+            mask &= any_season
+
+        return mask
+
+    def rows_by_category(self, mask):
+        """Group the rows selected by ``mask`` as {category name: ndarray of row indices}"""
+        rows = np.flatnonzero(mask)
+        codes = self.category_codes[rows]
+        return {name: rows[codes == code] for name, code in self.category_index.items()
+                if np.any(codes == code)}
+
+def get_snapshot(user_id):
+    """
+    Return the wardrobe snapshot for a user, rebuilding it only if stale.
+
+    A snapshot is reused until the user's ``wardrobe_version`` changes (any
+    write to their items, outfits or wear logs) or the day rolls over, since
+    ``days_since_worn`` is relative to the build date.
+
+    Args:
+        user_id (int): User ID
+
+    Returns:
+        WardrobeSnapshot: Snapshot of the user's wardrobe
+    """
+    version = wardrobe_version(user_id)
+
+    with _lock:
+        snapshot = _snapshots.get(user_id)
+        if snapshot is not None and snapshot.version == version and snapshot.built_on == date.today():
+            _snapshots.move_to_end(user_id)
+            return snapshot
+
+    snapshot = WardrobeSnapshot.build(user_id, version)
+
+    with _lock:
+        _snapshots[user_id] = snapshot
+        _snapshots.move_to_end(user_id)
+        while len(_snapshots) > MAX_SNAPSHOTS:
+            _snapshots.popitem(last=False)
+
+    return snapshot
+
+def clear_snapshots():
+    """Forget every snapshot held by this process"""
+    with _lock:
+        _snapshots.clear()
+
+@on_wardrobe_change
+def _drop_snapshots(user_ids):
+    """Forget this process's snapshots for users whose wardrobe just changed"""
+    with _lock:
+        for user_id in user_ids:
+            _snapshots.pop(user_id, None)
@@ -1,10 +1,52 @@
-import requests
-from flask import current_app
+import json
 import logging
+import threading
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models.weather_cache import WeatherCache
+from app.services.locations import location_coordinates, location_key
+from app.services.single_flight import SingleFlight
+from app.services.weather_providers import get_weather_provider
+from app.services.weather_quota import BACKGROUND, weather_priority
+
+# Seconds after which another worker may take over a refresh that never finished
+REFRESH_TIMEOUT = 60
+
+# In-flight upstream fetches and asyncio lookups, per normalized location
+_fetch_flight = SingleFlight()
+_lookup_flight = SingleFlight()
+
+_stats = {'hits': 0, 'misses': 0, 'stale': 0, 'refreshes': 0, 'errors': 0}
+_stats_lock = threading.Lock()
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+def weather_cache_stats():
+    """Return this process's weather cache counters"""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats['coalesced'] = _fetch_flight.coalesced + _lookup_flight.coalesced
+    lookups = stats['hits'] + stats['stale'] + stats['misses']
+    stats['hit_rate'] = round((stats['hits'] + stats['stale']) / lookups, 4) if lookups else None
+    return stats
 
 def get_weather_data(location):
     """
-    Fetch weather data for a given location
+    Get weather data for a location, served from the shared weather cache
+    
+    The cache is keyed by canonical location (see ``resolve_location``), so
+    different spellings of one place share an entry. Entries younger than ``WEATHER_CACHE_TTL`` seconds are returned as is.
+    Older entries are still returned for up to ``WEATHER_CACHE_STALE_TTL``
+    more seconds while one worker refreshes them in the background; past
+    that the caller fetches synchronously. If the upstream call fails, the
+    last stored value is returned instead of nothing.
     
     Args:
         location (str): City, Country (e.g., "London, UK")
@@ -12,57 +54,145 @@ def get_weather_data(location):
     Returns:
         dict: Weather data including temperature, condition, etc. or None if failed
     """
-    api_key = current_app.config.get('WEATHER_API_KEY')
+    key = location_key(location)
+    ttl = current_app.config.get('WEATHER_CACHE_TTL')
+    if not key or not ttl:
+        return fetch_weather_data(location)
     
-    # If no API key is configured, return mock data for development
-    if not api_key:
-        logging.warning("No weather API key configured, returning mock data")
-        return {
-            'location': location,
-            'temperature': 22.5,
-            'condition': 'Partly cloudy',
-            'humidity': 65,
-            'wind_speed': 10,
-            'is_raining': False,
-            'icon': 'partly-cloudy'
-        }
+    now = datetime.utcnow()
+    entry = _read_cache(key)
+    if entry is not None:
+        age = (now - entry.fetched_at).total_seconds()
+        if age < ttl:
+            _count('hits')
+            return json.loads(entry.data)
+        if age < ttl + current_app.config.get('WEATHER_CACHE_STALE_TTL', 0):
+            _count('stale')
+            if _claim_refresh(key, now):
+                _refresh_in_background(location, key)
+            return json.loads(entry.data)
     
-    try:
-        # Using OpenWeatherMap API (you can replace with any weather API)
-        base_url = "https://api.openweathermap.org/data/2.5/weather"
-        params = {
-            'q': location,
-            'appid': api_key,
-            'units': 'metric'  # for temperature in Celsius
-        }
-        
-        response = requests.get(base_url, params=params)
-        response.raise_for_status()  # Raise exception for HTTP errors
-        
-        data = response.json()
-        
-        # Check if we have valid data
-        if 'main' not in data or 'weather' not in data:
-            logging.error(f"Invalid weather data received for {location}")
-            return None
-        
-        # Extract and format relevant weather information
-        weather_data = {
-            'location': location,
-            'temperature': data['main']['temp'],
-            'condition': data['weather'][0]['main'],
-            'description': data['weather'][0]['description'],
-            'humidity': data['main']['humidity'],
-            'wind_speed': data['wind']['speed'],
-            'is_raining': data['weather'][0]['main'].lower() in ['rain', 'drizzle', 'thunderstorm'],
-            'icon': data['weather'][0]['icon']
-        }
+    # Concurrent misses for the same location share one upstream call
+    _count('misses')
+    weather_data = _fetch_flight.do(key, refresh_weather_data, location)
+    if weather_data is None and entry is not None:
+        logging.warning(f"Serving expired weather for {location}")
+        return json.loads(entry.data)
+    return weather_data
+
+async def get_weather_data_async(location):
+    """
+    Asyncio counterpart of ``get_weather_data``
+    
+    The lookup runs on the event loop's thread pool inside this app's
+    context. Concurrent awaiters for the same location share one lookup,
+    and its upstream fetch is shared with threaded callers as well.
+    
+    Args:
+        location (str): City, Country (e.g., "London, UK")
         
-        return weather_data
+    Returns:
+        dict: Weather data or None if failed
+    """
+    app = current_app._get_current_object()
+    
+    def lookup():
+        with app.app_context():
+            return get_weather_data(location)
+    
+    return await _lookup_flight.do_async(location_key(location) or location, lookup)
+
+def refresh_weather_data(location):
+    """
+    Fetch a location from upstream now and store it in the weather cache
+    
+    Args:
+        location (str): City, Country (e.g., "London, UK")
         
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Error fetching weather data: {e}")
+    Returns:
+        dict: Fresh weather data, or None if the fetch failed
+    """
+    key = location_key(location)
+    weather_data = fetch_weather_data(location)
+    if weather_data is None:
+        _count('errors')
         return None
-    except (KeyError, ValueError) as e:
-        logging.error(f"Error parsing weather data: {e}")
-        return None 
\ No newline at end of file
+    if key:
+        _store(key, location, weather_data, datetime.utcnow())
+    return weather_data
+
+def cached_fetch_times(keys):
+    """Return {location key: fetched_at} for the given keys that are cached"""
+    table = WeatherCache.__table__
+    with db.engine.connect() as conn:
+        return dict(conn.execute(
+            select(table.c.location_key, table.c.fetched_at).where(table.c.location_key.in_(list(keys)))
+        ).all())
+
+def _read_cache(key):
+    """Return the cache row for a location key, or None"""
+    table = WeatherCache.__table__
+    with db.engine.connect() as conn:
+        return conn.execute(
+            select(table.c.data, table.c.fetched_at).where(table.c.location_key == key)
+        ).first()
+
+def _claim_refresh(key, now):
+    """Mark a stale entry as being refreshed; False if another worker already is"""
+    table = WeatherCache.__table__
+    with db.engine.begin() as conn:
+        result = conn.execute(
+            update(table).where(
+                table.c.location_key == key,
+                or_(table.c.refresh_started_at.is_(None),
+                    table.c.refresh_started_at < now - timedelta(seconds=REFRESH_TIMEOUT))
+            ).values(refresh_started_at=now)
+        )
+    return result.rowcount == 1
+
+def _store(key, location, weather_data, fetched_at):
+    """Replace the cache row for a location key in its own transaction"""
+    table = WeatherCache.__table__
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(delete(table).where(table.c.location_key == key))
+            conn.execute(insert(table).values(
+                location_key=key,
+                location=location,
+                data=json.dumps(weather_data),
+                fetched_at=fetched_at
+            ))
+    except IntegrityError:
+        # Another worker stored the same location at the same moment
+        pass
+
+def _refresh_in_background(location, key):
+    """Fetch a location again on a daemon thread and store the result"""
+    app = current_app._get_current_object()
+    
+    def refresh():
+        with app.app_context(), weather_priority(BACKGROUND):
+            _count('refreshes')
+            weather_data = fetch_weather_data(location)
+            if weather_data is None:
+                _count('errors')
+                return
+            _store(key, location, weather_data, datetime.utcnow())
+    
+    threading.Thread(target=refresh, name=f'weather-refresh-{key}', daemon=True).start()
+
+def fetch_weather_data(location):
+    """
+    Fetch weather data for a given location from the configured weather provider
+    
+    The provider is chosen by ``WEATHER_PROVIDER`` (see
+    ``create_weather_provider``); without an API key it is a fixed mock.
+    
+    Args:
+        location (str): City, Country (e.g., "London, UK")
+        
+    Returns:
+        dict: Weather data including temperature, condition, etc. or None if failed
+    """
+    # Geocoded locations are fetched by coordinates, others by name
+    return get_weather_provider().current(location, location_coordinates(location))
\ No newline at end of file
@@ -0,0 +1,197 @@
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from flask import current_app
+from requests.adapters import HTTPAdapter
+
+from app.services.weather_quota import WeatherQuota
+
+# Responses remembered per client for serving while upstream is unhealthy
+MAX_LAST_GOOD = 1024
+
+# Upstream statuses worth retrying; other 4xx errors are the caller's fault
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+class WeatherUnavailable(Exception):
+    """Raised when the weather API cannot be reached and no earlier response is known"""
+
+class QuotaExceeded(WeatherUnavailable):
+    """Raised when the call budget is spent and no earlier response is known"""
+
+class CircuitBreaker:
+    """
+    Fail fast while an upstream keeps failing.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    rejects calls for ``reset_timeout`` seconds. It then lets a single trial
+    call through (half-open): success closes it, failure opens it again.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half-open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Return True if a call may go upstream now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def release(self):
+        """Hand back a half-open trial that never reached upstream, so the next call may make it"""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logging.warning(f'Weather API circuit opened after {self.failures} failures')
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+class WeatherClient:
+    """
+    HTTP client for the weather API.
+
+    One pooled ``requests.Session`` is shared by every thread, so connections
+    stay alive between calls. Each request has connect and read timeouts,
+    retryable failures (network errors, 429 and 5xx) are retried a bounded
+    number of times with jittered exponential backoff, and a circuit breaker
+    stops calling upstream while it is unhealthy. With a ``quota``, every
+    attempt first takes a call from the shared budget. While the breaker is
+    open, the budget is spent, or after retries run out, the last good
+    response for the same request is returned if there is one.
+    """
+
+    def __init__(self, base_url, api_key, connect_timeout=3.05, read_timeout=5.0, retries=2,
+                 backoff=0.2, pool_size=10, failure_threshold=5, reset_timeout=30.0, quota=None):
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.quota = quota
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._last_good = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        """Build a client from the ``WEATHER_*`` settings of an app config"""
+        return cls(
+            config.get('WEATHER_API_URL', 'https://api.openweathermap.org'),
+            config.get('WEATHER_API_KEY'),
+            connect_timeout=config.get('WEATHER_CONNECT_TIMEOUT', 3.05),
+            read_timeout=config.get('WEATHER_READ_TIMEOUT', 5.0),
+            retries=config.get('WEATHER_RETRIES', 2),
+            backoff=config.get('WEATHER_RETRY_BACKOFF', 0.2),
+            pool_size=config.get('WEATHER_POOL_SIZE', 10),
+            failure_threshold=config.get('WEATHER_BREAKER_THRESHOLD', 5),
+            reset_timeout=config.get('WEATHER_BREAKER_RESET', 30.0),
+            quota=WeatherQuota.from_config(config)
+        )
+
+    def get_json(self, path, params):
+        """
+        GET an API path and return the decoded JSON body.
+
+        Args:
+            path (str): Path below the base URL (e.g. ``/data/2.5/weather``)
+            params (dict): Query parameters, without the API key
+
+        Returns:
+            dict: Response body
+
+        Raises:
+            WeatherUnavailable: Upstream is failing and no earlier response is known
+            QuotaExceeded: The call budget is spent and no earlier response is known
+            requests.HTTPError: Upstream rejected the request (e.g. unknown location)
+        """
+        key = (path, tuple(sorted(params.items())))
+
+        if not self.breaker.allow():
+            return self._fallback(key, WeatherUnavailable('Weather API circuit is open'))
+
+        last_error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                # Full jitter keeps many workers from retrying in lockstep
+                time.sleep(random.uniform(0, self.backoff * 2 ** (attempt - 1)))
+            if self.quota is not None and not self.quota.acquire():
+                if not attempt:
+                    self.breaker.release()
+                    return self._fallback(key, QuotaExceeded('Weather API call budget is spent'))
+                break
+            try:
+                response = self.session.get(self.base_url + path, params={**params, 'appid': self.api_key},
+                                            timeout=self.timeout)
+            except requests.RequestException as e:
+                # Any transport failure (including a body cut short) counts against the breaker
+                last_error = e
+                continue
+
+            if response.status_code in RETRY_STATUSES:
+                if response.status_code == 429 and self.quota is not None:
+                    # Upstream says we are over the limit; stop every worker for a while
+                    self.quota.drain()
+                last_error = requests.HTTPError(f'{response.status_code} from weather API', response=response)
+                continue
+
+            # Upstream answered; a 4xx here is about the request, not its health
+            self.breaker.record_success()
+            response.raise_for_status()
+            data = response.json()
+            with self._lock:
+                self._last_good[key] = data
+                self._last_good.move_to_end(key)
+                while len(self._last_good) > MAX_LAST_GOOD:
+                    self._last_good.popitem(last=False)
+            return data
+
+        self.breaker.record_failure()
+        return self._fallback(key, WeatherUnavailable(f'Weather API failed after {self.retries + 1} attempts: '
+                                                      f'{last_error}'))
+
+    def _fallback(self, key, error):
+        """Return the last good response for ``key`` or raise ``error``"""
+        with self._lock:
+            data = self._last_good.get(key)
+        if data is None:
+            raise error
+        logging.warning(f'Serving last good weather response: {error}')
+        return data
+
+def get_weather_client():
+    """Return the current app's weather client, creating it on first use"""
+    client = current_app.extensions.get('weather_client')
+    if client is None:
+        client = current_app.extensions.setdefault('weather_client', WeatherClient.from_config(current_app.config))
+    return client
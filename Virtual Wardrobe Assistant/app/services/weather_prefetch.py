@@ -0,0 +1,122 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from flask import current_app
+
+from app import db
+from app.models.user import User
+from app.services.forecast import forecast_fetch_times, refresh_forecast
+from app.services.locations import location_key
+from app.services.weather import cached_fetch_times, refresh_weather_data
+from app.services.weather_quota import BACKGROUND, weather_priority
+
+def user_locations():
+    """
+    Return {canonical location key: location} for every distinct user location
+
+    New locations are geocoded at background priority, like the fetches.
+    """
+    locations = {}
+    rows = db.session.query(User.location).filter(User.location.isnot(None), User.location != '').distinct()
+    with weather_priority(BACKGROUND):
+        for (location,) in rows:
+            key = location_key(location)
+            if key:
+                locations.setdefault(key, location)
+    return locations
+
+def prefetch_weather(workers=None, interval=None):
+    """
+    Refresh the weather cache and forecast store for every distinct user location.
+    
+    Only locations whose cached weather (or stored forecast) would go stale
+    before the next run (``interval`` seconds from now) are fetched,
+    concurrently on a bounded thread pool, so page handlers find fresh
+    weather locally. Must run inside an app context.
+    
+    Args:
+        workers (int, optional): Concurrent fetches (default: ``WEATHER_PREFETCH_WORKERS``)
+        interval (float, optional): Seconds until the next run (default: ``WEATHER_PREFETCH_INTERVAL``)
+        
+    Returns:
+        dict: Counts of ``fetched``, ``failed`` and ``skipped`` locations, and of
+        ``forecasts`` fetched and ``forecasts_failed``
+    """
+    config = current_app.config
+    workers = workers or config.get('WEATHER_PREFETCH_WORKERS', 8)
+    interval = config.get('WEATHER_PREFETCH_INTERVAL', 300) if interval is None else interval
+    ttl = config.get('WEATHER_CACHE_TTL') or 0
+    forecast_ttl = config.get('FORECAST_TTL') or 0
+    
+    locations = user_locations()
+    now = datetime.utcnow()
+    
+    def due(fetch_times, ttl):
+        return [location for key, location in locations.items()
+                if key not in fetch_times or (now - fetch_times[key]).total_seconds() + interval >= ttl]
+    
+    weather_due = due(cached_fetch_times(locations), ttl)
+    forecast_due = due(forecast_fetch_times(locations), forecast_ttl)
+    
+    app = current_app._get_current_object()
+    
+    # Prefetching ranks below page loads for the API call budget
+    def fetch(refresh, location):
+        with app.app_context(), weather_priority(BACKGROUND):
+            return refresh(location) is not None
+    
+    weather_results, forecast_results = [], []
+    if weather_due or forecast_due:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='weather-prefetch') as pool:
+            weather_futures = [pool.submit(fetch, refresh_weather_data, location) for location in weather_due]
+            forecast_futures = [pool.submit(fetch, refresh_forecast, location) for location in forecast_due]
+            weather_results = [future.result() for future in weather_futures]
+            forecast_results = [future.result() for future in forecast_futures]
+    
+    return {
+        'fetched': sum(weather_results),
+        'failed': len(weather_results) - sum(weather_results),
+        'skipped': len(locations) - len(weather_due),
+        'forecasts': sum(forecast_results),
+        'forecasts_failed': len(forecast_results) - sum(forecast_results)
+    }
+
+def run_prefetcher(app, interval=None, workers=None, stop_event=None):
+    """
+    Prefetch weather every ``interval`` seconds until ``stop_event`` is set.
+    
+    Args:
+        app (Flask): Application whose database and config to use
+        interval (float, optional): Seconds between runs (default: ``WEATHER_PREFETCH_INTERVAL``)
+        workers (int, optional): Concurrent fetches per run
+        stop_event (threading.Event, optional): Set to stop the loop
+    """
+    stop_event = stop_event or threading.Event()
+    interval = interval or app.config.get('WEATHER_PREFETCH_INTERVAL', 300)
+    while not stop_event.is_set():
+        with app.app_context():
+            try:
+                counts = prefetch_weather(workers=workers, interval=interval)
+                logging.info(f"Weather prefetch: {counts}")
+            except Exception:
+                logging.exception("Weather prefetch failed")
+            finally:
+                db.session.remove()
+        stop_event.wait(interval)
+
+def start_prefetch_thread(app):
+    """
+    Run the prefetcher on a daemon thread of this process.
+    
+    Meant for single-process deployments; with several workers, run
+    ``flask prefetch-weather --loop`` once instead.
+    
+    Returns:
+        threading.Event: Set it to stop the thread
+    """
+    stop_event = threading.Event()
+    threading.Thread(target=run_prefetcher, args=(app,), kwargs={'stop_event': stop_event},
+                     name='weather-prefetcher', daemon=True).start()
+    return stop_event
\ No newline at end of file
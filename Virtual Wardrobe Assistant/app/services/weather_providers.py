@@ -0,0 +1,337 @@
+import bisect
+import json
+import logging
+import random
+import threading
+import time
+import zlib
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import requests
+from flask import current_app
+
+from app.services.weather_client import WeatherUnavailable, get_weather_client
+
+# Conditions (OpenWeatherMap "main" values) that count as rain
+RAIN_CONDITIONS = ('rain', 'drizzle', 'thunderstorm')
+
+# Step length assumed when a forecast has a single entry
+DEFAULT_STEP = timedelta(hours=3)
+
+# OpenWeatherMap endpoints by kind of request
+ENDPOINTS = {
+    'weather': '/data/2.5/weather',
+    'forecast': '/data/2.5/forecast',
+    'geocode': '/geo/1.0/direct'
+}
+
+class WeatherProvider:
+    """
+    Source of current weather, forecasts and geocoding.
+
+    ``current`` returns the weather dict used throughout the app,
+    ``forecast`` a list of forecast step dicts (see ``fetch_forecast``) and
+    ``geocode`` a place dict. ``current`` and ``forecast`` return None when
+    the provider has nothing; ``geocode`` raises ``WeatherUnavailable`` when
+    it cannot answer right now, so the location is not stored as unknown.
+    """
+
+    def current(self, location, coordinates=None):
+        """
+        Args:
+            location (str): City, Country (e.g., "London, UK")
+            coordinates (tuple, optional): ``(latitude, longitude)`` if geocoded
+
+        Returns:
+            dict: Weather data or None if unavailable
+        """
+        raise NotImplementedError
+
+    def forecast(self, location, coordinates=None):
+        """Return a location's forecast steps, oldest first, or None if unavailable"""
+        raise NotImplementedError
+
+    def geocode(self, location):
+        """Return ``name``, ``country``, ``latitude`` and ``longitude`` for a place, or None if unknown"""
+        return None
+
+class MockWeatherProvider(WeatherProvider):
+    """Fixed mild, partly cloudy weather everywhere, for development without an API key"""
+
+    def current(self, location, coordinates=None):
+        return {
+            'location': location,
+            'temperature': 22.5,
+            'condition': 'Partly cloudy',
+            'humidity': 65,
+            'wind_speed': 10,
+            'is_raining': False,
+            'icon': 'partly-cloudy'
+        }
+
+    def forecast(self, location, coordinates=None):
+        start = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        start -= timedelta(hours=start.hour % 3)
+        return [{
+            'period': 'hourly',
+            'starts_at': start + i * DEFAULT_STEP,
+            'ends_at': start + (i + 1) * DEFAULT_STEP,
+            'local_date': (start + i * DEFAULT_STEP).date(),
+            'temperature': 22.5,
+            'min_temp': 22.5,
+            'max_temp': 22.5,
+            'condition': 'Partly cloudy',
+            'description': 'partly cloudy',
+            'humidity': 65,
+            'wind_speed': 10,
+            'rain_probability': 0,
+            'is_raining': False,
+            'icon': 'partly-cloudy'
+        } for i in range(40)]
+
+class OpenWeatherMapProvider(WeatherProvider):
+    """
+    Weather from the OpenWeatherMap API, through the pooled ``WeatherClient``.
+
+    With ``record_path`` set, every raw response is appended to that file
+    as one JSON line, in the fixture format ``ReplayWeatherProvider`` reads.
+    """
+
+    def __init__(self, client, record_path=None):
+        self.client = client
+        self.record_path = record_path
+        self._record_lock = threading.Lock()
+
+    def fetch(self, kind, location, coordinates=None):
+        """
+        Return the raw response body for one kind of request.
+
+        Args:
+            kind (str): ``'weather'``, ``'forecast'`` or ``'geocode'``
+            location (str): Location as typed
+            coordinates (tuple, optional): ``(latitude, longitude)``; used instead of the name
+
+        Raises:
+            WeatherUnavailable: Upstream is failing
+            requests.HTTPError: Upstream rejected the request
+        """
+        if kind == 'geocode':
+            params = {'q': location, 'limit': 1}
+        elif coordinates is not None:
+            params = {'lat': coordinates[0], 'lon': coordinates[1], 'units': 'metric'}
+        else:
+            params = {'q': location, 'units': 'metric'}
+
+        body = self.client.get_json(ENDPOINTS[kind], params)
+        if self.record_path:
+            self._record(kind, location, body)
+        return body
+
+    def current(self, location, coordinates=None):
+        try:
+            data = self.fetch('weather', location, coordinates)
+
+            # Check if we have valid data
+            if 'main' not in data or 'weather' not in data:
+                logging.error(f"Invalid weather data received for {location}")
+                return None
+
+            return {
+                'location': location,
+                'temperature': data['main']['temp'],
+                'condition': data['weather'][0]['main'],
+                'description': data['weather'][0]['description'],
+                'humidity': data['main']['humidity'],
+                'wind_speed': data['wind']['speed'],
+                'is_raining': data['weather'][0]['main'].lower() in RAIN_CONDITIONS,
+                'icon': data['weather'][0]['icon']
+            }
+        except (WeatherUnavailable, requests.exceptions.RequestException) as e:
+            logging.error(f"Error fetching weather data: {e}")
+            return None
+        except (KeyError, ValueError) as e:
+            logging.error(f"Error parsing weather data: {e}")
+            return None
+
+    def forecast(self, location, coordinates=None):
+        try:
+            data = self.fetch('forecast', location, coordinates)
+
+            # Steps are keyed by UTC time; local dates use the location's UTC offset
+            offset = timedelta(seconds=data.get('city', {}).get('timezone', 0))
+            entries = sorted(data['list'], key=lambda entry: entry['dt'])
+            step = timedelta(seconds=entries[1]['dt'] - entries[0]['dt']) if len(entries) > 1 else DEFAULT_STEP
+
+            steps = []
+            for entry in entries:
+                starts_at = datetime.utcfromtimestamp(entry['dt'])
+                condition = entry['weather'][0]['main']
+                steps.append({
+                    'period': 'hourly',
+                    'starts_at': starts_at,
+                    'ends_at': starts_at + step,
+                    'local_date': (starts_at + offset).date(),
+                    'temperature': entry['main']['temp'],
+                    'min_temp': entry['main'].get('temp_min', entry['main']['temp']),
+                    'max_temp': entry['main'].get('temp_max', entry['main']['temp']),
+                    'condition': condition,
+                    'description': entry['weather'][0]['description'],
+                    'humidity': entry['main']['humidity'],
+                    'wind_speed': entry['wind']['speed'],
+                    'rain_probability': entry.get('pop'),
+                    'is_raining': condition.lower() in RAIN_CONDITIONS,
+                    'icon': entry['weather'][0]['icon']
+                })
+            return steps
+        except (WeatherUnavailable, requests.exceptions.RequestException) as e:
+            logging.error(f"Error fetching forecast: {e}")
+            return None
+        except (KeyError, IndexError, ValueError) as e:
+            logging.error(f"Error parsing forecast: {e}")
+            return None
+
+    def geocode(self, location):
+        try:
+            results = self.fetch('geocode', location)
+        except requests.exceptions.HTTPError as e:
+            logging.error(f"Geocoding rejected {location}: {e}")
+            return None
+        if not results:
+            return None
+        try:
+            place = results[0]
+            return {
+                'name': place.get('name'),
+                'country': place.get('country'),
+                'latitude': place['lat'],
+                'longitude': place['lon']
+            }
+        except (KeyError, IndexError, TypeError, AttributeError) as e:
+            # Not stored as an unknown place; the alias is looked up again later
+            raise WeatherUnavailable(f'Invalid geocoding response for {location}: {e}')
+
+    def _record(self, kind, location, body):
+        """Append one response to the recording file"""
+        line = json.dumps({
+            'kind': kind,
+            'location': location,
+            'recorded_at': datetime.utcnow().isoformat(),
+            'body': body
+        })
+        with self._record_lock:
+            with open(self.record_path, 'a') as f:
+                f.write(line + '\n')
+
+class ReplayWeatherProvider(OpenWeatherMapProvider):
+    """
+    Serve recorded OpenWeatherMap responses instead of calling the API.
+
+    Recordings are JSON lines as written by ``OpenWeatherMapProvider`` with
+    ``record_path`` set. Each lookup picks the recording for the same
+    (normalized) location whose time of day is closest to now; locations
+    that were never recorded are mapped onto a recorded one by a stable
+    hash, so a small fixture covers any number of users. Forecasts are
+    shifted forward to start now. Every lookup first sleeps ``latency`` plus
+    up to ``jitter`` seconds and fails with ``WeatherUnavailable`` at
+    ``error_rate``, so load tests see realistic upstream behaviour offline.
+    """
+
+    def __init__(self, path, latency=0.0, jitter=0.0, error_rate=0.0):
+        super().__init__(client=None)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+
+        recordings = defaultdict(lambda: defaultdict(list))
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    recorded_at = datetime.fromisoformat(record['recorded_at'])
+                    recordings[record['kind']][_fixture_key(record['location'])].append((recorded_at, record['body']))
+
+        # {kind: {location: ([seconds into the day], [(recorded_at, body)])}}, sorted by time of day
+        self.recordings = {}
+        for kind, by_location in recordings.items():
+            self.recordings[kind] = {}
+            for location, rows in by_location.items():
+                rows.sort(key=lambda row: _seconds_of_day(row[0]))
+                self.recordings[kind][location] = ([_seconds_of_day(at) for at, _ in rows], rows)
+
+    def fetch(self, kind, location, coordinates=None):
+        time.sleep(self.latency + random.uniform(0, self.jitter))
+        if self.error_rate and random.random() < self.error_rate:
+            raise WeatherUnavailable('Injected replay failure')
+
+        by_location = self.recordings.get(kind, {})
+        key = _fixture_key(location)
+        if key not in by_location:
+            if kind == 'geocode':
+                return []
+            if not by_location:
+                raise WeatherUnavailable(f'No recorded {kind} responses to replay')
+            names = sorted(by_location)
+            key = names[zlib.crc32(key.encode()) % len(names)]
+
+        times, rows = by_location[key]
+        now = datetime.utcnow()
+        recorded_at, body = _nearest(times, rows, _seconds_of_day(now))
+        if kind == 'forecast':
+            body = _shift_forecast(body, now - recorded_at)
+        return body
+
+def _fixture_key(location):
+    """Normalize a location the way recordings are matched"""
+    from app.services.locations import normalize_location
+    return normalize_location(location)
+
+def _seconds_of_day(moment):
+    return moment.hour * 3600 + moment.minute * 60 + moment.second
+
+def _nearest(times, rows, seconds):
+    """Return the row whose time of day is closest to ``seconds``, wrapping at midnight"""
+    index = bisect.bisect_left(times, seconds)
+    candidates = {index % len(rows), (index - 1) % len(rows)}
+    best = min(candidates, key=lambda i: min(abs(times[i] - seconds), 86400 - abs(times[i] - seconds)))
+    return rows[best]
+
+def _shift_forecast(body, delta):
+    """Move a recorded forecast forward by ``delta``, in whole steps so step boundaries are kept"""
+    entries = body.get('list') or []
+    step = entries[1]['dt'] - entries[0]['dt'] if len(entries) > 1 else int(DEFAULT_STEP.total_seconds())
+    shift = int(delta.total_seconds()) // step * step
+    return dict(body, list=[dict(entry, dt=entry['dt'] + shift) for entry in entries])
+
+def create_weather_provider(config):
+    """
+    Build the weather provider named by ``WEATHER_PROVIDER``.
+
+    ``'openweathermap'``, ``'mock'`` or ``'replay'`` (reading
+    ``WEATHER_REPLAY_PATH``); when unset, OpenWeatherMap is used if
+    ``WEATHER_API_KEY`` is set and the mock otherwise.
+
+    Raises:
+        ValueError: Unknown provider name
+    """
+    name = config.get('WEATHER_PROVIDER') or ('openweathermap' if config.get('WEATHER_API_KEY') else 'mock')
+    if name == 'openweathermap':
+        return OpenWeatherMapProvider(get_weather_client(), record_path=config.get('WEATHER_RECORD_PATH'))
+    if name == 'mock':
+        logging.warning("Using mock weather provider")
+        return MockWeatherProvider()
+    if name == 'replay':
+        return ReplayWeatherProvider(
+            config['WEATHER_REPLAY_PATH'],
+            latency=config.get('WEATHER_REPLAY_LATENCY', 0.0),
+            jitter=config.get('WEATHER_REPLAY_JITTER', 0.0),
+            error_rate=config.get('WEATHER_REPLAY_ERROR_RATE', 0.0)
+        )
+    raise ValueError(f"Unknown WEATHER_PROVIDER {name!r} (expected 'openweathermap', 'mock' or 'replay')")
+
+def get_weather_provider():
+    """Return the current app's weather provider, creating it on first use"""
+    provider = current_app.extensions.get('weather_provider')
+    if provider is None:
+        provider = current_app.extensions.setdefault('weather_provider', create_weather_provider(current_app.config))
+    return provider
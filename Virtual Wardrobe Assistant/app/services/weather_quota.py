@@ -0,0 +1,128 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import case, insert, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from app import db
+from app.models.api_quota import ApiQuota
+
+# Call priorities; background calls may not dip into the interactive reserve
+INTERACTIVE = 'interactive'
+BACKGROUND = 'background'
+
+_priority = ContextVar('weather_priority', default=INTERACTIVE)
+
+@contextmanager
+def weather_priority(priority):
+    """Run weather calls made in this block (and thread) at ``priority``"""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def current_priority():
+    """Return the priority of weather calls made now"""
+    return _priority.get()
+
+class WeatherQuota:
+    """
+    Token bucket for the weather API's call limit, shared by every worker.
+    
+    The bucket lives in one row of ``api_quotas``. Taking a token is a single
+    conditional UPDATE that refills the bucket for the time elapsed and
+    spends one call only if enough remain, so concurrent workers can never
+    overspend it. Interactive calls may use the whole bucket; background
+    calls (prefetching, stale refreshes, precomputing) are refused once only
+    ``background_reserve`` of it is left, keeping that share for page loads.
+    
+    Attributes:
+        capacity (float): Calls that may be made in a burst
+        rate (float): Calls added back per second
+        granted (int): Calls allowed by this process
+        denied (int): Calls refused by this process
+    """
+    
+    def __init__(self, name, per_minute, burst=None, background_reserve=0.25):
+        self.name = name
+        self.capacity = float(burst or per_minute)
+        self.rate = per_minute / 60.0
+        self.reserves = {INTERACTIVE: 0.0, BACKGROUND: self.capacity * background_reserve}
+        self.granted = 0
+        self.denied = 0
+        self._ready = False
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls, config, name='openweathermap'):
+        """Build the quota from ``WEATHER_QUOTA_*`` settings, or return None if there is no limit"""
+        per_minute = config.get('WEATHER_QUOTA_PER_MINUTE')
+        if not per_minute:
+            return None
+        return cls(name, per_minute,
+                   burst=config.get('WEATHER_QUOTA_BURST'),
+                   background_reserve=config.get('WEATHER_QUOTA_BACKGROUND_RESERVE', 0.25))
+    
+    def acquire(self, priority=None):
+        """
+        Take one call from the bucket.
+        
+        Must run inside an app context. If the bucket cannot be read (e.g.
+        its table is missing) the call is allowed, so quota bookkeeping never
+        takes weather down by itself.
+        
+        Args:
+            priority (str, optional): ``INTERACTIVE`` or ``BACKGROUND`` (default: ``current_priority()``)
+            
+        Returns:
+            bool: True if the call may go upstream
+        """
+        reserve = self.reserves[priority or current_priority()]
+        table = ApiQuota.__table__
+        now = time.time()
+        refilled = table.c.tokens + (now - table.c.refilled_at) * self.rate
+        available = case((refilled > self.capacity, self.capacity), else_=refilled)
+        try:
+            self._ensure_bucket()
+            with db.engine.begin() as conn:
+                result = conn.execute(
+                    update(table)
+                    .where(table.c.name == self.name, available - 1 >= reserve)
+                    .values(tokens=available - 1, refilled_at=now)
+                )
+        except SQLAlchemyError as e:
+            logging.error(f"Weather quota unavailable, allowing call: {e}")
+            return True
+        
+        with self._lock:
+            if result.rowcount == 1:
+                self.granted += 1
+                return True
+            self.denied += 1
+            return False
+    
+    def drain(self):
+        """Empty the bucket, e.g. after upstream answered 429, so every worker backs off"""
+        table = ApiQuota.__table__
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(update(table).where(table.c.name == self.name).values(tokens=0, refilled_at=time.time()))
+        except SQLAlchemyError as e:
+            logging.error(f"Could not drain weather quota: {e}")
+    
+    def _ensure_bucket(self):
+        """Create the bucket row, full, the first time this process uses it"""
+        if self._ready:
+            return
+        table = ApiQuota.__table__
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(insert(table).values(name=self.name, tokens=self.capacity, refilled_at=time.time()))
+        except IntegrityError:
+            # Another worker already created it
+            pass
+        self._ready = True
\ No newline at end of file
@@ -0,0 +1,136 @@
+"""
+Benchmark wardrobe listing pages at increasing depths.
+
+Builds one large wardrobe in a temporary SQLite database, then fetches the
+page at each depth two ways: with ``LIMIT``/``OFFSET``, as a page number in
+the URL would, and with the keyset cursor ``repository.item_page`` returns.
+Reports latency percentiles per depth; keyset pages should cost the same
+however deep they are.
+
+Usage (from the project root):
+    python benchmarks/bench_pagination.py
+    python benchmarks/bench_pagination.py --items 50000 --depths 1 100 1000 --output results.json
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import insert
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db, repository  # noqa: E402
+from app.models.clothing import Category, ClothingItem, Color  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.pagination import encode_cursor  # noqa: E402
+
+DEFAULT_DEPTHS = (1, 10, 100, 500, 1000)
+
+def build_wardrobe(items, page_size):
+    """Insert one user with ``items`` clothing items and return the user's ID"""
+    category, color = Category(name='Tops'), Color(name='Black', hex_code='#000000')
+    user = User('bench', 'bench@example.com', 'benchmark')
+    db.session.add_all([category, color, user])
+    db.session.commit()
+
+    start = datetime(2020, 1, 1)
+    rows = [{'name': f'Item {i}', 'user_id': user.id, 'category_id': category.id, 'color_id': color.id,
+             # Several items share each timestamp, so ties are broken on id
+             'created_at': start + timedelta(seconds=i // 3)}
+            for i in range(items)]
+    for offset in range(0, items, 10000):
+        db.session.execute(insert(ClothingItem), rows[offset:offset + 10000])
+    db.session.commit()
+    return user.id
+
+def cursor_before(user_id, offset):
+    """Return the keyset cursor that starts the page at ``offset``"""
+    if offset == 0:
+        return None
+    created_at, row_id = db.session.query(ClothingItem.created_at, ClothingItem.id).filter_by(
+        user_id=user_id).order_by(ClothingItem.created_at.desc(), ClothingItem.id.desc()).offset(offset - 1).first()
+    return encode_cursor(created_at, row_id)
+
+def time_calls(fn, iterations):
+    """Return per-call latencies in milliseconds"""
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies)
+
+def summarize(latencies):
+    return {
+        'p50': round(float(np.percentile(latencies, 50)), 3),
+        'p99': round(float(np.percentile(latencies, 99)), 3)
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, default=30000, help='Clothing items in the wardrobe')
+    parser.add_argument('--page-size', type=int, default=24, help='Items per page')
+    parser.add_argument('--depths', type=int, nargs='+', default=list(DEFAULT_DEPTHS), help='Page numbers to fetch')
+    parser.add_argument('--iterations', type=int, default=30, help='Fetches per depth and method')
+    parser.add_argument('--output', default='bench_pagination.json', help='Where to write the JSON results')
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.join(tmp, "bench.db")}',
+            'TESTING': True
+        })
+        with app.app_context():
+            db.create_all()
+            user_id = build_wardrobe(args.items, args.page_size)
+            pages = -(-args.items // args.page_size)
+
+            for depth in args.depths:
+                if depth > pages:
+                    print(f'page {depth}: skipped, the wardrobe has {pages} pages')
+                    continue
+                offset = (depth - 1) * args.page_size
+                cursor = cursor_before(user_id, offset)
+                keyset_ids = [item['id'] for item in repository.item_page(user_id, cursor, args.page_size).items]
+
+                offset_query = repository._ITEMS.order_by(
+                    ClothingItem.created_at.desc(), ClothingItem.id.desc()
+                ).limit(args.page_size).offset(offset)
+                offset_ids = [row.id for row in db.session.execute(offset_query, {'user_id': user_id})]
+                if offset_ids != keyset_ids:
+                    raise AssertionError(f'Keyset and offset pages differ at page {depth}')
+
+                offset_ms = time_calls(lambda: db.session.execute(offset_query, {'user_id': user_id}).all(),
+                                       args.iterations)
+                keyset_ms = time_calls(lambda: repository.item_page(user_id, cursor, args.page_size),
+                                       args.iterations)
+                results.append({'page': depth, 'offset_ms': summarize(offset_ms), 'keyset_ms': summarize(keyset_ms)})
+                print(f'page {depth:>6}  offset p50 {results[-1]["offset_ms"]["p50"]:>8.2f} ms  '
+                      f'keyset p50 {results[-1]["keyset_ms"]["p50"]:>8.2f} ms', flush=True)
+            db.session.remove()
+            db.engine.dispose()
+
+    report = {
+        'created_at': datetime.utcnow().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'items': args.items,
+        'page_size': args.page_size,
+        'iterations': args.iterations,
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Wrote {args.output}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,221 @@
+"""
+Benchmark SQLite read throughput while other processes write.
+
+Builds a wardrobe database per connection profile, then runs reader
+processes (the wardrobe listing and dashboard count queries) alone and
+alongside writer processes (adding items and wear logs), the way the Flask
+and Streamlit apps share ``instance/wardrobe.db``. The ``rollback-journal``
+profile is SQLite's default behaviour that both apps used before; ``tuned``
+is ``app.database.PRAGMAS`` with WAL checkpoints on a schedule. Reports
+operations per second, latency percentiles, "database is locked" errors and
+the largest the WAL grew during each run.
+
+Usage (from the project root):
+    python benchmarks/bench_sqlite_concurrency.py
+    python benchmarks/bench_sqlite_concurrency.py --readers 8 --writers 2 --duration 10 --output results.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+import numpy as np
+from sqlalchemy import insert
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db  # noqa: E402
+from app.database import PRAGMAS, connect, start_checkpointer  # noqa: E402
+from app.models.clothing import Category, ClothingItem  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+# Connection settings compared by the benchmark
+PROFILES = {
+    # sqlite3.connect() defaults: rollback journal, full sync, 2 MB cache, 5 s timeout
+    'rollback-journal': {'journal_mode': 'DELETE', 'synchronous': 'FULL', 'cache_size': -2000,
+                         'mmap_size': 0, 'busy_timeout': 5000},
+    'tuned': dict(PRAGMAS)
+}
+
+# Seconds allowed for worker processes to start before the clock runs
+START_DELAY = 1.0
+
+READ_QUERIES = (
+    'SELECT * FROM clothing_items WHERE user_id = ? ORDER BY created_at DESC LIMIT 50',
+    'SELECT count(*) FROM clothing_items WHERE user_id = ?'
+)
+
+def build_database(path, pragmas, users, items):
+    """Create the schema with the given pragmas and fill it with wardrobes"""
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'SQLITE_PRAGMAS': pragmas,
+        'TESTING': True
+    })
+    with app.app_context():
+        db.create_all()
+        category = Category(name='Tops')
+        db.session.add(category)
+        db.session.add_all([User(f'bench{i}', f'bench{i}@example.com', 'benchmark') for i in range(users)])
+        db.session.commit()
+
+        now = datetime.utcnow()
+        db.session.execute(insert(ClothingItem), [
+            {'name': f'Item {i}', 'user_id': i % users + 1, 'category_id': category.id, 'created_at': now}
+            for i in range(users * items)
+        ])
+        db.session.commit()
+        db.session.remove()
+        db.engine.dispose()
+
+def run_worker(role, path, pragmas, users, start_at, stop_at, seed):
+    """
+    Run reads or write transactions in a loop between two wall-clock times.
+
+    Returns:
+        dict: ``role``, ``ops``, ``locked`` errors and per-operation latencies (ms)
+    """
+    rng = random.Random(seed)
+    conn = connect(path, pragmas)
+    ops, locked, latencies = 0, 0, []
+    time.sleep(max(0.0, start_at - time.time()))
+    try:
+        while time.time() < stop_at:
+            user_id = rng.randint(1, users)
+            start = time.perf_counter()
+            try:
+                if role == 'reader':
+                    for query in READ_QUERIES:
+                        conn.execute(query, (user_id,)).fetchall()
+                else:
+                    with conn:
+                        item_id = conn.execute(
+                            'INSERT INTO clothing_items (name, user_id, created_at) VALUES (?, ?, ?)',
+                            (f'New item {ops}', user_id, datetime.utcnow())
+                        ).lastrowid
+                        conn.execute(
+                            'INSERT INTO wear_logs (date, user_id, clothing_item_id, created_at) VALUES (?, ?, ?, ?)',
+                            (date.today(), user_id, item_id, datetime.utcnow())
+                        )
+            except sqlite3.OperationalError as e:
+                if 'locked' not in str(e):
+                    raise
+                locked += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+            ops += 1
+    finally:
+        conn.close()
+    return {'role': role, 'ops': ops, 'locked': locked, 'latencies': latencies}
+
+def summarize(results, role, duration):
+    """Combine one role's worker results into throughput, latency and error figures"""
+    results = [result for result in results if result['role'] == role]
+    if not results:
+        return None
+    latencies = np.array([latency for result in results for latency in result['latencies']] or [0.0])
+    return {
+        'processes': len(results),
+        'ops_per_sec': round(sum(result['ops'] for result in results) / duration, 1),
+        'latency_ms': {
+            'p50': round(float(np.percentile(latencies, 50)), 3),
+            'p99': round(float(np.percentile(latencies, 99)), 3),
+            'max': round(float(latencies.max()), 3)
+        },
+        'locked_errors': sum(result['locked'] for result in results)
+    }
+
+def run_phase(path, pragmas, users, readers, writers, duration, checkpoint_interval, checkpoint_mode):
+    """Run readers and writers against one database for ``duration`` seconds"""
+    stop_checkpointer = None
+    if pragmas['journal_mode'].upper() == 'WAL' and checkpoint_interval:
+        stop_checkpointer = start_checkpointer(path, checkpoint_interval, checkpoint_mode)
+
+    start_at = time.time() + START_DELAY
+    stop_at = start_at + duration
+    roles = ['reader'] * readers + ['writer'] * writers
+    wal_path, max_wal_bytes = f'{path}-wal', 0
+    with multiprocessing.Pool(len(roles)) as pool:
+        pending = pool.starmap_async(run_worker, [(role, path, pragmas, users, start_at, stop_at, seed)
+                                                  for seed, role in enumerate(roles)])
+        # SQLite removes the WAL when the last connection closes, so sample it while running
+        while not pending.ready():
+            if os.path.exists(wal_path):
+                max_wal_bytes = max(max_wal_bytes, os.path.getsize(wal_path))
+            pending.wait(0.1)
+        results = pending.get()
+
+    if stop_checkpointer is not None:
+        stop_checkpointer.set()
+    return {
+        'reads': summarize(results, 'reader', duration),
+        'writes': summarize(results, 'writer', duration),
+        'max_wal_bytes': max_wal_bytes
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--profiles', nargs='+', choices=list(PROFILES), default=list(PROFILES),
+                        help='Connection profiles to compare')
+    parser.add_argument('--readers', type=int, default=4, help='Reader processes')
+    parser.add_argument('--writers', type=int, default=2, help='Writer processes')
+    parser.add_argument('--duration', type=float, default=5.0, help='Seconds per phase')
+    parser.add_argument('--users', type=int, default=50, help='Users in the synthetic database')
+    parser.add_argument('--items', type=int, default=200, help='Clothing items per user')
+    parser.add_argument('--checkpoint-interval', type=float, default=1.0,
+                        help='Seconds between WAL checkpoints in WAL profiles (0 leaves it to SQLite)')
+    parser.add_argument('--checkpoint-mode', choices=('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE'), default='TRUNCATE',
+                        help='Checkpoint mode in WAL profiles')
+    parser.add_argument('--output', default='bench_sqlite_concurrency.json', help='Where to write the JSON results')
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in args.profiles:
+            pragmas = PROFILES[name]
+            path = os.path.join(tmp, f'{name}.db')
+            build_database(path, pragmas, args.users, args.items)
+
+            phases = {
+                'reads_only': run_phase(path, pragmas, args.users, args.readers, 0,
+                                        args.duration, args.checkpoint_interval, args.checkpoint_mode),
+                'reads_during_writes': run_phase(path, pragmas, args.users, args.readers, args.writers,
+                                                 args.duration, args.checkpoint_interval, args.checkpoint_mode)
+            }
+            results.append({'profile': name, 'pragmas': pragmas, 'phases': phases})
+
+            print(name)
+            for phase, figures in phases.items():
+                line = f'  {phase:<20}'
+                for role in ('reads', 'writes'):
+                    if figures[role]:
+                        line += (f'  {role} {figures[role]["ops_per_sec"]:>8.1f}/s '
+                                 f'p99 {figures[role]["latency_ms"]["p99"]:>8.2f} ms '
+                                 f'locked {figures[role]["locked_errors"]:>4}')
+                print(f'{line}  wal max {figures["max_wal_bytes"] / 1024:>8.1f} KiB', flush=True)
+
+    report = {
+        'created_at': datetime.utcnow().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'readers': args.readers,
+        'writers': args.writers,
+        'duration': args.duration,
+        'users': args.users,
+        'items': args.items,
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Wrote {args.output}')
+
+if __name__ == '__main__':
+    main()
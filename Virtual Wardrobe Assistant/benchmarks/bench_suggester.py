@@ -0,0 +1,304 @@
+"""
+Benchmark the outfit suggester against synthetic wardrobes.
+
+Builds one synthetic user per wardrobe size in a temporary SQLite database
+(items, outfits and years of wear logs), then times ``suggest_outfits``,
+``compute_suggestions`` and ``generate_outfits`` and reports latency
+percentiles, SQL statements per call and peak Python memory.
+
+Usage (from the project root):
+    python benchmarks/bench_suggester.py
+    python benchmarks/bench_suggester.py --sizes 10 100 1000 --iterations 50 --output results.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from sqlalchemy import event, insert
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db  # noqa: E402
+from app.models.clothing import Category, ClothingItem, Color, Season, clothing_season  # noqa: E402
+from app.models.outfit import Outfit, OutfitItem, refresh_outfit_envelopes  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.models.wear_log import WearLog  # noqa: E402
+from app.models.wear_stats import backfill_wear_stats  # noqa: E402
+from app.services.outfit_suggester import (OCCASION_SLOTS, compute_suggestions,  # noqa: E402
+                                           generate_outfits, suggest_outfits)
+from app.services.suggestion_cache import suggestion_cache  # noqa: E402
+from app.services.wardrobe_snapshot import clear_snapshots  # noqa: E402
+
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+
+COLORS = {
+    'Black': '#000000', 'White': '#FFFFFF', 'Grey': '#808080', 'Navy': '#000080',
+    'Red': '#FF0000', 'Orange': '#FFA500', 'Yellow': '#FFFF00', 'Green': '#008000',
+    'Blue': '#0000FF', 'Purple': '#800080', 'Brown': '#8B4513', 'Beige': '#F5F5DC'
+}
+
+SEASONS = ('Spring', 'Summer', 'Fall', 'Winter')
+
+OCCASIONS = ('casual', 'formal', 'business', 'sporty')
+
+# Weather scenarios each benchmark call cycles through
+SCENARIOS = (
+    (22.0, 'Clear'),
+    (8.0, 'Rain'),
+    (14.0, 'Clouds'),
+    (-3.0, 'Snow')
+)
+
+class StatementCounter:
+    """Count SQL statements executed on an engine"""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+def category_names():
+    """Return every category the suggester can ask for"""
+    names = {'Jacket', 'Coat', 'Outerwear'}
+    for slots in OCCASION_SLOTS.values():
+        for slot in slots:
+            names.update(slot)
+    return sorted(names)
+
+def seed_reference_data():
+    """Insert categories, colors and seasons; return their IDs"""
+    categories = [Category(name=name) for name in category_names()]
+    colors = [Color(name=name, hex_code=hex_code) for name, hex_code in COLORS.items()]
+    seasons = [Season(name=name) for name in SEASONS]
+    db.session.add_all(categories + colors + seasons)
+    db.session.commit()
+    return ([c.id for c in categories], [c.id for c in colors], [s.id for s in seasons])
+
+def build_wardrobe(size, reference, rng, years):
+    """
+    Create a user with ``size`` items, matching outfits and wear history.
+
+    Rows are written with bulk inserts so a 10,000 item wardrobe builds in
+    seconds; outfit envelopes are refreshed in bulk and wear statistics are
+    then rebuilt with ``backfill_wear_stats``.
+
+    Returns:
+        tuple: The new user's ID and a dict of row counts
+    """
+    category_ids, color_ids, season_ids = reference
+
+    user = User(f'bench{size}', f'bench{size}@example.com', 'benchmark', location='London, UK')
+    db.session.add(user)
+    db.session.commit()
+    user_id = user.id
+
+    now = datetime.utcnow()
+    items = []
+    for i in range(size):
+        min_temp = rng.choice([None, -10, 0, 5, 10, 15])
+        items.append({
+            'name': f'Item {i}',
+            'user_id': user_id,
+            'category_id': rng.choice(category_ids),
+            'color_id': rng.choice(color_ids),
+            'is_waterproof': rng.random() < 0.2,
+            'weather_min_temp': min_temp,
+            'weather_max_temp': None if min_temp is None else min_temp + rng.choice([10, 15, 25]),
+            'occasion': rng.choice((None,) + OCCASIONS),
+            'created_at': now
+        })
+    db.session.execute(insert(ClothingItem), items)
+
+    item_ids = [row[0] for row in db.session.query(ClothingItem.id).filter_by(user_id=user_id)
+                .order_by(ClothingItem.id)]
+    db.session.execute(insert(clothing_season), [
+        {'clothing_id': item_id, 'season_id': season_id}
+        for item_id in item_ids
+        for season_id in rng.sample(season_ids, rng.randint(0, 2))
+    ])
+
+    outfit_count = max(1, size // 5)
+    db.session.execute(insert(Outfit), [
+        {'name': f'Outfit {i}', 'user_id': user_id, 'occasion': rng.choice(OCCASIONS), 'created_at': now}
+        for i in range(outfit_count)
+    ])
+    outfit_ids = [row[0] for row in db.session.query(Outfit.id).filter_by(user_id=user_id)]
+    outfit_items = []
+    for outfit_id in outfit_ids:
+        for layer, item_id in enumerate(rng.sample(item_ids, min(len(item_ids), rng.randint(2, 4))), 1):
+            outfit_items.append({'outfit_id': outfit_id, 'clothing_item_id': item_id, 'layer_order': layer})
+    db.session.execute(insert(OutfitItem), outfit_items)
+    refresh_outfit_envelopes(Outfit.user_id == user_id)
+
+    # Roughly one outfit per day plus a couple of loose items, for ``years`` years
+    today = date.today()
+    logs = []
+    for day in range(365 * years):
+        worn_on = today - timedelta(days=day)
+        if rng.random() < 0.7:
+            logs.append({'date': worn_on, 'user_id': user_id, 'outfit_id': rng.choice(outfit_ids),
+                         'created_at': now})
+        for item_id in rng.sample(item_ids, min(len(item_ids), 2)):
+            logs.append({'date': worn_on, 'user_id': user_id, 'clothing_item_id': item_id,
+                         'created_at': now})
+    db.session.execute(insert(WearLog), logs)
+    db.session.commit()
+
+    return user_id, {'items': size, 'outfits': outfit_count, 'wear_logs': len(logs)}
+
+def measure(func, iterations, counter, before=None):
+    """
+    Call ``func`` repeatedly, recording latency, SQL statements and peak memory.
+
+    Latency is timed without tracing; peak memory comes from a separate,
+    shorter pass under ``tracemalloc`` because tracing slows every allocation.
+
+    Args:
+        func (callable): Called with the iteration number
+        iterations (int): Number of timed calls
+        counter (StatementCounter): Engine statement counter
+        before (callable, optional): Untimed setup run before each call
+
+    Returns:
+        dict: Latency percentiles (ms), statements per call and peak memory (KiB)
+    """
+    latencies = []
+    statements = []
+    for i in range(iterations):
+        if before is not None:
+            before()
+        db.session.expire_all()
+
+        start_count = counter.count
+        start = time.perf_counter()
+        func(i)
+        latencies.append((time.perf_counter() - start) * 1000)
+        statements.append(counter.count - start_count)
+
+    peak = 0
+    for i in range(min(iterations, len(SCENARIOS))):
+        if before is not None:
+            before()
+        db.session.expire_all()
+
+        tracemalloc.start()
+        func(i)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    latencies = np.array(latencies)
+    return {
+        'iterations': iterations,
+        'latency_ms': {
+            'mean': round(float(latencies.mean()), 3),
+            'p50': round(float(np.percentile(latencies, 50)), 3),
+            'p90': round(float(np.percentile(latencies, 90)), 3),
+            'p99': round(float(np.percentile(latencies, 99)), 3),
+            'max': round(float(latencies.max()), 3)
+        },
+        'sql_statements': {
+            'mean': round(float(np.mean(statements)), 2),
+            'max': int(max(statements))
+        },
+        'peak_memory_kib': round(peak / 1024, 1)
+    }
+
+def benchmark_user(user_id, iterations, counter):
+    """Run every benchmark case for one user"""
+    def scenario(i):
+        return SCENARIOS[i % len(SCENARIOS)]
+
+    def reset_caches():
+        suggestion_cache.clear()
+        clear_snapshots()
+
+    def run_suggest(i):
+        temperature, condition = scenario(i)
+        suggest_outfits(user_id, temperature, condition, 'casual')
+
+    def run_compute(i):
+        temperature, condition = scenario(i)
+        compute_suggestions(user_id, temperature, condition, 'casual')
+
+    def run_generate(i):
+        temperature, condition = scenario(i)
+        generate_outfits(user_id, temperature, condition, 'casual', seed=i)
+
+    cases = {'suggest_outfits_cold': measure(run_suggest, iterations, counter, before=reset_caches)}
+
+    # Prime every scenario so each timed call is a cache hit
+    reset_caches()
+    for i in range(len(SCENARIOS)):
+        run_suggest(i)
+    cases['suggest_outfits_cached'] = measure(run_suggest, iterations, counter)
+
+    cases['compute_suggestions'] = measure(run_compute, iterations, counter)
+    cases['generate_outfits_cold'] = measure(run_generate, iterations, counter, before=clear_snapshots)
+    cases['generate_outfits_warm'] = measure(run_generate, iterations, counter)
+    return cases
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help='Wardrobe sizes (items per user) to benchmark')
+    parser.add_argument('--iterations', type=int, default=20, help='Timed calls per case')
+    parser.add_argument('--years', type=int, default=3, help='Years of wear history per user')
+    parser.add_argument('--seed', type=int, default=42, help='Seed for the synthetic data')
+    parser.add_argument('--output', default='bench_suggester.json', help='Where to write the JSON results')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.join(tmp, "bench.db")}',
+            'TESTING': True
+        })
+
+        with app.app_context():
+            db.create_all()
+            counter = StatementCounter(db.engine)
+            rng = random.Random(args.seed)
+            reference = seed_reference_data()
+
+            results = []
+            for size in args.sizes:
+                start = time.perf_counter()
+                user_id, dataset = build_wardrobe(size, reference, rng, args.years)
+                print(f'Built wardrobe of {size} items in {time.perf_counter() - start:.1f}s', flush=True)
+                backfill_wear_stats()
+
+                cases = benchmark_user(user_id, args.iterations, counter)
+                results.append({'size': size, 'dataset': dataset, 'cases': cases})
+
+                for name, case in cases.items():
+                    latency = case['latency_ms']
+                    print(f'  {name:<24} p50 {latency["p50"]:>9.2f} ms  p99 {latency["p99"]:>9.2f} ms  '
+                          f'sql {case["sql_statements"]["mean"]:>7.1f}  peak {case["peak_memory_kib"]:>9.1f} KiB')
+
+            db.session.remove()
+            db.engine.dispose()
+
+    report = {
+        'created_at': datetime.utcnow().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'iterations': args.iterations,
+        'years': args.years,
+        'seed': args.seed,
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Wrote {args.output}')
+
+if __name__ == '__main__':
+    main()
@@ -1,162 +1,73 @@
-import sqlite3
 import streamlit as st
-from datetime import datetime
 import os
-from werkzeug.security import generate_password_hash, check_password_hash
+from contextlib import contextmanager
 
-def get_db_connection():
-    try:
-        db_path = os.path.join('instance', 'wardrobe.db')
-        if not os.path.exists(db_path):
-            st.error("Database not found. Please run `python init_db.py` first to initialize the database.")
-            st.stop()
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
-    except Exception as e:
-        st.error(f"Database error: {e}")
+from app import repository
+from app.services.reference_data import get_reference_data
+
+# Category the dress pages work on
+DRESS_CATEGORY = 'Dresses'
+
+@contextmanager
+def database():
+    db_path = os.path.join('instance', 'wardrobe.db')
+    if not os.path.exists(db_path):
+        st.error("Database not found. Please run `python init_db.py` first to initialize the database.")
         st.stop()
+    with repository.app_context():
+        yield
 
 def add_dress(user_id, name, color_id, season, description=None, brand=None, occasion=None, length=None):
     """Add a new dress to the wardrobe"""
-    conn = get_db_connection()
     try:
-        # Get the category ID for dresses (should be 3 based on init_db.py)
-        cursor = conn.cursor()
-        cursor.execute('SELECT id FROM categories WHERE name = ?', ('Dresses',))
-        category_result = cursor.fetchone()
-        
-        if not category_result:
-            st.error("Dress category not found in database. Please check your database setup.")
-            return False
+        with database():
+            category = get_reference_data().categories.named(DRESS_CATEGORY)
+            if not category:
+                st.error("Dress category not found in database. Please check your database setup.")
+                return False
             
-        category_id = category_result['id']
-        
-        # Insert the dress
-        cursor.execute('''
-            INSERT INTO clothing_items 
-            (name, category_id, color_id, season, description, brand, user_id, created_at) 
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (name, category_id, color_id, season, description, brand, user_id, datetime.utcnow()))
-        
-        # Get the ID of the newly inserted dress
-        dress_id = cursor.lastrowid
-        
-        # Add additional dress properties if needed
-        # You could create a separate dresses table with additional fields for length, style, etc.
-        
-        conn.commit()
+            # Add additional dress properties if needed
+            # You could create a separate dresses table with additional fields for length, style, etc.
+            repository.add_item(user_id, name, category.id, color_id, season,
+                                description=description, brand=brand, occasion=occasion)
         return True
     except Exception as e:
         st.error(f"Error adding dress: {e}")
         return False
-    finally:
-        conn.close()
 
 def get_dresses(user_id, color=None, season=None):
     """Get dresses filtered by color and/or season"""
-    conn = get_db_connection()
     try:
-        # Get the category ID for dresses
-        cursor = conn.cursor()
-        cursor.execute('SELECT id FROM categories WHERE name = ?', ('Dresses',))
-        category_result = cursor.fetchone()
-        
-        if not category_result:
-            return []
-            
-        category_id = category_result['id']
-        
-        # Build the query
-        query = '''
-            SELECT ci.*, c.name as color_name 
-            FROM clothing_items ci
-            JOIN colors c ON ci.color_id = c.id
-            WHERE ci.user_id = ? AND ci.category_id = ?
-        '''
-        params = [user_id, category_id]
-        
-        if color:
-            query += " AND c.name = ?"
-            params.append(color)
-            
-        if season:
-            query += " AND ci.season = ?"
-            params.append(season)
-            
-        # Execute query and get results
-        cursor.execute(query, params)
-        dresses = cursor.fetchall()
-        
-        # Convert to list of dictionaries
-        return [dict(dress) for dress in dresses]
+        with database():
+            return repository.list_items(user_id, category=DRESS_CATEGORY, color=color, season=season)
     except Exception as e:
         st.error(f"Error retrieving dresses: {e}")
         return []
-    finally:
-        conn.close()
 
 def delete_dress(dress_id, user_id):
     """Delete a dress by ID (checks user ownership)"""
-    conn = get_db_connection()
     try:
-        # Check if the dress belongs to the user first
-        cursor = conn.cursor()
-        cursor.execute(
-            'SELECT id FROM clothing_items WHERE id = ? AND user_id = ?', 
-            (dress_id, user_id)
-        )
-        dress = cursor.fetchone()
-        
-        if not dress:
-            return False, "Dress not found or you don't have permission to delete it"
-        
-        # Delete the dress
-        cursor.execute('DELETE FROM clothing_items WHERE id = ?', (dress_id,))
-        conn.commit()
+        with database():
+            if not repository.delete_item(dress_id, user_id):
+                return False, "Dress not found or you don't have permission to delete it"
         return True, "Dress deleted successfully"
     except Exception as e:
         return False, f"Error deleting dress: {e}"
-    finally:
-        conn.close()
 
 def update_dress(dress_id, user_id, name, color_id, season, description=None, brand=None):
-    """Update an existing dress"""
-    conn = get_db_connection()
+    """Update an existing dress (a season of None keeps the dress's seasons)"""
     try:
-        # Get the category ID for dresses
-        cursor = conn.cursor()
-        cursor.execute('SELECT id FROM categories WHERE name = ?', ('Dresses',))
-        category_result = cursor.fetchone()
-        
-        if not category_result:
-            return False, "Dress category not found in database"
+        with database():
+            category = get_reference_data().categories.named(DRESS_CATEGORY)
+            if not category:
+                return False, "Dress category not found in database"
             
-        category_id = category_result['id']
-        
-        # Check if the dress belongs to the user
-        cursor.execute(
-            'SELECT id FROM clothing_items WHERE id = ? AND user_id = ?', 
-            (dress_id, user_id)
-        )
-        dress = cursor.fetchone()
-        
-        if not dress:
-            return False, "Dress not found or you don't have permission to edit it"
-        
-        # Update the dress
-        cursor.execute('''
-            UPDATE clothing_items 
-            SET name = ?, category_id = ?, color_id = ?, season = ?, description = ?, brand = ? 
-            WHERE id = ? AND user_id = ?
-        ''', (name, category_id, color_id, season, description, brand, dress_id, user_id))
-        
-        conn.commit()
+            if not repository.update_item(dress_id, user_id, season=season, name=name, category_id=category.id,
+                                          color_id=color_id, description=description, brand=brand):
+                return False, "Dress not found or you don't have permission to edit it"
         return True, "Dress updated successfully"
     except Exception as e:
         return False, f"Error updating dress: {e}"
-    finally:
-        conn.close()
 
 def dress_management_page():
     """Streamlit page for managing dresses"""
@@ -176,13 +87,12 @@ def dress_management_page():
     
     with tab1:
         # Filters for dresses
-        conn = get_db_connection()
-        colors = conn.execute('SELECT * FROM colors ORDER BY name').fetchall()
-        conn.close()
+        with database():
+            colors = get_reference_data().colors.rows
         
         col1, col2 = st.columns(2)
         with col1:
-            color_options = ["All"] + [color["name"] for color in colors]
+            color_options = ["All"] + [color.name for color in colors]
             selected_color = st.selectbox("Filter by Color", color_options)
             
         with col2:
@@ -234,14 +144,13 @@ def dress_management_page():
             name = st.text_input("Dress Name")
             
             # Get colors for selection
-            conn = get_db_connection()
-            colors = conn.execute('SELECT * FROM colors ORDER BY name').fetchall()
-            conn.close()
+            with database():
+                colors = get_reference_data().colors
             
             color_id = st.selectbox(
                 "Color", 
-                options=[c["id"] for c in colors],
-                format_func=lambda x: next((c["name"] for c in colors if c["id"] == x), "")
+                options=[c.id for c in colors],
+                format_func=colors.name_of
             )
             
             season = st.selectbox(
@@ -289,28 +198,17 @@ def dress_management_page():
         if st.session_state.edit_dress_id is None:
             st.info("Select a dress to edit from the 'My Dresses' tab")
         else:
-            conn = get_db_connection()
-            try:
+            with database():
                 # Get the dress to edit
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT ci.*, c.name as color_name 
-                    FROM clothing_items ci
-                    JOIN colors c ON ci.color_id = c.id
-                    WHERE ci.id = ? AND ci.user_id = ?
-                ''', (st.session_state.edit_dress_id, st.session_state.user_id))
-                dress = cursor.fetchone()
+                dress = repository.get_item(st.session_state.edit_dress_id, st.session_state.user_id)
                 
                 if not dress:
                     st.error("Dress not found or you don't have permission to edit it")
                     st.session_state.edit_dress_id = None
                     st.rerun()
                 
-                # Convert to dict for easier access
-                dress = dict(dress)
-                
                 # Get colors for the form
-                colors = conn.execute('SELECT * FROM colors ORDER BY name').fetchall()
+                colors = get_reference_data().colors
                 
                 st.subheader(f"Edit Dress: {dress['name']}")
                 
@@ -318,7 +216,7 @@ def dress_management_page():
                     name = st.text_input("Dress Name", value=dress['name'])
                     
                     # Find the index of the current color
-                    color_options = [color["id"] for color in colors]
+                    color_options = [color.id for color in colors]
                     try:
                         color_index = color_options.index(dress['color_id'])
                     except ValueError:
@@ -328,7 +226,7 @@ def dress_management_page():
                         "Color", 
                         options=color_options,
                         index=color_index,
-                        format_func=lambda x: next((color["name"] for color in colors if color["id"] == x), "")
+                        format_func=colors.name_of
                     )
                     
                     # Find index of current season
@@ -362,7 +260,7 @@ def dress_management_page():
                                 st.session_state.user_id,
                                 name,
                                 color_id,
-                                season,
+                                None if season == dress['season'] else season,
                                 description,
                                 brand
                             )
@@ -377,8 +275,6 @@ def dress_management_page():
                     if cancel:
                         st.session_state.edit_dress_id = None
                         st.rerun()
-            finally:
-                conn.close()
 
 # Add footer with copyright when running as standalone
 def add_footer():
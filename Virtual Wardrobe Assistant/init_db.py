@@ -1,199 +1,96 @@
 import os
-import sqlite3
-from datetime import datetime
-from werkzeug.security import generate_password_hash
+import shutil
 
-# Ensure the instance directory exists
-os.makedirs('instance', exist_ok=True)
-
-# Connect to the database
-conn = sqlite3.connect('instance/wardrobe.db')
-conn.execute("PRAGMA foreign_keys = ON")
-cursor = conn.cursor()
-
-# Create tables
-tables = [
-    '''
-    CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        username TEXT UNIQUE NOT NULL,
-        email TEXT UNIQUE NOT NULL,
-        password_hash TEXT NOT NULL,
-        created_at TIMESTAMP NOT NULL,
-        location TEXT,
-        style_preference TEXT
-    )
-    ''',
-    
-    '''
-    CREATE TABLE IF NOT EXISTS categories (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT UNIQUE NOT NULL,
-        description TEXT
-    )
-    ''',
-    
-    '''
-    CREATE TABLE IF NOT EXISTS colors (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT UNIQUE NOT NULL,
-        hex_code TEXT
-    )
-    ''',
-    
-    '''
-    CREATE TABLE IF NOT EXISTS clothing_items (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        category_id INTEGER NOT NULL,
-        color_id INTEGER NOT NULL,
-        season TEXT,
-        description TEXT,
-        brand TEXT,
-        image_path TEXT,
-        user_id INTEGER NOT NULL,
-        created_at TIMESTAMP NOT NULL,
-        FOREIGN KEY (category_id) REFERENCES categories (id),
-        FOREIGN KEY (color_id) REFERENCES colors (id),
-        FOREIGN KEY (user_id) REFERENCES users (id)
-    )
-    ''',
-    
-    '''
-    CREATE TABLE IF NOT EXISTS outfits (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        description TEXT,
-        occasion TEXT,
-        season TEXT,
-        is_favorite BOOLEAN DEFAULT 0,
-        user_id INTEGER NOT NULL,
-        created_at TIMESTAMP NOT NULL,
-        FOREIGN KEY (user_id) REFERENCES users (id)
-    )
-    ''',
-    
-    '''
-    CREATE TABLE IF NOT EXISTS outfit_items (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        outfit_id INTEGER NOT NULL,
-        clothing_item_id INTEGER NOT NULL,
-        FOREIGN KEY (outfit_id) REFERENCES outfits (id),
-        FOREIGN KEY (clothing_item_id) REFERENCES clothing_items (id)
-    )
-    ''',
-    
-    '''
-    CREATE TABLE IF NOT EXISTS wear_logs (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER NOT NULL,
-        clothing_item_id INTEGER,
-        outfit_id INTEGER,
-        date TIMESTAMP NOT NULL,
-        notes TEXT,
-        weather_condition TEXT,
-        temperature REAL,
-        created_at TIMESTAMP NOT NULL,
-        FOREIGN KEY (user_id) REFERENCES users (id),
-        FOREIGN KEY (clothing_item_id) REFERENCES clothing_items (id),
-        FOREIGN KEY (outfit_id) REFERENCES outfits (id)
-    )
-    '''
-]
-
-for table in tables:
-    cursor.execute(table)
-    
-# Insert initial data
-
-# Categories
-categories = [
-    ('Tops', 'Shirts, t-shirts, blouses, etc.'),
-    ('Bottoms', 'Pants, shorts, skirts, etc.'),
-    ('Dresses', 'All types of dresses'),
-    ('Outerwear', 'Jackets, coats, sweaters, etc.'),
-    ('Footwear', 'Shoes, boots, sandals, etc.'),
-    ('Accessories', 'Hats, scarves, belts, etc.')
-]
-
-cursor.executemany('INSERT OR IGNORE INTO categories (name, description) VALUES (?, ?)', categories)
-
-# Colors
-colors = [
-    ('Black', '#000000'),
-    ('White', '#FFFFFF'),
-    ('Red', '#FF0000'),
-    ('Blue', '#0000FF'),
-    ('Green', '#00FF00'),
-    ('Yellow', '#FFFF00'),
-    ('Brown', '#A52A2A'),
-    ('Grey', '#808080'),
-    ('Navy', '#000080'),
-    ('Purple', '#800080'),
-    ('Pink', '#FFC0CB'),
-    ('Orange', '#FFA500')
-]
-
-cursor.executemany('INSERT OR IGNORE INTO colors (name, hex_code) VALUES (?, ?)', colors)
-
-# Create demo user
-hashed_password = generate_password_hash('password123')
-cursor.execute('INSERT OR IGNORE INTO users (username, email, password_hash, created_at, location, style_preference) VALUES (?, ?, ?, ?, ?, ?)',
-             ('demo', 'demo@example.com', hashed_password, datetime.utcnow(), 'New York, USA', 'Casual'))
+from flask_migrate import stamp, upgrade
+from sqlalchemy import select
 
-# Get the demo user ID
-cursor.execute('SELECT id FROM users WHERE username = ?', ('demo',))
-user_id = cursor.fetchone()[0]
+from app import create_app, db, repository
+from app.models.clothing import SEASONS, Category, Color, Season
+from app.services.legacy_schema import is_legacy_schema, upgrade_legacy_schema
 
-# Add some sample clothing items
-sample_items = [
-    ('Blue Jeans', 2, 4, 'All Season', 'Classic blue denim jeans', 'Levi\'s', None, user_id, datetime.utcnow()),
-    ('White T-Shirt', 1, 2, 'Summer', 'Basic cotton t-shirt', 'H&M', None, user_id, datetime.utcnow()),
-    ('Black Blazer', 4, 1, 'Fall', 'Formal black blazer', 'Zara', None, user_id, datetime.utcnow()),
-    ('Sneakers', 5, 2, 'All Season', 'Casual white sneakers', 'Nike', None, user_id, datetime.utcnow()),
-    ('Red Dress', 3, 3, 'Summer', 'Elegant red dress for special occasions', 'Ralph Lauren', None, user_id, datetime.utcnow())
-]
-
-cursor.executemany('''
-    INSERT OR IGNORE INTO clothing_items (name, category_id, color_id, season, description, brand, image_path, user_id, created_at) 
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-''', sample_items)
-
-# Add sample outfit
-cursor.execute('''
-    INSERT OR IGNORE INTO outfits (name, description, occasion, season, is_favorite, user_id, created_at)
-    VALUES (?, ?, ?, ?, ?, ?, ?)
-''', ('Casual Day Out', 'Perfect for weekend errands', 'Casual', 'Spring', 1, user_id, datetime.utcnow()))
-
-# Get the outfit ID
-cursor.execute('SELECT id FROM outfits WHERE name = ? AND user_id = ?', ('Casual Day Out', user_id))
-outfit_id = cursor.fetchone()[0]
-
-# Get clothing item IDs for the outfit
-cursor.execute('SELECT id FROM clothing_items WHERE name = ? AND user_id = ?', ('Blue Jeans', user_id))
-jeans_id = cursor.fetchone()[0]
-
-cursor.execute('SELECT id FROM clothing_items WHERE name = ? AND user_id = ?', ('White T-Shirt', user_id))
-tshirt_id = cursor.fetchone()[0]
-
-cursor.execute('SELECT id FROM clothing_items WHERE name = ? AND user_id = ?', ('Sneakers', user_id))
-sneakers_id = cursor.fetchone()[0]
-
-# Add items to the outfit
-outfit_items = [
-    (outfit_id, jeans_id),
-    (outfit_id, tshirt_id),
-    (outfit_id, sneakers_id)
-]
-
-cursor.executemany('INSERT OR IGNORE INTO outfit_items (outfit_id, clothing_item_id) VALUES (?, ?)', outfit_items)
+# Ensure the instance directory exists
+os.makedirs('instance', exist_ok=True)
 
-# Commit changes and close the connection
-conn.commit()
-conn.close()
+app = create_app()
+
+def add_missing(model, rows):
+    """Add reference rows whose name is not in the table yet"""
+    existing = set(db.session.scalars(select(model.name)))
+    db.session.add_all([model(**row) for row in rows if row['name'] not in existing])
+
+with app.app_context():
+    # Create or upgrade the schema
+    if is_legacy_schema(db.engine):
+        # Created by an earlier version of this script: season text, image_path, no temperatures
+        path = db.engine.url.database
+        shutil.copyfile(path, f'{path}.bak')
+        counts = upgrade_legacy_schema()
+        stamp()
+        print(f"Upgraded the existing database (backup: {path}.bak): "
+              f"{counts['clothing_items']} items, {counts['outfits']} outfits, {counts['wear_logs']} wear logs.")
+    else:
+        upgrade()
+
+    # Insert initial data
+
+    # Categories
+    add_missing(Category, [
+        {'name': 'Tops', 'description': 'Shirts, t-shirts, blouses, etc.'},
+        {'name': 'Bottoms', 'description': 'Pants, shorts, skirts, etc.'},
+        {'name': 'Dresses', 'description': 'All types of dresses'},
+        {'name': 'Outerwear', 'description': 'Jackets, coats, sweaters, etc.'},
+        {'name': 'Footwear', 'description': 'Shoes, boots, sandals, etc.'},
+        {'name': 'Accessories', 'description': 'Hats, scarves, belts, etc.'}
+    ])
+
+    # Colors
+    add_missing(Color, [
+        {'name': 'Black', 'hex_code': '#000000'},
+        {'name': 'White', 'hex_code': '#FFFFFF'},
+        {'name': 'Red', 'hex_code': '#FF0000'},
+        {'name': 'Blue', 'hex_code': '#0000FF'},
+        {'name': 'Green', 'hex_code': '#00FF00'},
+        {'name': 'Yellow', 'hex_code': '#FFFF00'},
+        {'name': 'Brown', 'hex_code': '#A52A2A'},
+        {'name': 'Grey', 'hex_code': '#808080'},
+        {'name': 'Navy', 'hex_code': '#000080'},
+        {'name': 'Purple', 'hex_code': '#800080'},
+        {'name': 'Pink', 'hex_code': '#FFC0CB'},
+        {'name': 'Orange', 'hex_code': '#FFA500'}
+    ])
+
+    # Seasons
+    add_missing(Season, [{'name': name} for name in SEASONS])
+    db.session.commit()
+
+    # Create demo user with some sample clothing items and an outfit
+    if repository.get_user_by_username('demo') is None:
+        user_id = repository.create_user('demo', 'demo@example.com', 'password123',
+                                         location='New York, USA', style_preference='Casual')
+
+        categories = dict(db.session.execute(select(Category.name, Category.id)).all())
+        colors = dict(db.session.execute(select(Color.name, Color.id)).all())
+        sample_items = [
+            ('Blue Jeans', 'Bottoms', 'Blue', 'All Season', 'Classic blue denim jeans', 'Levi\'s'),
+            ('White T-Shirt', 'Tops', 'White', 'Summer', 'Basic cotton t-shirt', 'H&M'),
+            ('Black Blazer', 'Outerwear', 'Black', 'Fall', 'Formal black blazer', 'Zara'),
+            ('Sneakers', 'Footwear', 'White', 'All Season', 'Casual white sneakers', 'Nike'),
+            ('Red Dress', 'Dresses', 'Red', 'Summer', 'Elegant red dress for special occasions', 'Ralph Lauren')
+        ]
+        item_ids = {
+            name: repository.add_item(user_id, name, categories[category], colors[color], season,
+                                      description=description, brand=brand)
+            for name, category, color, season, description, brand in sample_items
+        }
+
+        # Add sample outfit
+        repository.create_outfit(user_id, 'Casual Day Out',
+                                 [item_ids['White T-Shirt'], item_ids['Blue Jeans'], item_ids['Sneakers']],
+                                 description='Perfect for weekend errands', occasion='Casual', season='Spring',
+                                 is_favorite=True)
 
 print("Database initialized successfully with sample data!")
 print("You can now run the application using: streamlit run streamlit_app.py")
 print("Login with:")
 print("  Username: demo")
-print("  Password: password123") 
\ No newline at end of file
+print("  Password: password123")
\ No newline at end of file
@@ -0,0 +1,45 @@
+"""non-null created_at for paged tables
+
+Revision ID: 5d2e9a7c41f3
+Revises: c81ef95882b4
+Create Date: 2026-10-17 23:12:05.418337
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2e9a7c41f3'
+down_revision = 'c81ef95882b4'
+branch_labels = None
+depends_on = None
+
+# Keyset pages order on (created_at, id); a NULL created_at has no place in that order
+PAGED_TABLES = ('clothing_items', 'outfits')
+
+
+def upgrade():
+    # Rows without a timestamp take their owner's oldest one (ties fall back to id), or the
+    # current time if the owner has none. It is bound as a DateTime so SQLite stores it in
+    # the same format as the ORM's timestamps, which keyset cursors compare as text.
+    now = sa.bindparam('now', datetime.utcnow(), type_=sa.DateTime())
+    for name in PAGED_TABLES:
+        paged = sa.table(name, sa.column('user_id', sa.Integer()), sa.column('created_at', sa.DateTime()))
+        other = paged.alias('other')
+        earliest = sa.select(sa.func.min(other.c.created_at)).where(
+            other.c.user_id == paged.c.user_id).scalar_subquery()
+        op.execute(paged.update().where(paged.c.created_at.is_(None)).values(
+            created_at=sa.func.coalesce(earliest, now)))
+
+    for name in PAGED_TABLES:
+        with op.batch_alter_table(name, schema=None) as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    for name in reversed(PAGED_TABLES):
+        with op.batch_alter_table(name, schema=None) as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
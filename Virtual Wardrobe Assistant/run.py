@@ -3,6 +3,12 @@ from app.models.user import User
 from app.models.clothing import ClothingItem, Category, Color
 from app.models.outfit import Outfit, OutfitItem
 from app.models.wear_log import WearLog
+from app.models.wear_stats import WearStats
+from app.models.daily_suggestion import DailySuggestion
+from app.models.weather_cache import WeatherCache
+from app.models.location import Location, LocationAlias
+from app.models.weather_forecast import WeatherForecast
+from app.models.api_quota import ApiQuota
 
 app = create_app()
 
@@ -16,7 +22,14 @@ def make_shell_context():
         'Color': Color,
         'Outfit': Outfit,
         'OutfitItem': OutfitItem,
-        'WearLog': WearLog
+        'WearLog': WearLog,
+        'WearStats': WearStats,
+        'DailySuggestion': DailySuggestion,
+        'WeatherCache': WeatherCache,
+        'Location': Location,
+        'LocationAlias': LocationAlias,
+        'WeatherForecast': WeatherForecast,
+        'ApiQuota': ApiQuota
     }
 
 if __name__ == '__main__':
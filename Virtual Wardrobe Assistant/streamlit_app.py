@@ -1,10 +1,16 @@
 import streamlit as st
 import os
-import sqlite3
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 import pandas as pd
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import check_password_hash
+
+from app import db, repository
+from app.services.forecast import weather_for
+from app.services.legacy_schema import is_legacy_schema
+from app.services.outfit_suggester import suggest_outfits
+from app.services.reference_data import get_reference_data
 
 # Import dresses management module
 try:
@@ -20,19 +26,19 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Database connection
-def get_db_connection():
-    try:
-        db_path = os.path.join('instance', 'wardrobe.db')
-        if not os.path.exists(db_path):
-            st.error("Database not found. Please run `python init_db.py` first to initialize the database.")
-            st.stop()
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
-    except Exception as e:
-        st.error(f"Database error: {e}")
+# Database access: repository calls run inside this context, on the same
+# pooled connections, schema and SQLite settings as the Flask app
+@contextmanager
+def database():
+    db_path = os.path.join('instance', 'wardrobe.db')
+    if not os.path.exists(db_path):
+        st.error("Database not found. Please run `python init_db.py` first to initialize the database.")
         st.stop()
+    with repository.app_context():
+        if is_legacy_schema(db.engine):
+            st.error("Database uses an old schema. Please run `python init_db.py` to upgrade it.")
+            st.stop()
+        yield
 
 # Session state initialization
 if 'user_id' not in st.session_state:
@@ -42,11 +48,35 @@ if 'username' not in st.session_state:
 if 'authenticated' not in st.session_state:
     st.session_state.authenticated = False
 
+# Paging helpers
+def page_cursor(key, filters):
+    """Return the cursor of the page shown for a listing, back to the first page when its filters change"""
+    pages = st.session_state.setdefault(f"{key}_pages", {'filters': None, 'cursors': [None]})
+    if pages['filters'] != filters:
+        pages['filters'], pages['cursors'] = filters, [None]
+    return pages['cursors'][-1]
+
+def page_navigation(key, page):
+    """Show previous / next page buttons for a listing"""
+    cursors = st.session_state[f"{key}_pages"]['cursors']
+    if len(cursors) == 1 and not page.next_cursor:
+        return
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        if len(cursors) > 1 and st.button("Previous page", key=f"{key}_previous"):
+            cursors.pop()
+            st.rerun()
+    with col2:
+        st.write(f"Page {len(cursors)}")
+    with col3:
+        if page.next_cursor and st.button("Next page", key=f"{key}_next"):
+            cursors.append(page.next_cursor)
+            st.rerun()
+
 # Authentication functions
 def authenticate(username, password):
-    conn = get_db_connection()
-    try:
-        user = conn.execute('SELECT * FROM users WHERE username = ?', (username,)).fetchone()
+    with database():
+        user = repository.get_user_by_username(username)
         if user:
             # Use werkzeug's check_password_hash to verify the password
             if check_password_hash(user['password_hash'], password):
@@ -55,30 +85,16 @@ def authenticate(username, password):
                 st.session_state.authenticated = True
                 return True
         return False
-    finally:
-        conn.close()
 
 def register_user(username, email, password):
-    conn = get_db_connection()
     try:
-        # Check if username exists
-        existing_user = conn.execute('SELECT * FROM users WHERE username = ? OR email = ?', 
-                                   (username, email)).fetchone()
-        if existing_user:
-            return False, "Username or email already exists"
-        
-        # Hash the password before storing
-        password_hash = generate_password_hash(password)
-        
-        # Insert new user
-        conn.execute('INSERT INTO users (username, email, password_hash, created_at) VALUES (?, ?, ?, ?)',
-                   (username, email, password_hash, datetime.utcnow()))
-        conn.commit()
+        with database():
+            # Stores a password hash; None if the username or email exists
+            if repository.create_user(username, email, password) is None:
+                return False, "Username or email already exists"
         return True, "Registration successful! Please login."
     except Exception as e:
         return False, f"Error: {str(e)}"
-    finally:
-        conn.close()
 
 # Sidebar navigation
 def sidebar_nav():
@@ -161,13 +177,9 @@ def dashboard_page():
         st.session_state.page = "login"
         st.rerun()
         
-    conn = get_db_connection()
-    try:
+    with database():
         # Get counts
-        clothing_count = conn.execute('SELECT COUNT(*) FROM clothing_items WHERE user_id = ?', 
-                                    (st.session_state.user_id,)).fetchone()[0]
-        outfit_count = conn.execute('SELECT COUNT(*) FROM outfits WHERE user_id = ?', 
-                                  (st.session_state.user_id,)).fetchone()[0]
+        clothing_count, outfit_count = repository.wardrobe_counts(st.session_state.user_id)
         
         # Create dashboard
         col1, col2, col3 = st.columns(3)
@@ -180,15 +192,10 @@ def dashboard_page():
             
         # Recent items
         st.subheader("Recent Clothing Items")
-        recent_items = conn.execute(
-            'SELECT * FROM clothing_items WHERE user_id = ? ORDER BY created_at DESC LIMIT 5', 
-            (st.session_state.user_id,)
-        ).fetchall()
+        recent_items = repository.recent_items(st.session_state.user_id)
         
         if recent_items:
-            # Convert to list of dicts to ensure we can access columns by name
-            items_list = [dict(item) for item in recent_items]
-            items_df = pd.DataFrame(items_list)
+            items_df = pd.DataFrame(recent_items)
             
             # Get only columns that exist
             display_columns = []
@@ -205,15 +212,10 @@ def dashboard_page():
             
         # Recent outfits
         st.subheader("Recent Outfits")
-        recent_outfits = conn.execute(
-            'SELECT * FROM outfits WHERE user_id = ? ORDER BY created_at DESC LIMIT 5', 
-            (st.session_state.user_id,)
-        ).fetchall()
+        recent_outfits = repository.recent_outfits(st.session_state.user_id)
         
         if recent_outfits:
-            # Convert to list of dicts to ensure we can access columns by name
-            outfits_list = [dict(outfit) for outfit in recent_outfits]
-            outfits_df = pd.DataFrame(outfits_list)
+            outfits_df = pd.DataFrame(recent_outfits)
             
             # Get only columns that exist
             display_columns = []
@@ -227,8 +229,6 @@ def dashboard_page():
                 st.dataframe(outfits_df, use_container_width=True)
         else:
             st.info("No outfits found. Create some outfit combinations!")
-    finally:
-        conn.close()
 
 def about_page():
     st.title("About FashionFolio")
@@ -295,61 +295,39 @@ def wardrobe_page():
     tab1, tab2, tab3 = st.tabs(["View Items", "Add New Item", "Edit Item"])
     
     with tab1:
-        conn = get_db_connection()
-        try:
+        with database():
             # Get categories and colors for filtering
-            categories = conn.execute('SELECT * FROM categories').fetchall()
-            colors = conn.execute('SELECT * FROM colors').fetchall()
+            reference = get_reference_data()
             
             # Create filters
             col1, col2, col3 = st.columns(3)
             with col1:
-                category_options = ["All"] + [cat["name"] for cat in categories]
+                category_options = ["All"] + [cat.name for cat in reference.categories]
                 selected_category = st.selectbox("Filter by Category", category_options)
             
             with col2:
-                color_options = ["All"] + [color["name"] for color in colors]
+                color_options = ["All"] + [color.name for color in reference.colors]
                 selected_color = st.selectbox("Filter by Color", color_options)
                 
             with col3:
-                season_options = ["All", "Spring", "Summer", "Fall", "Winter", "All Season"]
+                season_options = ["All"] + [season.name for season in reference.seasons] + [repository.ALL_SEASONS]
                 selected_season = st.selectbox("Filter by Season", season_options)
             
-            # Build query
-            query = '''
-                SELECT ci.*, c.name as category_name, col.name as color_name 
-                FROM clothing_items ci
-                JOIN categories c ON ci.category_id = c.id
-                JOIN colors col ON ci.color_id = col.id
-                WHERE ci.user_id = ?
-            '''
-            params = [st.session_state.user_id]
-            
-            if selected_category != "All":
-                query += " AND c.name = ?"
-                params.append(selected_category)
-                
-            if selected_color != "All":
-                query += " AND col.name = ?"
-                params.append(selected_color)
-                
-            if selected_season != "All":
-                query += " AND ci.season = ?"
-                params.append(selected_season)
-                
-            items = conn.execute(query, params).fetchall()
+            filters = {
+                'category': None if selected_category == "All" else selected_category,
+                'color': None if selected_color == "All" else selected_color,
+                'season': None if selected_season == "All" else selected_season
+            }
+            page = repository.item_page(st.session_state.user_id, page_cursor("wardrobe", filters), **filters)
+            items = page.items
             
             # Display items
             if items:
-                # Convert to a list of dicts for easier display
-                items_list = [dict(item) for item in items]
-                items_df = pd.DataFrame(items_list)
-                
-                st.write(f"Found {len(items)} items")
+                st.write(f"Showing {len(items)} items")
                 
                 # Display items in a grid
                 cols = st.columns(3)
-                for i, item in enumerate(items_list):
+                for i, item in enumerate(items):
                     with cols[i % 3]:
                         st.subheader(item['name'])
                         st.write(f"**Category:** {item['category_name']}")
@@ -369,21 +347,20 @@ def wardrobe_page():
                                 st.rerun()
                         with col2:
                             if st.button(f"Delete {item['name']}", key=f"delete_{item['id']}"):
-                                conn.execute('DELETE FROM clothing_items WHERE id = ?', (item['id'],))
-                                conn.commit()
+                                repository.delete_item(item['id'], st.session_state.user_id)
                                 st.success(f"Deleted {item['name']}")
                                 st.rerun()
             else:
                 st.info("No items found with the selected filters. Try different filters or add new items.")
-        finally:
-            conn.close()
+            page_navigation("wardrobe", page)
                 
     with tab2:
-        conn = get_db_connection()
-        try:
+        with database():
             # Get categories and colors for the form
-            categories = conn.execute('SELECT * FROM categories').fetchall()
-            colors = conn.execute('SELECT * FROM colors').fetchall()
+            reference = get_reference_data()
+            categories = reference.categories.rows
+            colors = reference.colors.rows
+            season_options = [season.name for season in reference.seasons] + [repository.ALL_SEASONS]
             
             with st.form("add_item_form"):
                 st.subheader("Add New Clothing Item")
@@ -394,20 +371,20 @@ def wardrobe_page():
                 with col1:
                     category_id = st.selectbox(
                         "Category", 
-                        options=[cat["id"] for cat in categories],
-                        format_func=lambda x: next((cat["name"] for cat in categories if cat["id"] == x), "")
+                        options=[cat.id for cat in categories],
+                        format_func=reference.categories.name_of
                     )
                 
                 with col2:
                     color_id = st.selectbox(
                         "Color", 
-                        options=[color["id"] for color in colors],
-                        format_func=lambda x: next((color["name"] for color in colors if color["id"] == x), "")
+                        options=[color.id for color in colors],
+                        format_func=reference.colors.name_of
                     )
                 
                 season = st.selectbox(
                     "Season", 
-                    options=["Spring", "Summer", "Fall", "Winter", "All Season"]
+                    options=season_options
                 )
                 
                 description = st.text_area("Description (optional)")
@@ -420,47 +397,33 @@ def wardrobe_page():
                         st.error("Name, category and color are required")
                     else:
                         try:
-                            conn.execute(
-                                '''INSERT INTO clothing_items 
-                                (name, category_id, color_id, season, description, brand, user_id, created_at) 
-                                VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
-                                (name, category_id, color_id, season, description, brand, 
-                                 st.session_state.user_id, datetime.utcnow())
-                            )
-                            conn.commit()
+                            repository.add_item(st.session_state.user_id, name, category_id, color_id, season,
+                                                description=description, brand=brand)
                             st.success(f"Added {name} to your wardrobe!")
                             # Clear form fields
                             st.rerun()
                         except Exception as e:
                             st.error(f"Error adding item: {e}")
-        finally:
-            conn.close()
             
     # New tab3 (Edit Item) code
     with tab3:
         if st.session_state.edit_item_id is None:
             st.info("Select an item to edit from the 'View Items' tab")
         else:
-            conn = get_db_connection()
-            try:
+            with database():
                 # Get categories and colors for the form
-                categories = conn.execute('SELECT * FROM categories').fetchall()
-                colors = conn.execute('SELECT * FROM colors').fetchall()
+                reference = get_reference_data()
+                categories = reference.categories.rows
+                colors = reference.colors.rows
                 
                 # Get the item to edit
-                item = conn.execute(
-                    'SELECT * FROM clothing_items WHERE id = ? AND user_id = ?', 
-                    (st.session_state.edit_item_id, st.session_state.user_id)
-                ).fetchone()
+                item = repository.get_item(st.session_state.edit_item_id, st.session_state.user_id)
                 
                 if not item:
                     st.error("Item not found or you don't have permission to edit it")
                     st.session_state.edit_item_id = None
                     st.rerun()
                 
-                # Convert to dict for easier access
-                item = dict(item)
-                
                 st.subheader(f"Edit Item: {item['name']}")
                 
                 with st.form("edit_item_form"):
@@ -470,21 +433,21 @@ def wardrobe_page():
                     with col1:
                         category_id = st.selectbox(
                             "Category", 
-                            options=[cat["id"] for cat in categories],
-                            index=[i for i, cat in enumerate(categories) if cat["id"] == item['category_id']][0],
-                            format_func=lambda x: next((cat["name"] for cat in categories if cat["id"] == x), "")
+                            options=[cat.id for cat in categories],
+                            index=[i for i, cat in enumerate(categories) if cat.id == item['category_id']][0],
+                            format_func=reference.categories.name_of
                         )
                     
                     with col2:
                         color_id = st.selectbox(
                             "Color", 
-                            options=[color["id"] for color in colors],
-                            index=[i for i, color in enumerate(colors) if color["id"] == item['color_id']][0],
-                            format_func=lambda x: next((color["name"] for color in colors if color["id"] == x), "")
+                            options=[color.id for color in colors],
+                            index=[i for i, color in enumerate(colors) if color.id == item['color_id']][0],
+                            format_func=reference.colors.name_of
                         )
                     
                     # Find index of current season
-                    season_options = ["Spring", "Summer", "Fall", "Winter", "All Season"]
+                    season_options = [season.name for season in reference.seasons] + [repository.ALL_SEASONS]
                     try:
                         season_index = season_options.index(item['season'])
                     except (ValueError, TypeError):
@@ -510,15 +473,13 @@ def wardrobe_page():
                             st.error("Name, category and color are required")
                         else:
                             try:
-                                conn.execute(
-                                    '''UPDATE clothing_items 
-                                    SET name = ?, category_id = ?, color_id = ?, 
-                                        season = ?, description = ?, brand = ? 
-                                    WHERE id = ? AND user_id = ?''',
-                                    (name, category_id, color_id, season, description, brand, 
-                                     st.session_state.edit_item_id, st.session_state.user_id)
+                                # Seasons set elsewhere (e.g. several in the Flask app) stay unless changed here
+                                repository.update_item(
+                                    st.session_state.edit_item_id, st.session_state.user_id,
+                                    season=None if season == item['season'] else season,
+                                    name=name, category_id=category_id, color_id=color_id,
+                                    description=description, brand=brand
                                 )
-                                conn.commit()
                                 st.success(f"Updated {name}")
                                 st.session_state.edit_item_id = None
                                 st.rerun()
@@ -528,8 +489,6 @@ def wardrobe_page():
                     if cancel:
                         st.session_state.edit_item_id = None
                         st.rerun()
-            finally:
-                conn.close()
 
 def outfits_page():
     st.title("My Outfits")
@@ -543,20 +502,16 @@ def outfits_page():
     tab1, tab2 = st.tabs(["View Outfits", "Create Outfit"])
     
     with tab1:
-        conn = get_db_connection()
-        try:
-            # Get outfits
-            outfits = conn.execute(
-                'SELECT * FROM outfits WHERE user_id = ? ORDER BY created_at DESC', 
-                (st.session_state.user_id,)
-            ).fetchall()
+        with database():
+            # Get a page of outfits, and the items of all of them in one query
+            page = repository.outfit_page(st.session_state.user_id, page_cursor("outfits", {}))
+            outfits = page.items
+            layers = repository.outfit_layers([outfit['id'] for outfit in outfits])
             
             if outfits:
-                outfits_list = [dict(outfit) for outfit in outfits]
-                
                 # Display outfits in a grid
                 cols = st.columns(2)
-                for i, outfit in enumerate(outfits_list):
+                for i, outfit in enumerate(outfits):
                     with cols[i % 2]:
                         st.subheader(outfit['name'])
                         if outfit['description']:
@@ -564,18 +519,7 @@ def outfits_page():
                         st.write(f"**Occasion:** {outfit['occasion'] or 'Not specified'}")
                         st.write(f"**Season:** {outfit['season'] or 'Not specified'}")
                         
-                        # Get outfit items
-                        outfit_items = conn.execute(
-                            '''
-                            SELECT oi.*, ci.name as item_name, c.name as category_name 
-                            FROM outfit_items oi
-                            JOIN clothing_items ci ON oi.clothing_item_id = ci.id
-                            JOIN categories c ON ci.category_id = c.id
-                            WHERE oi.outfit_id = ?
-                            ''',
-                            (outfit['id'],)
-                        ).fetchall()
-                        
+                        outfit_items = layers[outfit['id']]
                         if outfit_items:
                             st.write("**Items:**")
                             for item in outfit_items:
@@ -589,32 +533,17 @@ def outfits_page():
                                 st.rerun()
                         with col2:
                             if st.button(f"Delete {outfit['name']}", key=f"delete_outfit_{outfit['id']}"):
-                                # Delete outfit items first (foreign key constraint)
-                                conn.execute('DELETE FROM outfit_items WHERE outfit_id = ?', (outfit['id'],))
-                                conn.execute('DELETE FROM outfits WHERE id = ?', (outfit['id'],))
-                                conn.commit()
+                                repository.delete_outfit(outfit['id'], st.session_state.user_id)
                                 st.success(f"Deleted {outfit['name']}")
                                 st.rerun()
             else:
                 st.info("No outfits found. Create your first outfit!")
-        finally:
-            conn.close()
+            page_navigation("outfits", page)
     
     with tab2:
-        conn = get_db_connection()
-        try:
+        with database():
             # Get clothing items for creating outfit
-            clothing_items = conn.execute(
-                '''
-                SELECT ci.*, c.name as category_name, col.name as color_name 
-                FROM clothing_items ci
-                JOIN categories c ON ci.category_id = c.id
-                JOIN colors col ON ci.color_id = col.id
-                WHERE ci.user_id = ?
-                ORDER BY c.name, ci.name
-                ''',
-                (st.session_state.user_id,)
-            ).fetchall()
+            clothing_items = repository.list_items(st.session_state.user_id, order='category')
             
             if not clothing_items:
                 st.warning("You need to add clothing items before creating outfits")
@@ -668,33 +597,13 @@ def outfits_page():
                         st.error("Select at least one item for the outfit")
                     else:
                         try:
-                            # Insert outfit
-                            cursor = conn.cursor()
-                            cursor.execute(
-                                '''INSERT INTO outfits 
-                                (name, description, occasion, season, user_id, created_at) 
-                                VALUES (?, ?, ?, ?, ?, ?)''',
-                                (name, description, occasion, season, st.session_state.user_id, datetime.utcnow())
-                            )
-                            outfit_id = cursor.lastrowid
-                            
-                            # Insert outfit items
-                            for category, item_ids in selected_items.items():
-                                for item_id in item_ids:
-                                    conn.execute(
-                                        '''INSERT INTO outfit_items 
-                                        (outfit_id, clothing_item_id) 
-                                        VALUES (?, ?)''',
-                                        (outfit_id, item_id)
-                                    )
-                            
-                            conn.commit()
+                            item_ids = [item_id for item_ids in selected_items.values() for item_id in item_ids]
+                            repository.create_outfit(st.session_state.user_id, name, item_ids,
+                                                     description=description, occasion=occasion, season=season)
                             st.success(f"Created outfit: {name}")
                             st.rerun()
                         except Exception as e:
                             st.error(f"Error creating outfit: {e}")
-        finally:
-            conn.close()
 
 def suggestions_page():
     st.title("Outfit Suggestions")
@@ -704,13 +613,9 @@ def suggestions_page():
         st.session_state.page = "login"
         st.rerun()
     
-    conn = get_db_connection()
-    try:
+    with database():
         # Get user preferences
-        user = conn.execute(
-            'SELECT * FROM users WHERE id = ?', 
-            (st.session_state.user_id,)
-        ).fetchone()
+        user = repository.get_user(st.session_state.user_id)
         
         col1, col2 = st.columns(2)
         with col1:
@@ -728,12 +633,12 @@ def suggestions_page():
                 index=datetime.now().month % 12 // 3  # Default to current season
             )
             
+            weather = None
             if user and user['location']:
                 st.write(f"Your location: {user['location']}")
-                
-                # Here we would normally fetch weather data
-                # For simplicity, we'll use mock data
-                st.write("Current weather: Sunny, 22°C")
+                weather = weather_for(user['location'])
+                if weather:
+                    st.write(f"Current weather: {weather['condition']}, {weather['temperature']:.0f}°C")
                 
         with col2:
             st.subheader("Style Preferences")
@@ -753,64 +658,41 @@ def suggestions_page():
             st.write("---")
             st.subheader("Suggested Outfits")
             
-            # In a real app, we would run an algorithm to suggest outfits based on the parameters
-            # For now, we'll just show some existing outfits
-            outfits = conn.execute(
-                '''
-                SELECT * FROM outfits 
-                WHERE user_id = ? AND (occasion = ? OR occasion IS NULL) AND (season = ? OR season = 'All Season')
-                LIMIT 3
-                ''',
-                (st.session_state.user_id, occasion, season)
-            ).fetchall()
+            # Same suggester as the Flask app, scored for the chosen color scheme
+            suggestions = suggest_outfits(
+                st.session_state.user_id,
+                temperature=weather['temperature'] if weather else None,
+                weather_condition=weather['condition'] if weather else None,
+                occasion=occasion.lower(),
+                color_scheme=None if color_scheme == "Any" else color_scheme.lower()
+            )
             
-            if outfits:
-                for outfit in outfits:
-                    st.write(f"### {outfit['name']}")
-                    if outfit['description']:
-                        st.write(outfit['description'])
-                    
-                    # Get outfit items
-                    outfit_items = conn.execute(
-                        '''
-                        SELECT oi.*, ci.name as item_name, c.name as category_name 
-                        FROM outfit_items oi
-                        JOIN clothing_items ci ON oi.clothing_item_id = ci.id
-                        JOIN categories c ON ci.category_id = c.id
-                        WHERE oi.outfit_id = ?
-                        ''',
-                        (outfit['id'],)
-                    ).fetchall()
+            if suggestions:
+                for suggestion in suggestions:
+                    outfit = suggestion['outfit']
+                    st.write(f"### {outfit.name}")
+                    if outfit.description:
+                        st.write(outfit.description)
+                    st.caption(suggestion['reason'])
                     
+                    outfit_items = (suggestion['clothing_items'] if suggestion['is_generated']
+                                    else [layer.clothing_item for layer in outfit.layers])
                     if outfit_items:
                         st.write("**Items:**")
                         for item in outfit_items:
-                            st.write(f"- {item['item_name']} ({item['category_name']})")
+                            st.write(f"- {item.name} ({item.category.name})")
             else:
                 # If no matching outfits, suggest items to combine
                 st.info("No matching outfits found. Here are some items you could combine:")
                 
                 # Get items matching season and style
-                items = conn.execute(
-                    '''
-                    SELECT ci.*, c.name as category_name, col.name as color_name 
-                    FROM clothing_items ci
-                    JOIN categories c ON ci.category_id = c.id
-                    JOIN colors col ON ci.color_id = col.id
-                    WHERE ci.user_id = ? AND (ci.season = ? OR ci.season = 'All Season')
-                    ORDER BY RANDOM()
-                    LIMIT 5
-                    ''',
-                    (st.session_state.user_id, season)
-                ).fetchall()
+                items = repository.list_items(st.session_state.user_id, season=season, order='random', limit=5)
                 
                 if items:
                     for item in items:
                         st.write(f"- {item['name']} ({item['category_name']}, {item['color_name']})")
                 else:
                     st.warning("No suitable items found. Try adding more items to your wardrobe.")
-    finally:
-        conn.close()
 
 # Add global footer with copyright
 def add_footer():
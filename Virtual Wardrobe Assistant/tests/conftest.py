@@ -0,0 +1,66 @@
+import pytest
+
+from app import create_app, db
+from app.services.locations import _resolved
+from app.services.reference_data import _reset_reference_data
+from app.services.suggestion_cache import suggestion_cache
+from app.services.wardrobe_snapshot import clear_snapshots
+from tests.factories import create_user, seed_reference_data
+
+def _reset_process_caches():
+    """Forget everything cached per process, so no test sees another test's database"""
+    suggestion_cache.clear()
+    clear_snapshots()
+    _resolved.clear()
+    _reset_reference_data({'categories', 'colors', 'seasons'})
+
+@pytest.fixture
+def app(tmp_path):
+    """
+    App on a fresh SQLite file with the models' schema, in strict SQL mode.
+
+    No application context is left pushed, so each test client request gets
+    its own (and its own ``g``); use ``ctx`` to work with the database directly.
+    """
+    _reset_process_caches()
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "wardrobe.db"}',
+        'TESTING': True,
+        'WTF_CSRF_ENABLED': False,
+        'WEATHER_PROVIDER': 'mock',
+        'SQL_STRICT': True
+    })
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+    _reset_process_caches()
+
+@pytest.fixture
+def ctx(app):
+    """Application context for tests that use the database directly"""
+    with app.app_context():
+        yield
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def reference(app):
+    """Categories, colors and seasons, as {'categories': {name: id}, ...}"""
+    with app.app_context():
+        return seed_reference_data()
+
+@pytest.fixture
+def user_id(app, reference):
+    with app.app_context():
+        return create_user('alice')
+
+@pytest.fixture
+def logged_in(client, user_id):
+    """Test client logged in as ``user_id``"""
+    response = client.post('/auth/login', data={'username': 'alice', 'password': 'password123'})
+    assert response.status_code == 302
+    return client
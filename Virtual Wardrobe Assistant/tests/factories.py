@@ -0,0 +1,73 @@
+from contextlib import contextmanager
+from datetime import datetime
+
+from sqlalchemy import event
+
+from app import db
+from app.models.clothing import Category, ClothingItem, Color, Season
+from app.models.outfit import Outfit, OutfitItem, refresh_outfit_envelopes
+from app.models.user import User
+
+CATEGORIES = ('T-shirt', 'Shirt', 'Jeans', 'Pants', 'Shorts', 'Jacket', 'Coat', 'Blazer', 'Slacks')
+
+COLORS = {'Black': '#000000', 'White': '#FFFFFF', 'Navy': '#000080', 'Orange': '#FFA500'}
+
+SEASONS = ('Spring', 'Summer', 'Fall', 'Winter')
+
+def seed_reference_data():
+    """Insert categories, colors and seasons; return {'categories': {name: id}, ...}"""
+    tables = {
+        'categories': [Category(name=name) for name in CATEGORIES],
+        'colors': [Color(name=name, hex_code=hex_code) for name, hex_code in COLORS.items()],
+        'seasons': [Season(name=name) for name in SEASONS]
+    }
+    db.session.add_all([row for rows in tables.values() for row in rows])
+    db.session.commit()
+    return {name: {row.name: row.id for row in rows} for name, rows in tables.items()}
+
+def create_user(username, password='password123'):
+    """Create a user and return its ID"""
+    user = User(username, f'{username}@example.com', password, location='London, UK')
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+def create_items(user_id, reference, count, **fields):
+    """Create ``count`` items cycling through the categories and colors; return their IDs"""
+    categories, colors = list(reference['categories'].values()), list(reference['colors'].values())
+    items = [ClothingItem(name=f'Item {i}', user_id=user_id, category_id=categories[i % len(categories)],
+                          color_id=colors[i % len(colors)], occasion='casual', **fields)
+             for i in range(count)]
+    db.session.add_all(items)
+    db.session.commit()
+    return [item.id for item in items]
+
+def create_outfits(user_id, item_ids, count, per_outfit=3, occasion='casual'):
+    """Create ``count`` outfits of consecutive items with their envelopes; return their IDs"""
+    outfits = [Outfit(name=f'Outfit {i}', user_id=user_id, occasion=occasion, created_at=datetime.utcnow())
+               for i in range(count)]
+    db.session.add_all(outfits)
+    db.session.flush()
+    db.session.add_all([
+        OutfitItem(outfit_id=outfit.id, clothing_item_id=item_ids[(i + layer) % len(item_ids)], layer_order=layer)
+        for i, outfit in enumerate(outfits)
+        for layer in range(1, per_outfit + 1)
+    ])
+    db.session.flush()
+    refresh_outfit_envelopes(Outfit.user_id == user_id)
+    db.session.commit()
+    return [outfit.id for outfit in outfits]
+
+@contextmanager
+def count_statements():
+    """Count the SQL statements run on the app's engine inside the block; yields a list of them"""
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', on_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', on_execute)
@@ -0,0 +1,32 @@
+from app import db
+from app.models.clothing import ClothingItem
+from app.services.change_tracking import wardrobe_version
+from tests.factories import count_statements
+
+def _add_item(user_id, reference, name):
+    db.session.add(ClothingItem(name=name, user_id=user_id, category_id=reference['categories']['Shirt']))
+    db.session.flush()
+
+def test_wardrobe_version_bumps_once_per_transaction(ctx, user_id, reference):
+    before = wardrobe_version(user_id)
+    with count_statements() as statements:
+        for i in range(5):
+            _add_item(user_id, reference, f'Shirt {i}')
+        db.session.commit()
+
+    assert wardrobe_version(user_id) == before + 1
+    assert sum(statement.startswith('UPDATE users') for statement in statements) == 1
+
+    _add_item(user_id, reference, 'Another shirt')
+    db.session.commit()
+    assert wardrobe_version(user_id) == before + 2
+
+def test_wardrobe_version_bumps_again_after_rollback(ctx, user_id, reference):
+    before = wardrobe_version(user_id)
+    _add_item(user_id, reference, 'Discarded')
+    db.session.rollback()
+    assert wardrobe_version(user_id) == before
+
+    _add_item(user_id, reference, 'Kept')
+    db.session.commit()
+    assert wardrobe_version(user_id) == before + 1
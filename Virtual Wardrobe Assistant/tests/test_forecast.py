@@ -0,0 +1,71 @@
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import select
+
+from app import db
+from app.models.weather_forecast import WeatherForecast
+from app.services.forecast import _store_forecast, conditions_at
+from app.services.locations import location_key
+
+LOCATION = 'London, UK'
+DAY = date(2020, 3, 1)  # Outside the forecast window, so reads never fetch
+
+def _step(hour, temperature, condition='Clear', day=DAY):
+    starts_at = datetime.combine(day, datetime.min.time()) + timedelta(hours=hour)
+    raining = condition == 'Rain'
+    return {
+        'period': 'hourly',
+        'starts_at': starts_at,
+        'ends_at': starts_at + timedelta(hours=3),
+        'local_date': day,
+        'temperature': temperature,
+        'min_temp': temperature - 1,
+        'max_temp': temperature + 1,
+        'condition': condition,
+        'description': condition.lower(),
+        'humidity': 50.0,
+        'wind_speed': 2.0,
+        'rain_probability': 0.8 if raining else 0.1,
+        'is_raining': raining,
+        'icon': '10d' if raining else '01d'
+    }
+
+def _stored(key, period):
+    table = WeatherForecast.__table__
+    with db.engine.connect() as conn:
+        return conn.execute(
+            select(table).where(table.c.location_key == key, table.c.period == period).order_by(table.c.starts_at)
+        ).all()
+
+def test_later_fetch_replaces_steps_and_rebuilds_the_day(ctx):
+    key = location_key(LOCATION)
+    first = datetime.combine(DAY, datetime.min.time())
+    _store_forecast(key, [_step(0, 4.0), _step(3, 6.0), _step(6, 8.0), _step(9, 10.0)], first)
+    _store_forecast(key, [_step(6, 12.0, 'Rain'), _step(9, 14.0, 'Rain'), _step(0, 3.0, day=DAY + timedelta(days=1))],
+                    first + timedelta(hours=6))
+
+    # Hours before the new forecast starts are kept, later ones replaced
+    assert [row.temperature for row in _stored(key, 'hourly')] == [4.0, 6.0, 12.0, 14.0, 3.0]
+    assert [row.local_date for row in _stored(key, 'daily')] == [DAY, DAY + timedelta(days=1)]
+
+    day = conditions_at(LOCATION, DAY)
+    assert (day['temperature'], day['min_temp'], day['max_temp']) == (9.0, 3.0, 15.0)
+    assert (day['condition'], day['is_raining'], day['rain_probability']) == ('Rain', True, 0.8)
+    assert (day['starts_at'], day['ends_at']) == ('2020-03-01T00:00:00', '2020-03-01T12:00:00')
+
+    assert conditions_at(LOCATION, first + timedelta(hours=4))['temperature'] == 6.0
+    assert conditions_at(LOCATION, DAY - timedelta(days=1)) is None
+
+def test_periods_past_retention_are_dropped(app, ctx):
+    app.config['FORECAST_RETENTION_DAYS'] = 7
+    key = location_key(LOCATION)
+    _store_forecast(key, [_step(0, 4.0), _step(3, 6.0), _step(6, 8.0), _step(9, 10.0)],
+                    datetime.combine(DAY, datetime.min.time()))
+
+    later = DAY + timedelta(days=7)
+    # The cutoff is 10:00 on the first day: only periods ending before it go
+    _store_forecast(key, [_step(12, 15.0, day=later)], datetime.combine(later, datetime.min.time()) + timedelta(hours=10))
+
+    assert [(row.local_date, row.temperature) for row in _stored(key, 'hourly')] == [(DAY, 10.0), (later, 15.0)]
+    # The first day's row ends at noon, so it is kept as it was
+    assert [(row.local_date, row.temperature) for row in _stored(key, 'daily')] == [(DAY, 7.0), (later, 15.0)]
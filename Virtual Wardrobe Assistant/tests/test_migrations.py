@@ -0,0 +1,35 @@
+import os
+
+from flask_migrate import upgrade
+
+from app import create_app, db, repository
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+def test_created_at_backfill_keeps_rows_pageable(tmp_path):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "migrated.db"}', 'TESTING': True})
+    with app.app_context():
+        upgrade(directory=MIGRATIONS, revision='c81ef95882b4')  # created_at was still nullable
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql("INSERT INTO users (id, username, email, password_hash, wardrobe_version) "
+                                 "VALUES (1, 'alice', 'alice@example.com', 'x', 0), (2, 'bob', 'bob@example.com', 'x', 0)")
+            conn.exec_driver_sql("INSERT INTO clothing_items (id, name, user_id, created_at) VALUES "
+                                 "(1, 'Old', 1, '2024-01-02 00:00:00.000000'), (2, 'Undated', 1, NULL), "
+                                 "(3, 'New', 1, '2024-03-01 00:00:00.000000'), (4, 'First', 2, NULL), (5, 'Second', 2, NULL)")
+
+        upgrade(directory=MIGRATIONS)
+        try:
+            with db.engine.connect() as conn:
+                assert conn.exec_driver_sql('SELECT COUNT(*) FROM clothing_items WHERE created_at IS NULL').scalar() == 0
+
+            for user_id, expected in ((1, [3, 2, 1]), (2, [5, 4])):
+                seen, cursor = [], None
+                for _ in range(len(expected) + 1):  # A row repeated by its own cursor would page forever
+                    page = repository.item_page(user_id, cursor, 1)
+                    seen += [item['id'] for item in page.items]
+                    cursor = page.next_cursor
+                    if not cursor:
+                        break
+                assert seen == expected
+        finally:
+            db.engine.dispose()
@@ -0,0 +1,30 @@
+from app import db
+from app.services.outfit_suggester import compute_suggestions
+from app.services.reference_data import get_reference_data
+from app.services.wardrobe_snapshot import clear_snapshots
+from tests.factories import count_statements, create_items, create_outfits, create_user
+
+def _suggestion_statements(user_id):
+    """Return the statements run by a cold call (no snapshot) and by a warm one"""
+    counts = []
+    for cold in (True, False):
+        if cold:
+            clear_snapshots()
+        db.session.expire_all()
+        with count_statements() as statements:
+            # Both wardrobes have enough matching outfits, so none are generated
+            compute_suggestions(user_id, temperature=18, weather_condition='Clear', occasion='casual', limit=2,
+                                seed=1)
+        counts.append(len(statements))
+    return tuple(counts)
+
+def test_compute_suggestions_query_count_does_not_grow_with_outfits(ctx, user_id, reference):
+    """Suggesting from 200 outfits runs exactly the statements suggesting from 2 does"""
+    create_outfits(user_id, create_items(user_id, reference, 12), 2)
+    big_wardrobe = create_user('bob')
+    create_outfits(big_wardrobe, create_items(big_wardrobe, reference, 12), 200)
+    get_reference_data()
+
+    small = _suggestion_statements(user_id)
+    assert _suggestion_statements(big_wardrobe) == small
+    assert small[0] <= 8 and small[1] <= 4
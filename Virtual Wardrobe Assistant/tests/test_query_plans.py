@@ -0,0 +1,26 @@
+import os
+
+from flask_migrate import upgrade
+from sqlalchemy import create_engine
+
+from app import create_app, db
+from app.services.query_plans import check_query_plans
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+def _full_scans(engine):
+    return {result.name: result.full_scans for result in check_query_plans(engine) if result.full_scans}
+
+def test_model_schema_indexes_hot_queries():
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine)
+    assert _full_scans(engine) == {}
+
+def test_migrated_schema_indexes_hot_queries(tmp_path):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "migrated.db"}', 'TESTING': True})
+    with app.app_context():
+        upgrade(directory=MIGRATIONS)
+        try:
+            assert _full_scans(db.engine) == {}
+        finally:
+            db.engine.dispose()
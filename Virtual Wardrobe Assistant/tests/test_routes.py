@@ -0,0 +1,214 @@
+"""
+Routes exercised in strict SQL mode (``SQL_STRICT``): any read that repeats
+more than ``SQL_REPEAT_THRESHOLD`` times in a request raises instead of
+rendering, so these double as N+1 checks.
+"""
+from datetime import date
+
+from jinja2 import ChoiceLoader, DictLoader
+
+from app import db
+from app.models.clothing import Category, ClothingItem
+from app.models.outfit import Outfit, OutfitItem
+from app.models.wear_log import WearLog
+from app.models.wear_stats import WearStats, backfill_wear_stats
+from app.services.change_tracking import wardrobe_version
+from tests.factories import create_items, create_outfits
+
+def _wardrobe(app, user_id, reference, items=30, outfits=10, per_outfit=3):
+    with app.app_context():
+        item_ids = create_items(user_id, reference, items)
+        return item_ids, create_outfits(user_id, item_ids, outfits, per_outfit)
+
+def _stats(app, **key):
+    with app.app_context():
+        stats = WearStats.query.filter_by(**key).one_or_none()
+        return (stats.wear_count, stats.last_worn) if stats else (0, None)
+
+def _page_templates(app, **templates):
+    """Serve ``templates`` for pages with no file under app/templates yet, so their views can render"""
+    app.jinja_env.loader = ChoiceLoader([app.jinja_env.loader, DictLoader(templates)])
+
+def test_dashboard(app, logged_in, user_id, reference):
+    item_ids, outfit_ids = _wardrobe(app, user_id, reference)
+    logged_in.post(f'/outfits/{outfit_ids[0]}/log-wear', data={'date': '2024-05-01'})
+
+    response = logged_in.get('/dashboard')
+    assert response.status_code == 200
+    assert b'Item 29' in response.data
+
+def test_item_pages(app, logged_in, user_id, reference):
+    item_ids, _ = _wardrobe(app, user_id, reference)
+    app.config['SQL_STATS_HEADERS'] = True
+    logged_in.get('/wardrobe/api/items')  # Loads categories, colors and seasons once
+
+    seen, counts, cursor = [], [], None
+    while True:
+        response = logged_in.get('/wardrobe/api/items', query_string={'per_page': 8, 'cursor': cursor or ''})
+        assert response.status_code == 200
+        page = response.get_json()
+        seen += [item['id'] for item in page['items']]
+        counts.append(response.headers['X-SQL-Count'])
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+
+    assert seen == sorted(item_ids, reverse=True)
+    assert len(set(counts)) == 1  # As many statements for the last page as for the first
+    assert logged_in.get('/wardrobe/api/items?cursor=not-a-cursor').status_code == 400
+
+def test_outfit_pages(app, logged_in, user_id, reference):
+    _, outfit_ids = _wardrobe(app, user_id, reference, outfits=25)
+    logged_in.post(f'/outfits/{outfit_ids[0]}/log-wear', data={'date': '2024-05-01'})
+
+    page = logged_in.get('/outfits/api/outfits?per_page=20').get_json()
+    assert len(page['outfits']) == 20 and page['next_cursor']
+    rest = logged_in.get('/outfits/api/outfits', query_string={'cursor': page['next_cursor']}).get_json()
+    assert [outfit['id'] for outfit in page['outfits'] + rest['outfits']] == sorted(outfit_ids, reverse=True)
+    assert rest['outfits'][-1]['wear_count'] == 1 and rest['next_cursor'] is None
+
+def test_log_outfit_wear(app, logged_in, user_id, reference):
+    item_ids, outfit_ids = _wardrobe(app, user_id, reference, items=12, outfits=1, per_outfit=12)
+    with app.app_context():
+        version = wardrobe_version(user_id)
+
+    for day in ('2024-05-01', '2024-04-01'):
+        response = logged_in.post(f'/outfits/{outfit_ids[0]}/log-wear', data={'date': day})
+        assert response.status_code == 302
+
+    assert _stats(app, outfit_id=outfit_ids[0]) == (2, date(2024, 5, 1))
+    assert all(_stats(app, clothing_item_id=item_id) == (2, date(2024, 5, 1)) for item_id in item_ids)
+    with app.app_context():
+        assert wardrobe_version(user_id) == version + 2
+
+def test_log_item_wear(app, logged_in, user_id, reference):
+    item_ids, _ = _wardrobe(app, user_id, reference, outfits=0)
+    for day in ('2024-05-01', '2024-06-01', '2024-03-01'):
+        assert logged_in.post(f'/wardrobe/item/{item_ids[0]}/log-wear', data={'date': day}).status_code == 302
+    assert _stats(app, clothing_item_id=item_ids[0]) == (3, date(2024, 6, 1))
+
+def test_toggle_favorite(app, logged_in, user_id, reference):
+    _, outfit_ids = _wardrobe(app, user_id, reference, outfits=1)
+    response = logged_in.post(f'/outfits/{outfit_ids[0]}/toggle-favorite')
+    assert response.get_json() == {'success': True, 'is_favorite': True}
+    with app.app_context():
+        assert db.session.get(Outfit, outfit_ids[0]).is_favorite
+
+def test_weather_api(logged_in):
+    response = logged_in.get('/api/weather')
+    assert response.status_code == 200
+    assert 'temperature' in response.get_json()
+    assert logged_in.get('/api/suggestion-cache').status_code == 200
+
+def test_delete_item_refreshes_outfits(app, logged_in, user_id, reference):
+    item_ids, outfit_ids = _wardrobe(app, user_id, reference, items=3, outfits=1)
+    with app.app_context():
+        version = wardrobe_version(user_id)
+
+    assert logged_in.post(f'/wardrobe/item/{item_ids[0]}/delete').status_code == 302
+    with app.app_context():
+        assert db.session.get(ClothingItem, item_ids[0]) is None
+        assert OutfitItem.query.filter_by(clothing_item_id=item_ids[0]).count() == 0
+        assert db.session.get(Outfit, outfit_ids[0]).item_count == 2
+        assert wardrobe_version(user_id) == version + 1
+
+def test_deleted_item_wears_stay_out_of_outfit_stats(app, logged_in, user_id, reference):
+    item_ids, outfit_ids = _wardrobe(app, user_id, reference, items=3, outfits=1)
+    assert logged_in.post(f'/outfits/{outfit_ids[0]}/log-wear', data={'date': '2024-05-01'}).status_code == 302
+    assert logged_in.post(f'/wardrobe/item/{item_ids[0]}/delete').status_code == 302
+
+    with app.app_context():
+        assert WearLog.query.filter_by(outfit_id=outfit_ids[0]).count() == 3  # The outfit's log and two items'
+        backfill_wear_stats()
+        db.session.commit()
+    assert _stats(app, outfit_id=outfit_ids[0]) == (1, date(2024, 5, 1))
+    assert _stats(app, clothing_item_id=item_ids[1]) == (1, date(2024, 5, 1))
+
+def test_refresh_outfit_envelopes_bumps_versions(app, user_id, reference):
+    _, outfit_ids = _wardrobe(app, user_id, reference, outfits=2)
+    with app.app_context():
+        db.session.execute(db.update(Outfit).values(item_count=0))  # Stale, as after a raw SQL edit
+        db.session.commit()
+        version = wardrobe_version(user_id)
+
+    with app.app_context():  # As the flask command line provides
+        result = app.test_cli_runner().invoke(args=['refresh-outfit-envelopes'])
+        assert 'Refreshed 2 outfits' in result.output
+
+    with app.app_context():
+        assert db.session.get(Outfit, outfit_ids[0]).item_count == 3
+        assert wardrobe_version(user_id) == version + 1
+
+def test_add_item(app, logged_in, reference):
+    seasons = reference['seasons']
+    response = logged_in.post('/wardrobe/item/add', data={
+        'name': 'Raincoat', 'category_id': reference['categories']['Coat'], 'color_id': reference['colors']['Navy'],
+        'seasons': [seasons['Fall'], seasons['Winter']], 'weather_min_temp': '0', 'weather_max_temp': '15',
+        'is_waterproof': 'y', 'occasion': 'casual'
+    })
+    assert response.status_code == 302
+    with app.app_context():
+        item = ClothingItem.query.filter_by(name='Raincoat').one()
+        assert response.location.endswith(f'/wardrobe/item/{item.id}')
+        assert item.is_waterproof and {season.name for season in item.seasons} == {'Fall', 'Winter'}
+
+def test_edit_item_refreshes_outfits(app, logged_in, user_id, reference):
+    item_ids, outfit_ids = _wardrobe(app, user_id, reference, items=3, outfits=2)
+    response = logged_in.post(f'/wardrobe/item/{item_ids[1]}/edit', data={
+        'name': 'Warm shirt', 'category_id': reference['categories']['Shirt'],
+        'color_id': reference['colors']['White'], 'seasons': [reference['seasons']['Winter']],
+        'weather_min_temp': '-5', 'weather_max_temp': '10'
+    })
+    assert response.status_code == 302
+    with app.app_context():
+        assert [season.name for season in db.session.get(ClothingItem, item_ids[1]).seasons] == ['Winter']
+        assert all(db.session.get(Outfit, outfit_id).derived_max_temp == 10 for outfit_id in outfit_ids)
+
+def test_create_outfit(app, logged_in, user_id, reference):
+    item_ids, _ = _wardrobe(app, user_id, reference, items=12, outfits=0)
+    response = logged_in.post('/outfits/create', data={
+        'name': 'Layers', 'occasion': 'casual',
+        'clothing_items': [f'{item_id},{layer}' for layer, item_id in enumerate(item_ids, start=1)]
+    })
+    assert response.status_code == 302
+    with app.app_context():
+        outfit = Outfit.query.filter_by(name='Layers').one()
+        assert response.location.endswith(f'/outfits/{outfit.id}')
+        assert outfit.item_count == 12
+        assert [layer.clothing_item_id for layer in outfit.layers] == item_ids
+
+def test_edit_outfit(app, logged_in, user_id, reference):
+    item_ids, outfit_ids = _wardrobe(app, user_id, reference, items=6, outfits=1)
+    with app.app_context():
+        version = wardrobe_version(user_id)
+
+    response = logged_in.post(f'/outfits/{outfit_ids[0]}/edit', data={
+        'name': 'Renamed', 'occasion': 'work',
+        'clothing_items': [f'{item_id},{layer}' for layer, item_id in enumerate(item_ids[3:], start=1)]
+    })
+    assert response.status_code == 302
+    with app.app_context():
+        outfit = db.session.get(Outfit, outfit_ids[0])
+        assert (outfit.name, outfit.occasion, outfit.item_count) == ('Renamed', 'work', 3)
+        assert [layer.clothing_item_id for layer in outfit.layers] == item_ids[3:]
+        assert wardrobe_version(user_id) == version + 1
+
+def test_manage_categories(app, logged_in, reference):
+    logged_in.get('/wardrobe/api/items')  # Loads the categories into the reference data
+    response = logged_in.post('/wardrobe/categories', data={'name': 'Scarves', 'description': 'Knitted'})
+    assert response.status_code == 302 and response.location.endswith('/wardrobe/categories')
+    with app.app_context():
+        assert Category.query.filter_by(name='Scarves').one().description == 'Knitted'
+
+def test_suggest(app, logged_in, user_id, reference):
+    _, outfit_ids = _wardrobe(app, user_id, reference, items=12, outfits=6)
+    _page_templates(app, **{'outfits/suggestions.html': (
+        '{{ color_scheme }}:{% for suggestion in outfits %}{{ suggestion.outfit.name }}'
+        '{% for layer in suggestion.outfit.layers %}/{{ layer.clothing_item.category.name }}{% endfor %};'
+        '{% endfor %}')})
+
+    response = logged_in.get('/outfits/suggest', query_string={
+        'temperature': 18, 'weather_condition': 'Clear', 'occasion': 'casual', 'color_scheme': 'complementary'})
+    assert response.status_code == 200
+    page = response.get_data(as_text=True)
+    assert page.startswith('complementary:') and 'Outfit ' in page
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+CALLERS = 20
+
+class _Upstream:
+    """Blocking call that holds until released, counting how often it runs"""
+
+    def __init__(self, result='sunny'):
+        self.result = result
+        self.hits = 0
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.hits += 1
+        assert self.release.wait(5)
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+def _release_when_joined(flight, upstream, waiters):
+    """Release the upstream call once ``waiters`` callers are waiting on it"""
+    deadline = time.monotonic() + 5
+    while flight.coalesced < waiters and time.monotonic() < deadline:
+        time.sleep(0.001)
+    upstream.release.set()
+
+def test_threaded_callers_share_one_call():
+    flight, upstream = SingleFlight(), _Upstream()
+    with ThreadPoolExecutor(CALLERS) as pool:
+        futures = [pool.submit(flight.do, 'London', upstream) for _ in range(CALLERS)]
+        _release_when_joined(flight, upstream, CALLERS - 1)
+        results = [future.result(5) for future in futures]
+
+    assert results == ['sunny'] * CALLERS
+    assert upstream.hits == 1
+    assert flight.coalesced == CALLERS - 1
+
+def test_async_callers_share_one_call():
+    flight, upstream = SingleFlight(), _Upstream()
+
+    async def main():
+        tasks = [asyncio.create_task(flight.do_async('London', upstream)) for _ in range(CALLERS)]
+        await asyncio.to_thread(_release_when_joined, flight, upstream, CALLERS - 1)
+        return await asyncio.gather(*tasks)
+
+    assert asyncio.run(main()) == ['sunny'] * CALLERS
+    assert upstream.hits == 1
+
+def test_threaded_and_async_callers_share_one_call():
+    flight, upstream = SingleFlight(), _Upstream()
+
+    async def main(pool):
+        threaded = [pool.submit(flight.do, 'London', upstream) for _ in range(CALLERS)]
+        tasks = [asyncio.create_task(flight.do_async('London', upstream)) for _ in range(CALLERS)]
+        await asyncio.to_thread(_release_when_joined, flight, upstream, 2 * CALLERS - 1)
+        return await asyncio.gather(*tasks) + [future.result(5) for future in threaded]
+
+    with ThreadPoolExecutor(CALLERS) as pool:
+        assert asyncio.run(main(pool)) == ['sunny'] * 2 * CALLERS
+    assert upstream.hits == 1
+
+def test_errors_are_shared_and_keys_released():
+    flight, upstream = SingleFlight(), _Upstream(ValueError('upstream down'))
+    with ThreadPoolExecutor(CALLERS) as pool:
+        futures = [pool.submit(flight.do, 'London', upstream) for _ in range(CALLERS)]
+        _release_when_joined(flight, upstream, CALLERS - 1)
+        for future in futures:
+            with pytest.raises(ValueError, match='upstream down'):
+                future.result(5)
+    assert upstream.hits == 1
+
+    upstream.result = 'sunny'
+    assert flight.do('London', upstream) == 'sunny'  # A finished call does not linger
+    assert upstream.hits == 2
@@ -0,0 +1,29 @@
+import pytest
+from flask import g
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app import db
+from app.services.sql_monitor import RepeatedQueryError, RequestSQLStats
+
+def test_failed_statements_leave_no_timing_state(app):
+    with app.test_request_context():
+        g.sql_stats = RequestSQLStats()
+        with db.engine.connect() as conn:
+            for _ in range(3):
+                with pytest.raises(OperationalError):
+                    conn.execute(text('SELECT * FROM no_such_table'))
+            conn.execute(text('SELECT 1'))
+            assert 'sql_monitor_start' not in conn.info
+        assert g.sql_stats.count == 1
+
+def test_strict_mode_raises_on_repeated_reads_only(app):
+    with app.test_request_context():
+        g.sql_stats = RequestSQLStats(threshold=2, strict=True)
+        with db.engine.begin() as conn:
+            for i in range(5):
+                conn.execute(text('INSERT INTO categories (name) VALUES (:name)'), {'name': f'Category {i}'})
+            for i in range(2):
+                conn.execute(text('SELECT name FROM categories WHERE id = :id'), {'id': i})
+            with pytest.raises(RepeatedQueryError):
+                conn.execute(text('SELECT name FROM categories WHERE id = :id'), {'id': 2})
@@ -0,0 +1,17 @@
+import pickle
+
+from app.services.suggestion_precompute import _picklable_config
+
+def test_worker_config_keeps_plain_containers(app):
+    app.config.update(SQLITE_PRAGMAS={'mmap_size': 0}, EXAMPLE_LIST=['London', ('Paris', 'FR')],
+                      UNPICKLABLE=lambda: None)
+    config = _picklable_config(app)
+
+    assert config['SQLITE_PRAGMAS'] == {'mmap_size': 0}
+    assert config['EXAMPLE_LIST'] == ['London', ('Paris', 'FR')]
+    assert config['SQL_STRICT'] is True
+    assert 'UNPICKLABLE' not in config
+    assert pickle.loads(pickle.dumps(config)) == config
+
+    config['SQLITE_PRAGMAS']['mmap_size'] = 1  # Workers get copies, not the app's own objects
+    assert app.config['SQLITE_PRAGMAS'] == {'mmap_size': 0}
@@ -0,0 +1,30 @@
+from app import db
+from app.models.clothing import ClothingItem, Season
+from app.models.outfit import Outfit
+from app.services.suitability_index import get_suitability_index
+from app.services.wardrobe_snapshot import get_snapshot
+from tests.factories import create_items
+
+def test_seasons_with_large_ids(ctx, user_id, reference):
+    # IDs past 63 would not fit as bit positions in a uint64 mask
+    monsoon, dry = Season(id=70, name='Monsoon'), Season(id=130, name='Dry')
+    db.session.add_all([monsoon, dry])
+    db.session.commit()
+
+    wet_item, dry_item, any_item = create_items(user_id, reference, 3)
+    db.session.get(ClothingItem, wet_item).seasons = [monsoon]
+    db.session.get(ClothingItem, dry_item).seasons = [dry, db.session.get(Season, reference['seasons']['Summer'])]
+    db.session.add_all([Outfit(name='Wet', user_id=user_id, season='monsoon'),
+                        Outfit(name='Dry', user_id=user_id, season='Dry, summer'),
+                        Outfit(name='Any', user_id=user_id)])
+    db.session.commit()
+
+    snapshot = get_snapshot(user_id)
+    assert snapshot.item_ids[snapshot.candidate_mask(season_id=130)].tolist() == [dry_item, any_item]
+
+    index = get_suitability_index(user_id)
+    assert index.items.ids_for(index.items.match(season_id=70)).tolist() == [wet_item, any_item]
+    assert index.items.ids_for(index.items.match(season_id=130)).tolist() == [dry_item, any_item]
+    outfits = {outfit.id: outfit.name for outfit in Outfit.query}
+    for season_id, names in ((70, ['Wet', 'Any']), (130, ['Dry', 'Any']), (999, ['Any'])):
+        assert [outfits[i] for i in index.outfits.ids_for(index.outfits.match(season_id=season_id)).tolist()] == names
@@ -0,0 +1,93 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app import db
+from app.models.weather_cache import WeatherCache
+from app.services.locations import location_key
+from app.services.weather import REFRESH_TIMEOUT, _claim_refresh, get_weather_data, weather_cache_stats
+from app.services.weather_providers import MockWeatherProvider
+
+LOCATION = 'London, UK'
+
+class _CountingProvider(MockWeatherProvider):
+    """Mock weather at a settable temperature (None = upstream down), counting upstream calls"""
+
+    def __init__(self):
+        self.temperature = 10.0
+        self.calls = 0
+        self.open = threading.Event()  # Cleared, calls wait until it is set again
+        self.open.set()
+
+    def current(self, location, coordinates=None):
+        self.calls += 1
+        assert self.open.wait(5)
+        if self.temperature is None:
+            return None
+        return dict(super().current(location, coordinates), temperature=self.temperature)
+
+@pytest.fixture
+def provider(app, ctx):
+    app.config.update(WEATHER_CACHE_TTL=600, WEATHER_CACHE_STALE_TTL=3600)
+    provider = app.extensions['weather_provider'] = _CountingProvider()
+    return provider
+
+def _age_entry(seconds):
+    """Make the cached entry ``seconds`` old, with no refresh in progress"""
+    table = WeatherCache.__table__
+    with db.engine.begin() as conn:
+        conn.execute(update(table).values(fetched_at=datetime.utcnow() - timedelta(seconds=seconds),
+                                          refresh_started_at=None))
+
+def _wait_for_refreshes():
+    for thread in threading.enumerate():
+        if thread.name.startswith('weather-refresh-'):
+            thread.join(5)
+
+def test_fresh_entries_are_served_from_the_cache(provider):
+    before = weather_cache_stats()
+    assert get_weather_data(LOCATION)['temperature'] == 10.0
+    provider.temperature = 20.0
+    assert get_weather_data('london,uk')['temperature'] == 10.0  # Same place, another spelling
+
+    assert provider.calls == 1
+    stats = weather_cache_stats()
+    assert (stats['misses'] - before['misses'], stats['hits'] - before['hits']) == (1, 1)
+
+def test_stale_entries_are_served_while_one_refresh_runs(provider):
+    get_weather_data(LOCATION)
+    _age_entry(700)
+    provider.temperature = 20.0
+    provider.open.clear()
+
+    assert get_weather_data(LOCATION)['temperature'] == 10.0  # Stale value, without waiting for upstream
+    assert get_weather_data(LOCATION)['temperature'] == 10.0  # The refresh is already claimed
+    provider.open.set()
+    _wait_for_refreshes()
+
+    assert provider.calls == 2
+    assert get_weather_data(LOCATION)['temperature'] == 20.0
+    assert provider.calls == 2
+
+def test_expired_entries_are_fetched_and_kept_when_upstream_fails(provider):
+    get_weather_data(LOCATION)
+    _age_entry(600 + 3600 + 1)
+    provider.temperature = 20.0
+    assert get_weather_data(LOCATION)['temperature'] == 20.0  # Fetched before answering
+
+    _age_entry(600 + 3600 + 1)
+    provider.temperature = None
+    assert get_weather_data(LOCATION)['temperature'] == 20.0  # Expired, but better than nothing
+    assert provider.calls == 3
+
+def test_refresh_claim_is_handed_over_after_timeout(provider):
+    get_weather_data(LOCATION)
+    key, now = location_key(LOCATION), datetime.utcnow()
+
+    assert _claim_refresh(key, now)
+    assert not _claim_refresh(key, now + timedelta(seconds=1))  # Another worker is refreshing
+    # A refresh that never finished is taken over once it times out
+    assert _claim_refresh(key, now + timedelta(seconds=REFRESH_TIMEOUT + 1))
+    assert not _claim_refresh('text:nowhere', now)  # Nothing cached, nothing to refresh
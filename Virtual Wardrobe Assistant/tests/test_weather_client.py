@@ -0,0 +1,140 @@
+"""
+WeatherClient against a scripted HTTP server on localhost: each request
+takes the next reply from the script, so retries, timeouts and the breaker
+run against real sockets.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from app.services.weather_client import CircuitBreaker, QuotaExceeded, WeatherClient, WeatherUnavailable
+from app.services.weather_quota import WeatherQuota
+
+OK = {'main': {'temp': 18.0}}
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        server.hits += 1
+        status, body, delay = server.script.pop(0) if server.script else (200, OK, 0)
+        time.sleep(delay)
+        raw = json.dumps(body).encode()
+        # A 'truncated' reply promises more body than it sends, then hangs up
+        length = len(raw) + 100 if status == 'truncated' else len(raw)
+        self.send_response(200 if status == 'truncated' else status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(length))
+        self.end_headers()
+        self.wfile.write(raw)
+        self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def upstream():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    server.script, server.hits = [], 0
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def _client(server, **options):
+    options = {'retries': 2, 'backoff': 0, 'read_timeout': 0.5, 'failure_threshold': 2, 'reset_timeout': 0.2,
+               **options}
+    return WeatherClient(f'http://127.0.0.1:{server.server_port}', 'key', **options)
+
+def _get(client, city='London'):
+    return client.get_json('/data/2.5/weather', {'q': city})
+
+def test_retries_retryable_statuses(upstream):
+    upstream.script = [(503, {}, 0), (429, {}, 0)]
+    assert _get(_client(upstream)) == OK
+    assert upstream.hits == 3
+
+def test_retries_timeouts(upstream):
+    upstream.script = [(200, {'late': True}, 1.0)]
+    client = _client(upstream, read_timeout=0.2)
+    assert _get(client) == OK
+    assert upstream.hits == 2
+
+def test_client_errors_are_not_retried(upstream):
+    upstream.script = [(404, {'message': 'city not found'}, 0)]
+    client = _client(upstream)
+    with pytest.raises(requests.HTTPError):
+        _get(client)
+    assert upstream.hits == 1
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+def test_breaker_opens_and_recovers(upstream):
+    upstream.script = [(500, {}, 0)] * 2
+    client = _client(upstream, retries=0)
+    for _ in range(2):
+        with pytest.raises(WeatherUnavailable):
+            _get(client)
+    assert client.breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(WeatherUnavailable, match='circuit is open'):
+        _get(client)
+    assert upstream.hits == 2  # Rejected without calling upstream
+
+    time.sleep(0.25)
+    assert _get(client) == OK  # The half-open trial succeeds
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+def test_failed_trial_reopens_breaker(upstream):
+    upstream.script = [(500, {}, 0)] * 3
+    client = _client(upstream, retries=0)
+    for _ in range(2):
+        with pytest.raises(WeatherUnavailable):
+            _get(client)
+
+    time.sleep(0.25)
+    with pytest.raises(WeatherUnavailable):
+        _get(client)
+    assert client.breaker.state == CircuitBreaker.OPEN
+    assert upstream.hits == 3
+
+def test_truncated_trial_reopens_breaker(upstream):
+    upstream.script = [(500, {}, 0)] * 2 + [('truncated', OK, 0)]
+    client = _client(upstream, retries=0)
+    for _ in range(2):
+        with pytest.raises(WeatherUnavailable):
+            _get(client)
+
+    time.sleep(0.25)
+    with pytest.raises(WeatherUnavailable):
+        _get(client)
+    assert client.breaker.state == CircuitBreaker.OPEN
+
+def test_serves_last_good_response(upstream):
+    client = _client(upstream, retries=1)
+    assert _get(client) == OK
+
+    upstream.script = [(502, {}, 0)] * 4
+    assert _get(client) == OK  # Retries run out; the earlier body is served
+    with pytest.raises(WeatherUnavailable):
+        _get(client, city='Paris')  # Nothing known for this request
+
+def test_trial_refused_by_quota_is_retried(upstream, ctx):
+    upstream.script = [(500, {}, 0)] * 2
+    client = _client(upstream, retries=0, quota=WeatherQuota('test', per_minute=2))
+    for _ in range(2):
+        with pytest.raises(WeatherUnavailable):
+            _get(client)
+
+    time.sleep(0.25)
+    with pytest.raises(QuotaExceeded):
+        _get(client)  # The budget is spent, so the trial never goes upstream
+    assert client.breaker.state == CircuitBreaker.OPEN
+
+    client.quota = None
+    assert _get(client) == OK
+    assert client.breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,23 @@
+from app.services.weather_prefetch import user_locations
+from app.services.weather_providers import MockWeatherProvider
+from app.services.weather_quota import BACKGROUND, INTERACTIVE, current_priority
+from tests.factories import create_user
+
+class _GeocodingProvider(MockWeatherProvider):
+    """Mock weather with a geocoder that records the priority it was called at"""
+
+    def __init__(self):
+        self.priorities = []
+
+    def geocode(self, location):
+        self.priorities.append(current_priority())
+        return {'name': 'London', 'country': 'GB', 'latitude': 51.5072, 'longitude': -0.1276}
+
+def test_new_locations_are_geocoded_at_background_priority(app, ctx):
+    provider = app.extensions['weather_provider'] = _GeocodingProvider()
+    create_user('alice')
+    create_user('bob')
+
+    assert user_locations() == {'geo:51.51,-0.13': 'London, UK'}
+    assert provider.priorities == [BACKGROUND]  # Geocoded once, outside the interactive reserve
+    assert current_priority() == INTERACTIVE
@@ -0,0 +1,56 @@
+from sqlalchemy import select, update
+
+from app import db
+from app.models.api_quota import ApiQuota
+from app.services.weather_quota import BACKGROUND, INTERACTIVE, WeatherQuota, weather_priority
+
+def _quota(name='test'):
+    # Refills 0.01 calls a second, so a test run never earns a whole call back
+    return WeatherQuota(name, per_minute=0.6, burst=8)
+
+def _tokens(name='test'):
+    table = ApiQuota.__table__
+    with db.engine.connect() as conn:
+        return conn.execute(select(table.c.tokens).where(table.c.name == name)).scalar_one()
+
+def _age_bucket(seconds, name='test'):
+    table = ApiQuota.__table__
+    with db.engine.begin() as conn:
+        conn.execute(update(table).where(table.c.name == name).values(refilled_at=table.c.refilled_at - seconds))
+
+def _take_all(quota, priority=None):
+    taken = 0
+    while quota.acquire(priority):
+        taken += 1
+    return taken
+
+def test_background_calls_leave_the_reserve_for_interactive_ones(ctx):
+    quota = _quota()
+    assert _take_all(quota, BACKGROUND) == 6  # A quarter of 8 is held back
+    assert _take_all(quota, INTERACTIVE) == 2
+    assert (quota.granted, quota.denied) == (8, 2)
+
+def test_priority_defaults_to_the_calling_block(ctx):
+    quota = _quota()
+    with weather_priority(BACKGROUND):
+        assert _take_all(quota) == 6
+    assert _take_all(quota) == 2
+
+def test_workers_share_one_bucket(ctx):
+    first, second = _quota(), _quota()
+    assert _take_all(first) == 8
+    assert not second.acquire()
+    assert _take_all(_quota('other')) == 8
+
+def test_drained_bucket_refills_up_to_capacity(ctx):
+    quota = _quota()
+    assert quota.acquire()
+    quota.drain()
+    assert not quota.acquire()
+
+    _age_bucket(300)  # Three calls' worth
+    assert _take_all(quota) == 3
+
+    _age_bucket(10000)
+    quota.acquire()
+    assert 6.9 < _tokens() <= 7.0  # Refilled to the burst size, not beyond